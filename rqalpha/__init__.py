@@ -16,6 +16,7 @@
 RQAlpha - a Algorithm Trading System
 """
 
+import copy
 import pkgutil
 
 from rqalpha.__main__ import cli
@@ -49,6 +50,11 @@ def update_bundle(data_bundle_path=None, locale="zh_Hans_CN", confirm=True):
     rqalpha.utils.bundle_helper.update_bundle(data_bundle_path=data_bundle_path, locale=locale, confirm=confirm)
 
 
+def sync_bundle(base_url, data_bundle_path=None, workers=4, locale="zh_Hans_CN"):
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.sync_bundle(base_url, data_bundle_path=data_bundle_path, workers=workers, locale=locale)
+
+
 def run(config, source_code=None):
     # [Deprecated]
     from rqalpha.utils.config import parse_config
@@ -139,3 +145,75 @@ def run_func(**kwargs):
     config = parse_config(config, user_funcs=user_funcs)
     clear_all_cached_functions()
     return main.run(config, user_funcs=user_funcs)
+
+
+def run_sweep(strategy_file_path, param_grid, config=None, workers=None, callback=None):
+    """
+    以进程池并行运行一组参数，返回各次运行的 sys_analyser summary 汇总的 DataFrame
+
+    :param param_grid: {name: [value, ...]} 或参数组合的列表。包含 `.` 的参数名视为配置路径，
+        如 `mod.sys_simulation.slippage`，其余参数在策略 init 之后设置到 context 上
+    :param workers: 进程数，默认为 CPU 核数
+    :param callback: 每完成一次运行即以 (index, params, summary) 调用，运行失败时 summary 为 None
+    """
+    import copy
+    from rqalpha.utils.config import parse_config
+    from rqalpha import sweep
+
+    config = copy.deepcopy(config) if config is not None else {}
+    assert isinstance(config, dict)
+    config.setdefault("base", {})["strategy_file"] = strategy_file_path
+    config = parse_config(config)
+    return sweep.run_sweep(config, param_grid, workers=workers, callback=callback)
+
+
+def run_forked(strategy_file_path, fork_date, variants, config=None):
+    """
+    运行至 fork_date 后为每组参数分出一个分支继续运行，预热阶段只运行一次。返回与参数组合顺序一致的运行结果列表
+
+    :param fork_date: 该日结算后的状态为各分支共享的起点，参数从下一交易日起生效
+    :param variants: {name: [value, ...]} 或参数组合的列表，参数在 fork_date 之后设置到 context 上
+    """
+    import copy
+    import pandas as pd
+    from rqalpha.utils.config import parse_config
+    from rqalpha.utils.py2 import clear_all_cached_functions
+    from rqalpha import checkpoint
+    from rqalpha.sweep import expand_param_grid
+
+    variants = expand_param_grid(variants)
+    for params in variants:
+        for name in params:
+            if "." in name:
+                raise ValueError("only context parameters can be changed after fork, got {}".format(name))
+
+    config = copy.deepcopy(config) if config is not None else {}
+    assert isinstance(config, dict)
+    config.setdefault("base", {})["strategy_file"] = strategy_file_path
+    config = parse_config(config)
+    clear_all_cached_functions()
+    return checkpoint.run_forked(config, pd.Timestamp(fork_date).date(), variants)
+
+
+def run_vectorized(weights, config=None):
+    """
+    以向量化方式回测日频的目标权重策略，结果与 run_func 等接口返回的 sys_analyser 结果格式相同
+
+    :param weights: 目标权重，`pandas.DataFrame` (index 为调仓日，columns 为 order_book_id) 或以交易日为参数、
+        返回 {order_book_id: weight} 的函数
+    :param config: 与 run_func 相同的配置，仅支持股票账户、日线及 current_bar 撮合
+    """
+    from rqalpha.utils.py2 import clear_all_cached_functions
+    from rqalpha.utils.config import parse_config
+    from rqalpha import vectorized
+
+    if config is None:
+        config = {}
+    else:
+        assert isinstance(config, dict)
+        # 不修改调用方传入的配置
+        config = copy.deepcopy(config)
+        config.get("base", {}).pop("strategy_file", None)
+    config = parse_config(config, user_funcs={})
+    clear_all_cached_functions()
+    return vectorized.run(config, weights)
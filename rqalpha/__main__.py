@@ -80,6 +80,124 @@ def update_bundle(data_bundle_path, locale):
     rqalpha.utils.bundle_helper.update_bundle(data_bundle_path, locale)
 
 
+@cli.group()
+@click.help_option('-h', '--help')
+def bundle():
+    """
+    Data bundle tools
+    """
+
+
+@bundle.command()
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('--locale', 'locale', type=click.STRING, default="zh_Hans_CN")
+def convert(data_bundle_path, locale):
+    """
+    Convert day bars to memory-mapped columnar layout
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.convert_bundle(data_bundle_path, locale)
+
+
+@bundle.command(name='compile')
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('--dtype', 'float_dtype', type=click.Choice(['float64', 'float32']), default='float64',
+              help="dtype of price columns")
+@click.option('--locale', 'locale', type=click.STRING, default="zh_Hans_CN")
+def compile_bundle(data_bundle_path, float_dtype, locale):
+    """
+    Compile day bars into a pre-converted memory-mapped record layout
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.compile_bundle(data_bundle_path, locale, float_dtype)
+
+
+@bundle.command(name='ingest-minute')
+@click.argument('source', type=click.Path(exists=True, file_okay=False))
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('--locale', 'locale', type=click.STRING, default="zh_Hans_CN")
+def ingest_minute(source, data_bundle_path, locale):
+    """
+    Build minute bar store from per-instrument CSV/NumPy files
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.ingest_minute_bars(source, data_bundle_path, locale)
+
+
+@bundle.command(name='ingest-tick')
+@click.argument('source', type=click.Path(exists=True, file_okay=False))
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('--locale', 'locale', type=click.STRING, default="zh_Hans_CN")
+def ingest_tick(source, data_bundle_path, locale):
+    """
+    Build tick store from per-instrument CSV/NumPy files
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.ingest_ticks(source, data_bundle_path, locale)
+
+
+@bundle.command(name='build-panel')
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('-f', '--field', 'fields', multiple=True, default=['close', 'volume'], help="fields of the panel")
+@click.option('-t', '--table', 'tables', multiple=True, default=['stocks'],
+              type=click.Choice(['stocks', 'indexes', 'futures', 'funds', 'public_funds']),
+              help="day bar tables included in the panel")
+@click.option('--locale', 'locale', type=click.STRING, default="zh_Hans_CN")
+def build_panel(data_bundle_path, fields, tables, locale):
+    """
+    Build dense trading date x instrument panels for get_panel
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.build_panel(data_bundle_path, fields, tables, locale)
+
+
+@bundle.command()
+@click.argument('url', type=click.STRING)
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('-j', '--workers', type=click.INT, default=4, help="number of parallel downloads")
+@click.option('--locale', 'locale', type=click.STRING, default="zh_Hans_CN")
+def sync(url, data_bundle_path, workers, locale):
+    """
+    Incrementally sync data bundle from a mirror serving manifest.json
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.sync_bundle(url, data_bundle_path, workers, locale)
+
+
+@bundle.command()
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+@click.option('--block-size', type=click.INT, default=4 << 20, help="size in bytes of blocks checked for deltas")
+def manifest(data_bundle_path, block_size):
+    """
+    Write manifest.json of per-file checksums so the bundle can be served as a sync mirror
+    """
+    import rqalpha.utils.bundle_helper
+    rqalpha.utils.bundle_helper.dump_manifest(data_bundle_path, block_size)
+
+
+@bundle.command(name='publish-shm')
+@click.argument('name', type=click.STRING)
+@click.option('-d', '--data-bundle-path', default=os.path.expanduser('~/.rqalpha'), type=click.Path(file_okay=False))
+def publish_shm(name, data_bundle_path):
+    """
+    Publish converted day bars to shared memory for parallel backtests
+    """
+    from rqalpha.data.base_data_source import BaseDataSource
+    from rqalpha.data.base_data_source.shared_memory import publish_bundle
+    from rqalpha.utils.bundle_helper import get_bundle_path
+    six.print_(publish_bundle(BaseDataSource(get_bundle_path(data_bundle_path), {}), name))
+
+
+@bundle.command(name='release-shm')
+@click.argument('name', type=click.STRING)
+def release_shm(name):
+    """
+    Release shared memory published by publish-shm
+    """
+    from rqalpha.data.base_data_source.shared_memory import release_bundle
+    release_bundle(name)
+
+
 @cli.command()
 @click.help_option('-h', '--help')
 # -- Base Configuration
@@ -95,6 +213,11 @@ def update_bundle(data_bundle_path, locale):
 @click.option('-rp', '--round-price', 'base__round_price', is_flag=True)
 @click.option('-mk', '--market', 'base__market', type=click.Choice(['cn', 'hk']), default=None)
 @click.option('--source-code', 'base__source_code')
+@click.option('--data-cache-mb', 'base__data_cache_mb', type=click.INT, help="memory budget of day bar cache in MB")
+@click.option('--data-preload-workers', 'base__data_preload_workers', type=click.INT,
+              help="preload data stores with a thread pool of this size")
+@click.option('--data-shm-path', 'base__data_shm_path', type=click.Path(exists=True, file_okay=False),
+              help="read day bars from shared memory published by `rqalpha bundle publish-shm`")
 # -- Extra Configuration
 @click.option('-l', '--log-level', 'extra__log_level', type=click.Choice(['verbose', 'debug', 'info', 'error', 'none']))
 @click.option('--disable-user-system-log', 'extra__user_system_log_disabled', is_flag=True, help='disable user system log stdout')
@@ -103,6 +226,8 @@ def update_bundle(data_bundle_path, locale):
 @click.option('--locale', 'extra__locale', type=click.Choice(['cn', 'en']), default="cn")
 @click.option('--extra-vars', 'extra__context_vars', type=click.STRING, help="override context vars")
 @click.option("--enable-profiler", "extra__enable_profiler", is_flag=True, help="add line profiler to profile your strategy")
+@click.option("--enable-event-profiler", "extra__enable_event_profiler", is_flag=True,
+              help="record call counts and time of every event listener")
 @click.option('--config', 'config_path', type=click.STRING, help="config file path")
 # -- Mod Configuration
 @click.option('-mc', '--mod-config', 'mod_configs', nargs=2, multiple=True, type=click.STRING, help="mod extra config")
@@ -139,6 +264,51 @@ def run(**kwargs):
         sys.exit(1)
 
 
+@cli.command()
+@click.help_option('-h', '--help')
+@click.option('-f', '--strategy-file', 'base__strategy_file', type=click.Path(exists=True), required=True)
+@click.option('-p', '--param', 'params', nargs=2, multiple=True,
+              help="parameter name and comma separated values, e.g. -p fast 5,10,20. "
+                   "names containing dots are config paths, e.g. -p mod.sys_simulation.slippage 0,0.01")
+@click.option('-j', '--workers', type=click.INT, default=None, help="number of worker processes, default to cpu count")
+@click.option('-o', '--output-file', type=click.Path(writable=True), help="save summaries of all runs to csv")
+@click.option('-d', '--data-bundle-path', 'base__data_bundle_path', type=click.Path(exists=True))
+@click.option('-s', '--start-date', 'base__start_date', type=Date())
+@click.option('-e', '--end-date', 'base__end_date', type=Date())
+@click.option('-a', '--account', 'base__accounts', nargs=2, multiple=True, help="set account type with starting cash")
+@click.option('-fq', '--frequency', 'base__frequency', type=click.Choice(['1d', '1m', 'tick']))
+@click.option('--data-shm-path', 'base__data_shm_path', type=click.Path(exists=True, file_okay=False),
+              help="read day bars from shared memory published by `rqalpha bundle publish-shm`")
+@click.option('-l', '--log-level', 'extra__log_level', type=click.Choice(['verbose', 'debug', 'info', 'error', 'none']),
+              default='error')
+@click.option('--config', 'config_path', type=click.STRING, help="config file path")
+@click.option('-mc', '--mod-config', 'mod_configs', nargs=2, multiple=True, type=click.STRING, help="mod extra config")
+def sweep(params, workers, output_file, **kwargs):
+    """
+    Run a strategy over a grid of parameters in parallel
+    """
+    from rqalpha.mod.utils import mod_config_value_parse
+    from rqalpha.sweep import run_sweep
+
+    config_path = kwargs.pop('config_path', None)
+    if config_path is not None:
+        config_path = os.path.abspath(config_path)
+    cfg = parse_config(kwargs, config_path=config_path, click_type=True)
+
+    param_grid = {name: [mod_config_value_parse(v) for v in values.split(',')] for name, values in params}
+
+    def on_result(index, p, summary):
+        if summary is None:
+            six.print_("[{}] {} failed".format(index, p))
+        else:
+            six.print_("[{}] {} total_returns={} sharpe={} max_drawdown={}".format(
+                index, p, summary.get('total_returns'), summary.get('sharpe'), summary.get('max_drawdown')))
+
+    df = run_sweep(cfg, param_grid, workers=workers, callback=on_result)
+    if output_file:
+        df.to_csv(output_file)
+
+
 @cli.command()
 @click.option('-d', '--directory', default="./", type=click.Path(), required=True)
 def examples(directory):
@@ -462,6 +462,39 @@ def get_yield_curve(date=None, tenor=None):
     return env.data_proxy.get_yield_curve(start_date=date, end_date=date, tenor=tenor)
 
 
+def _get_history_dt(frequency, include_now, adjust_type):
+    env = Environment.get_instance()
+    dt = env.calendar_dt
+
+    if frequency[-1] not in {"m", "d"}:
+        raise RQInvalidArgument("invalid frequency {}".format(frequency))
+
+    if frequency[-1] == "m" and env.config.base.frequency == "1d":
+        raise RQInvalidArgument("can not get minute history in day back test")
+
+    if frequency[-1] == "d" and frequency != "1d":
+        raise RQInvalidArgument("invalid frequency")
+
+    if adjust_type not in {"pre", "post", "none"}:
+        raise RuntimeError("invalid adjust_type")
+
+    if frequency == "1d":
+        sys_frequency = Environment.get_instance().config.base.frequency
+        if (
+            sys_frequency in ["1m", "tick"]
+            and not include_now
+            and ExecutionContext.phase() != EXECUTION_PHASE.AFTER_TRADING
+        ) or (ExecutionContext.phase() == EXECUTION_PHASE.BEFORE_TRADING):
+            dt = env.data_proxy.get_previous_trading_date(env.trading_dt.date())
+            # 当 EXECUTION_PHASE.BEFORE_TRADING 的时候，强制 include_now 为 False
+            include_now = False
+        if sys_frequency == "1d":
+            # 日回测不支持 include_now
+            include_now = False
+
+    return dt, include_now
+
+
 @export_as_api
 @ExecutionContext.enforce_phase(
     EXECUTION_PHASE.BEFORE_TRADING,
@@ -564,33 +597,7 @@ def history_bars(
     """
     order_book_id = assure_order_book_id(order_book_id)
     env = Environment.get_instance()
-    dt = env.calendar_dt
-
-    if frequency[-1] not in {"m", "d"}:
-        raise RQInvalidArgument("invalid frequency {}".format(frequency))
-
-    if frequency[-1] == "m" and env.config.base.frequency == "1d":
-        raise RQInvalidArgument("can not get minute history in day back test")
-
-    if frequency[-1] == "d" and frequency != "1d":
-        raise RQInvalidArgument("invalid frequency")
-
-    if adjust_type not in {"pre", "post", "none"}:
-        raise RuntimeError("invalid adjust_type")
-
-    if frequency == "1d":
-        sys_frequency = Environment.get_instance().config.base.frequency
-        if (
-            sys_frequency in ["1m", "tick"]
-            and not include_now
-            and ExecutionContext.phase() != EXECUTION_PHASE.AFTER_TRADING
-        ) or (ExecutionContext.phase() == EXECUTION_PHASE.BEFORE_TRADING):
-            dt = env.data_proxy.get_previous_trading_date(env.trading_dt.date())
-            # 当 EXECUTION_PHASE.BEFORE_TRADING 的时候，强制 include_now 为 False
-            include_now = False
-        if sys_frequency == "1d":
-            # 日回测不支持 include_now
-            include_now = False
+    dt, include_now = _get_history_dt(frequency, include_now, adjust_type)
 
     if fields is None:
         fields = ["datetime", "open", "high", "low", "close", "volume"]
@@ -608,6 +615,194 @@ def history_bars(
     )
 
 
+@export_as_api
+@ExecutionContext.enforce_phase(
+    EXECUTION_PHASE.BEFORE_TRADING,
+    EXECUTION_PHASE.ON_BAR,
+    EXECUTION_PHASE.ON_TICK,
+    EXECUTION_PHASE.AFTER_TRADING,
+    EXECUTION_PHASE.SCHEDULED,
+)
+@apply_rules(
+    verify_that("order_book_ids").are_valid_instruments(),
+    verify_that("bar_count").is_instance_of(int).is_greater_than(0),
+    verify_that("frequency").is_valid_frequency(),
+    verify_that("fields").are_valid_fields(
+        names.VALID_HISTORY_BATCH_FIELDS, ignore_none=False
+    ),
+    verify_that("include_now").is_instance_of(bool),
+    verify_that("adjust_type").is_in({"pre", "none", "post"}),
+)
+def history_bars_batch(
+    order_book_ids,
+    bar_count,
+    frequency,
+    fields,
+    include_now=False,
+    adjust_type="pre",
+):
+    """
+    批量获取多个合约的历史行情，结果按交易日历对齐，适用于对整个股票池做横截面计算。
+    调用时间与返回数据的对应关系同 :func:`history_bars`。
+
+    与 :func:`history_bars` 不同，返回的数据不会跳过停牌日；合约在某个交易日没有行情（如未上市或已退市）时对应位置为 NaN。
+
+    :param order_book_ids: 合约代码列表
+    :type order_book_ids: `list[str]`
+
+    :param int bar_count: 获取的历史数据数量，必填项
+    :param str frequency: 获取数据什么样的频率进行。目前仅支持 '1d'
+    :param fields: 返回数据字段，可选字段同 :func:`history_bars`，不包括 datetime
+    :type fields: `str` | `list[str]`
+    :param bool include_now: 是否包含当前数据
+    :param str adjust_type: 复权类型，默认为前复权 pre；可选 pre, none, post
+
+    :return: `ndarray`, shape 为 (bar_count, len(order_book_ids))；fields 为 list 时返回结构化数组，可通过字段名取得各字段的二维数组
+
+    :example:
+
+    获取最近3天两只股票的收盘价（策略当前日期为20160706）:
+
+    ..  code-block:: python3
+        :linenos:
+
+        [In]
+        logger.info(history_bars_batch(['000001.XSHE', '000002.XSHE'], 3, '1d', 'close'))
+        [Out]
+        [[ 8.88  8.71]
+         [ 8.9   8.81]
+         [ 8.91  8.81]]
+    """
+    order_book_ids = [assure_order_book_id(o) for o in order_book_ids]
+    env = Environment.get_instance()
+    dt, include_now = _get_history_dt(frequency, include_now, adjust_type)
+
+    return env.data_proxy.history_bars_batch(
+        order_book_ids,
+        bar_count,
+        frequency,
+        fields,
+        dt,
+        include_now=include_now,
+        adjust_type=adjust_type,
+        adjust_orig=env.trading_dt,
+    )
+
+
+@export_as_api
+@ExecutionContext.enforce_phase(EXECUTION_PHASE.ON_INIT)
+@apply_rules(
+    verify_that("bar_count").is_instance_of(int).is_greater_than(0),
+    verify_that("fields").are_valid_fields(
+        names.VALID_HISTORY_BATCH_FIELDS, ignore_none=False
+    ),
+    verify_that("adjust_type").is_in({"pre", "none", "post"}),
+)
+def rolling_window(order_book_ids, bar_count, fields, adjust_type="pre"):
+    """
+    订阅多个合约最近 bar_count 个交易日的日线数据。窗口的内容与 :func:`history_bars_batch` 一致，
+    但由引擎在每个交易日开始时增量地追加一行，而不必每次重新读取、复权整个窗口，适用于每个 bar 都要读取同样长度历史数据的策略。
+
+    只能在 init 中创建窗口，请保存在 context 中，之后直接读取即可。读取返回的是窗口缓冲区上的视图，请勿修改。
+    日线、分钟线回测中窗口在每个 bar 开始前更新；tick 回测中没有 bar 事件，窗口在读取时按当前时间更新，内容同样与
+    :func:`history_bars_batch` 一致。
+
+    :param order_book_ids: 合约代码列表
+    :type order_book_ids: `list[str]`
+    :param int bar_count: 窗口长度
+    :param fields: 字段，可选字段同 :func:`history_bars`，不包括 datetime
+    :type fields: `str` | `list[str]`
+    :param str adjust_type: 复权类型，默认为前复权 pre；可选 pre, none, post
+
+    :return: `RollingWindow`，window[field] 为 shape 为 (bar_count, len(order_book_ids)) 的 `ndarray`，
+        window.datetime 为对应的交易日
+
+    :example:
+
+    ..  code-block:: python3
+        :linenos:
+
+        def init(context):
+            context.window = rolling_window(['000001.XSHE', '000002.XSHE'], 20, 'close')
+
+        def handle_bar(context, bar_dict):
+            ma20 = context.window['close'].mean(axis=0)
+    """
+    from rqalpha.model.rolling_window import RollingWindow
+
+    order_book_ids = [assure_order_book_id(o) for o in order_book_ids]
+    return RollingWindow(Environment.get_instance(), order_book_ids, bar_count, fields, adjust_type)
+
+
+@export_as_api
+@ExecutionContext.enforce_phase(
+    EXECUTION_PHASE.BEFORE_TRADING,
+    EXECUTION_PHASE.ON_BAR,
+    EXECUTION_PHASE.ON_TICK,
+    EXECUTION_PHASE.AFTER_TRADING,
+    EXECUTION_PHASE.SCHEDULED,
+)
+@apply_rules(
+    verify_that("fields").are_valid_fields(
+        names.VALID_HISTORY_BATCH_FIELDS, ignore_none=False
+    ),
+    verify_that("start_date").is_valid_date(ignore_none=False),
+    verify_that("end_date").is_valid_date(ignore_none=True),
+    verify_that("universe").are_valid_instruments(ignore_none=True),
+)
+def get_panel(fields, start_date, end_date=None, universe=None):
+    """
+    获取按交易日历对齐的截面行情，数据来自 `rqalpha bundle build-panel` 预先生成的 memmap，适用于对全市场做横截面计算。
+
+    返回的价格均未复权；合约在某个交易日没有行情（如未上市、停牌或已退市）时对应位置为 NaN。
+    不指定 universe 时返回的 DataFrame 直接引用 memmap 上的数据，不发生拷贝，请勿修改。
+
+    :param fields: 字段，需在生成 panel 时指定
+    :type fields: `str` | `list[str]`
+    :param start_date: 开始日期
+    :type start_date: `str` | `date` | `datetime` | `pandas.Timestamp`
+    :param end_date: 结束日期，默认为策略当前可以获取到行情的最近一个交易日
+    :type end_date: `str` | `date` | `datetime` | `pandas.Timestamp`
+    :param universe: 合约代码列表，默认为 panel 中的全部合约
+    :type universe: `list[str]`
+
+    :return: `pandas.DataFrame`，index 为交易日，columns 为 order_book_id；fields 为 list 时返回字段到 DataFrame 的 dict
+
+    :example:
+
+    ..  code-block:: python3
+        :linenos:
+
+        [In]
+        logger.info(get_panel('close', '20160701', universe=['000001.XSHE', '000002.XSHE']))
+        [Out]
+                    000001.XSHE  000002.XSHE
+        2016-07-01         8.87        24.43
+        2016-07-04         8.91        24.43
+        2016-07-05         8.90        24.43
+    """
+    env = Environment.get_instance()
+    dt = _get_history_dt("1d", False, "none")[0]
+    now = pd.Timestamp(dt).normalize()
+
+    start_date = pd.Timestamp(start_date)
+    if end_date is None:
+        end_date = now
+    else:
+        end_date = pd.Timestamp(end_date)
+        if end_date > now:
+            raise RQInvalidArgument(
+                "get_panel: {} > now({})".format(end_date, now)
+            )
+
+    if universe is not None:
+        universe = [assure_order_book_id(o) for o in universe]
+    result = env.data_proxy.get_panel(
+        [fields] if isinstance(fields, six.string_types) else list(fields), start_date, end_date, universe
+    )
+    return result[fields] if isinstance(fields, six.string_types) else result
+
+
 @export_as_api
 @ExecutionContext.enforce_phase(
     EXECUTION_PHASE.ON_INIT,
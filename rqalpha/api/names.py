@@ -31,6 +31,8 @@ VALID_HISTORY_FIELDS = [
     "prev_settlement",
 ]
 
+VALID_HISTORY_BATCH_FIELDS = [f for f in VALID_HISTORY_FIELDS if f != "datetime"]
+
 VALID_GET_PRICE_FIELDS = [
     "OpeningPx",
     "ClosingPx",
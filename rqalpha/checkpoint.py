@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import copy
+import multiprocessing
+import os
+import signal
+import sys
+
+import six
+
+from rqalpha import main
+from rqalpha.environment import Environment
+from rqalpha.events import EVENT
+from rqalpha.interface import AbstractMod
+from rqalpha.sweep import suffix_analyser_outputs
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.logger import system_log
+
+MOD_NAME = "checkpoint_fork"
+
+# fork 出的子进程中为 (variant 序号, 回传结果的 Connection)，父进程中为 None
+_child = None
+# 父进程中已 fork 出的子进程，(variant 序号, pid, 接收结果的 Connection)
+_children = []
+
+
+class CheckpointForkMod(AbstractMod):
+    """
+    在 fork_date 收盘结算之后、下一交易日盘前，将当前进程 fork 为多个子进程，各自为 context 设置一组参数后继续回测。
+
+    fork 出的子进程以写时复制的方式共享父进程的全部内存，预热期间积累的账户、持仓、调度器、事件源、各 mod 的状态
+    以及 sys_analyser 已收集的记录都原样保留，因此各个分支的结果与从头运行完全一致。父进程本身继续运行第 0 组参数。
+    各分支 sys_analyser 输出的文件路径加上 variant 的序号作为后缀。
+    """
+
+    def __init__(self):
+        self._env = None
+        self._fork_date = None
+        self._variants = None
+        self._fork = True
+        self._index = 0
+        self._forked = False
+
+    def start_up(self, env, mod_config):
+        self._env = env
+        self._fork_date = mod_config.fork_date
+        self._variants = mod_config.variants
+        self._fork = mod_config.fork
+        self._index = mod_config.index
+        env.event_bus.add_listener(EVENT.PRE_BEFORE_TRADING, self._on_pre_before_trading)
+
+    def tear_down(self, code, exception=None):
+        pass
+
+    @property
+    def forked(self):
+        return self._forked
+
+    def _on_pre_before_trading(self, _):
+        if self._forked or self._env.trading_dt.date() <= self._fork_date:
+            return
+        self._forked = True
+        index = self._fork_children() if self._fork else self._index
+        suffix_analyser_outputs(self._env.config, index)
+
+        ucontext = self._env.user_strategy.user_context
+        for key, value in six.iteritems(self._variants[index]):
+            setattr(ucontext, key, value)
+
+    def _fork_children(self):
+        global _child, _children
+
+        # 避免缓冲区中尚未输出的内容在子进程中重复输出
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for index in range(1, len(self._variants)):
+            reader, writer = multiprocessing.Pipe(duplex=False)
+            pid = os.fork()
+            if pid == 0:
+                reader.close()
+                for _, _, r in _children:
+                    r.close()
+                _children = []
+                _child = index, writer
+                return index
+            writer.close()
+            _children.append((index, pid, reader))
+        system_log.debug("forked {} children at {}".format(len(_children), self._env.trading_dt))
+        return 0
+
+
+def load_mod():
+    return CheckpointForkMod()
+
+
+def _with_fork_mod(config, fork_date, variants, fork, index=0):
+    config = copy.deepcopy(config)
+    setattr(config.mod, MOD_NAME, RqAttrDict({
+        "enabled": True,
+        "lib": __name__,
+        "fork_date": fork_date,
+        "variants": variants,
+        "fork": fork,
+        "index": index,
+    }))
+    return config
+
+
+def run_forked(config, fork_date, variants):
+    """
+    从 config.base.start_date 运行至 fork_date 后，为每组参数分出一个分支继续运行至 config.base.end_date，
+    返回与 variants 顺序一致的运行结果列表，运行失败的分支结果为 None。
+
+    支持 os.fork 的平台上前缀只运行一次；否则每组参数都从头运行，并在 fork_date 之后设置参数。
+
+    :param config: 经过 parse_config 处理的配置
+    :param fork_date: `datetime.date`，该日结算后的状态为各分支共享的起点
+    :param variants: list of dict，各分支在 fork_date 之后设置到 context 上的参数
+    """
+    if not variants:
+        return []
+    if fork_date >= config.base.end_date:
+        raise ValueError("fork date {} should be earlier than end date {}".format(fork_date, config.base.end_date))
+
+    if not hasattr(os, "fork"):
+        system_log.warn("os.fork is not available, run every variant from start date")
+        return [main.run(_with_fork_mod(config, fork_date, variants, False, i)) for i in range(len(variants))]
+
+    global _children
+    _children = []
+    succeeded = False
+    try:
+        result = main.run(_with_fork_mod(config, fork_date, variants, True))
+        if _child is not None:
+            _child[1].send(result)
+            succeeded = True
+            return
+
+        mod = Environment.get_instance().mod_dict.get(MOD_NAME)
+        if mod is None or not mod.forked:
+            # 在 fork_date 之前运行失败
+            results = [None] * len(variants)
+        else:
+            results = [result]
+            for index, pid, reader in _children:
+                try:
+                    results.append(reader.recv())
+                except EOFError:
+                    results.append(None)
+        succeeded = True
+        return results
+    finally:
+        if _child is not None:
+            # 子进程无论成功与否（包括 KeyboardInterrupt、SystemExit）都在此退出，不再返回调用方
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(0 if succeeded else 1)
+        _reap_children(terminate=not succeeded)
+
+
+def _reap_children(terminate):
+    """
+    回收父进程 fork 出的子进程。父进程运行失败时子进程的结果不再被读取，先将其终止
+    """
+    global _children
+    children, _children = _children, []
+    for index, pid, reader in children:
+        reader.close()
+        if terminate:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+        os.waitpid(pid, 0)
@@ -57,9 +57,10 @@ class Executor(object):
             system_log.debug("publish settlement events with calendar_dt={}, trading_dt={}".format(
                 self._env.calendar_dt, self._env.trading_dt
             ))
-            event_bus.publish_event(PRE_SETTLEMENT)
-            event_bus.publish_event(Event(EVENT.SETTLEMENT))
-            event_bus.publish_event(POST_SETTLEMENT)
+            publish_event(PRE_SETTLEMENT)
+            if has_listeners(EVENT.SETTLEMENT):
+                publish_event(Event(EVENT.SETTLEMENT))
+            publish_event(POST_SETTLEMENT)
 
         def check_before_trading(e):
             if self._last_before_trading == event.trading_dt.date():
@@ -74,9 +75,10 @@ class Executor(object):
 
             self._last_before_trading = e.trading_dt.date()
             update_time(e)
-            event_bus.publish_event(PRE_BEFORE_TRADING)
-            event_bus.publish_event(Event(EVENT.BEFORE_TRADING, calendar_dt=e.calendar_dt, trading_dt=e.trading_dt))
-            event_bus.publish_event(POST_BEFORE_TRADING)
+            publish_event(PRE_BEFORE_TRADING)
+            if has_listeners(EVENT.BEFORE_TRADING):
+                publish_event(Event(EVENT.BEFORE_TRADING, calendar_dt=e.calendar_dt, trading_dt=e.trading_dt))
+            publish_event(POST_BEFORE_TRADING)
 
             return True
 
@@ -87,15 +89,18 @@ class Executor(object):
         end_date = self._env.config.base.end_date
         frequency = self._env.config.base.frequency
         event_bus = self._env.event_bus
+        # event_bus 处于编译模式时，没有监听函数的事件直接返回，不再构造和分发
+        publish_event = event_bus.publish_event
+        has_listeners = event_bus.has_listeners
 
         for event in self._env.event_source.events(start_date, end_date, frequency):
             if event.event_type == EVENT.TICK:
                 if check_before_trading(event):
                     continue
                 update_time(event)
-                event_bus.publish_event(PRE_TICK)
-                event_bus.publish_event(event)
-                event_bus.publish_event(POST_TICK)
+                publish_event(PRE_TICK)
+                publish_event(event)
+                publish_event(POST_TICK)
 
             elif event.event_type == EVENT.BAR:
                 if check_before_trading(event):
@@ -103,22 +108,22 @@ class Executor(object):
                 update_time(event)
 
                 bar_dict.update_dt(event.calendar_dt)
-                event_bus.publish_event(PRE_BAR)
+                publish_event(PRE_BAR)
                 event.bar_dict = bar_dict
-                event_bus.publish_event(event)
-                event_bus.publish_event(POST_BAR)
+                publish_event(event)
+                publish_event(POST_BAR)
 
             elif event.event_type == EVENT.BEFORE_TRADING:
                 check_before_trading(event)
 
             elif event.event_type == EVENT.AFTER_TRADING:
                 update_time(event)
-                event_bus.publish_event(PRE_AFTER_TRADING)
-                event_bus.publish_event(event)
-                event_bus.publish_event(POST_AFTER_TRADING)
+                publish_event(PRE_AFTER_TRADING)
+                publish_event(event)
+                publish_event(POST_AFTER_TRADING)
 
             else:
-                event_bus.publish_event(event)
+                publish_event(event)
 
         # publish settlement after last day
         publish_settlement()
@@ -13,69 +13,167 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
 import os
+import time
+import functools
+
 import six
 import numpy as np
 
 from rqalpha.interface import AbstractDataSource
-from rqalpha.utils.py2 import lru_cache
-from rqalpha.utils.datetime_func import convert_date_to_int, convert_int_to_date
+from rqalpha.utils.sized_cache import SizedLRUCache
+from rqalpha.utils.datetime_func import (
+    convert_date_to_int, convert_dt_to_int, convert_dt_to_ms_int, convert_int_to_date, convert_date_to_date_int
+)
+from rqalpha.model.tick import TickObject
 from rqalpha.utils.i18n import gettext as _
+from rqalpha.utils.logger import system_log
 
 from .storages import (
-    DayBarStore, DividendStore, InstrumentStore, TradingDatesStore, YieldCurveStore, SimpleFactorStore,
-    ShareTransformationStore, FutureInfoStore
+    LazyStore, DayBarStore, MmapDayBarStore, MinuteBarStore, TickStore, PanelStore, DividendStore, InstrumentStore,
+    TradingDatesStore, YieldCurveStore, SimpleFactorStore, ShareTransformationStore, FutureInfoStore, PANEL_DIR
 )
 from .converter import (
     StockBarConverter, IndexBarConverter, FutureDayBarConverter, FundDayBarConverter, PublicFundDayBarConverter
 )
 from .date_set import DateSet
-from .adjust import adjust_bars, FIELDS_REQUIRE_ADJUSTMENT
+from .derived_cache import DerivedCache
+from .adjust import adjust_bars, ex_factor_segment, FIELDS_REQUIRE_ADJUSTMENT, PRICE_FIELDS, _factor_for_date
 from .public_fund_commission import PUBLIC_FUND_COMMISSION
 
 
 class BaseDataSource(AbstractDataSource):
-    def __init__(self, path, custom_future_info):
+    def __init__(self, path, custom_future_info, data_cache_mb=None):
         if not os.path.exists(path):
             raise RuntimeError('bundle path {} not exist'.format(os.path.abspath(path)))
 
         def _p(name):
             return os.path.join(path, name)
 
-        self._day_bars = [
-            DayBarStore(_p('stocks.bcolz'), StockBarConverter),
-            DayBarStore(_p('indexes.bcolz'), IndexBarConverter),
-            DayBarStore(_p('futures.bcolz'), FutureDayBarConverter),
-            DayBarStore(_p('funds.bcolz'), FundDayBarConverter),
-        ]
+        # 合约、交易日历、DateSet 等需要预处理的数据缓存在 bundle 的 .cache 目录下
+        self._derived_cache = DerivedCache(path)
 
-        self._instruments = InstrumentStore(_p('instruments.pk'))
-        self._dividends = DividendStore(_p('original_dividends.bcolz'))
-        self._trading_dates = TradingDatesStore(_p('trading_dates.bcolz'))
-        self._yield_curve = YieldCurveStore(_p('yield_curve.bcolz'))
-        self._split_factor = SimpleFactorStore(_p('split_factor.bcolz'))
-        self._ex_cum_factor = SimpleFactorStore(_p('ex_cum_factor.bcolz'))
-        self._share_transformation = ShareTransformationStore(_p('share_transformation.json'))
+        def _day_bar_store(name, converter):
+            # 优先使用 `rqalpha bundle convert` / `rqalpha bundle compile` 生成的 memmap 数据
+            if os.path.exists(_p(name + '.mmap')):
+                return LazyStore(name, MmapDayBarStore, _p(name + '.mmap'), converter)
+            return LazyStore(name, DayBarStore, _p(name + '.bcolz'), converter)
 
-        self._st_stock_days = DateSet(_p('st_stock_days.bcolz'))
-        self._suspend_days = DateSet(_p('suspended_days.bcolz'))
+        # 各 store 均在首次使用时才加载，可以通过 preload 使用线程池并行地预先加载
+        self._day_bars = [
+            _day_bar_store('stocks', StockBarConverter),
+            _day_bar_store('indexes', IndexBarConverter),
+            _day_bar_store('futures', FutureDayBarConverter),
+            _day_bar_store('funds', FundDayBarConverter),
+        ]
 
-        self._future_info_store = FutureInfoStore(_p("future_info.json"), custom_future_info)
+        self._instruments = LazyStore('instruments', self._cached_store(
+            'instruments', 'instruments.pk', InstrumentStore, _p('instruments.pk')
+        ))
+        self._dividends = LazyStore('dividends', DividendStore, _p('original_dividends.bcolz'))
+        self._trading_dates = LazyStore('trading_dates', self._cached_store(
+            'trading_dates', 'trading_dates.bcolz', TradingDatesStore, _p('trading_dates.bcolz')
+        ))
+        self._yield_curve = LazyStore('yield_curve', YieldCurveStore, _p('yield_curve.bcolz'))
+        self._split_factor = LazyStore('split_factor', SimpleFactorStore, _p('split_factor.bcolz'))
+        self._ex_cum_factor = LazyStore('ex_cum_factor', SimpleFactorStore, _p('ex_cum_factor.bcolz'))
+        self._share_transformation = LazyStore(
+            'share_transformation', ShareTransformationStore, _p('share_transformation.json')
+        )
+
+        self._st_stock_days = LazyStore('st_stock_days', self._cached_store(
+            'st_stock_days', 'st_stock_days.bcolz', DateSet, _p('st_stock_days.bcolz')
+        ))
+        self._suspend_days = LazyStore('suspended_days', self._cached_store(
+            'suspended_days', 'suspended_days.bcolz', DateSet, _p('suspended_days.bcolz')
+        ))
+
+        self._future_info_store = LazyStore('future_info', lambda: FutureInfoStore(self._derived_cache.load(
+            'future_info', ['future_info.json'], FutureInfoStore.load_default_data, _p('future_info.json')
+        ), custom_future_info))
+
+        # 分钟线为可选数据，由 `rqalpha bundle ingest-minute` 生成
+        self._minute_bars = LazyStore(
+            'minute_bars', MinuteBarStore, _p('minute_bars')
+        ) if os.path.exists(_p('minute_bars')) else None
+        # tick 为可选数据，由 `rqalpha bundle ingest-tick` 生成
+        self._ticks = LazyStore('ticks', TickStore, _p('ticks')) if os.path.exists(_p('ticks')) else None
+        # 截面数据为可选数据，由 `rqalpha bundle build-panel` 生成
+        self._panel = LazyStore('panel', PanelStore, _p(PANEL_DIR)) if os.path.exists(_p(PANEL_DIR)) else None
+        self._instrument_map = None
+        self._ordinals = {}
+        self._day_rows = {}
+
+        # 转换后的日线、过滤停牌后的日线及复权后的日线共用同一个按字节数限制容量的 LRU 缓存
+        self._day_bars_cache = SizedLRUCache(None if data_cache_mb is None else int(data_cache_mb * 1024 * 1024))
+
+        self._stores = self._day_bars + [
+            self._instruments, self._dividends, self._trading_dates, self._yield_curve, self._split_factor,
+            self._ex_cum_factor, self._share_transformation, self._st_stock_days, self._suspend_days,
+            self._future_info_store
+        ] + [store for store in (self._minute_bars, self._ticks, self._panel) if store is not None]
 
-        self.get_yield_curve = self._yield_curve.get_yield_curve
-        self.get_risk_free_rate = self._yield_curve.get_risk_free_rate
         if os.path.exists(_p('public_funds.bcolz')):
-            self._day_bars.append(DayBarStore(_p('public_funds.bcolz'), PublicFundDayBarConverter))
-            self._public_fund_dividends = DividendStore(_p('public_fund_dividends.bcolz'))
-            self._non_subscribable_days = DateSet(_p('non_subscribable_days.bcolz'))
-            self._non_redeemable_days = DateSet(_p('non_redeemable_days.bcolz'))
+            self._day_bars.append(_day_bar_store('public_funds', PublicFundDayBarConverter))
+            self._public_fund_dividends = LazyStore(
+                'public_fund_dividends', DividendStore, _p('public_fund_dividends.bcolz')
+            )
+            self._non_subscribable_days = LazyStore('non_subscribable_days', self._cached_store(
+                'non_subscribable_days', 'non_subscribable_days.bcolz', DateSet, _p('non_subscribable_days.bcolz')
+            ))
+            self._non_redeemable_days = LazyStore('non_redeemable_days', self._cached_store(
+                'non_redeemable_days', 'non_redeemable_days.bcolz', DateSet, _p('non_redeemable_days.bcolz')
+            ))
+            self._stores += [
+                self._day_bars[-1], self._public_fund_dividends, self._non_subscribable_days,
+                self._non_redeemable_days
+            ]
+
+    def _cached_store(self, name, source, factory, *args):
+        return functools.partial(self._derived_cache.load, name, [source], factory, *args)
+
+    def preload(self, workers=None):
+        """
+        使用线程池并行地加载尚未加载的各个 store
+
+        :param int workers: 线程数，默认为 store 的个数
+        """
+        from multiprocessing.pool import ThreadPool
+
+        stores = [store for store in self._stores if not store.loaded]
+        if not stores:
+            return
+        start = time.time()
+        pool = ThreadPool(workers or len(stores))
+        try:
+            pool.map(lambda store: store.load(), stores)
+        finally:
+            pool.close()
+            pool.join()
+        system_log.debug("{} data stores preloaded in {:.3f}s".format(len(stores), time.time() - start))
 
     def get_dividend(self, order_book_id, public_fund=False):
         if public_fund:
             return self._public_fund_dividends.get_dividend(order_book_id)
         return self._dividends.get_dividend(order_book_id)
 
-    def get_trading_minutes_for(self, order_book_id, trading_dt):
-        raise NotImplementedError
+    def get_dividends_by_book_date(self, date, public_fund=False):
+        if public_fund:
+            if not hasattr(self, '_public_fund_dividends'):
+                return {}
+            return self._public_fund_dividends.get_dividends_by_book_date(convert_date_to_date_int(date))
+        return self._dividends.get_dividends_by_book_date(convert_date_to_date_int(date))
+
+    def get_splits_by_ex_date(self, date):
+        return {
+            o: factors['split_factor'][0] for o, factors in six.iteritems(
+                self._split_factor.get_factors_by_date('ex_date', convert_date_to_int(date))
+            )
+        }
+
+    def get_trading_minutes_for(self, instrument, trading_dt):
+        if self._minute_bars is None:
+            raise NotImplementedError
+        return self._minute_bars.get_trading_minutes(instrument.order_book_id, convert_date_to_date_int(trading_dt))
 
     def get_trading_calendar(self):
         return self._trading_dates.get_trading_calendar()
@@ -83,6 +181,9 @@ class BaseDataSource(AbstractDataSource):
     def get_all_instruments(self):
         return self._instruments.get_all_instruments()
 
+    def get_instrument_indexes(self):
+        return self._instruments.get_instrument_indexes()
+
     def get_share_transformation(self, order_book_id):
         return self._share_transformation.get_share_transformation(order_book_id)
 
@@ -92,6 +193,12 @@ class BaseDataSource(AbstractDataSource):
     def is_st_stock(self, order_book_id, dates):
         return self._st_stock_days.contains(order_book_id, dates)
 
+    def is_suspended_batch(self, order_book_ids, dt):
+        return self._suspend_days.contains_batch(order_book_ids, dt)
+
+    def is_st_stock_batch(self, order_book_ids, dt):
+        return self._st_stock_days.contains_batch(order_book_ids, dt)
+
     INSTRUMENT_TYPE_MAP = {
         'CS': 0,
         'INDX': 1,
@@ -107,23 +214,48 @@ class BaseDataSource(AbstractDataSource):
     def _index_of(self, instrument):
         return self.INSTRUMENT_TYPE_MAP[instrument.type]
 
-    @lru_cache(None)
     def _all_day_bars_of(self, instrument):
+        key = 'all', instrument.order_book_id
+        try:
+            return self._day_bars_cache[key]
+        except KeyError:
+            pass
         i = self._index_of(instrument)
-        return self._day_bars[i].get_bars(instrument.order_book_id, fields=None)
+        bars = self._day_bars_cache[key] = self._day_bars[i].get_bars(instrument.order_book_id, fields=None)
+        return bars
 
-    @lru_cache(None)
     def _filtered_day_bars(self, instrument):
+        key = 'filtered', instrument.order_book_id
+        try:
+            return self._day_bars_cache[key]
+        except KeyError:
+            pass
         bars = self._all_day_bars_of(instrument)
-        return bars[bars['volume'] > 0]
+        bars = self._day_bars_cache[key] = bars[bars['volume'] > 0]
+        return bars
+
+    def get_day_bars_cache_info(self):
+        return self._day_bars_cache.cache_info()
 
     def get_bar(self, instrument, dt, frequency):
+        if frequency == '1m' and self._minute_bars is not None:
+            return self._minute_bars.get_bar(instrument.order_book_id, np.uint64(convert_dt_to_int(dt)))
         if frequency != '1d':
             raise NotImplementedError
 
         bars = self._all_day_bars_of(instrument)
         if len(bars) <=0 :
             return
+
+        ordinal = self._trading_date_ordinal(dt)
+        if ordinal >= 0:
+            start, rows = self._day_rows_of(instrument)
+            ordinal -= start
+            if ordinal < 0 or ordinal >= len(rows) or rows[ordinal] < 0:
+                return None
+            return bars[rows[ordinal]]
+
+        # 非交易日
         dt = np.uint64(convert_date_to_int(dt))
         pos = bars['datetime'].searchsorted(dt)
         if pos >= len(bars) or bars['datetime'][pos] != dt:
@@ -131,6 +263,107 @@ class BaseDataSource(AbstractDataSource):
 
         return bars[pos]
 
+    def _trading_date_ordinal(self, dt):
+        # dt 在交易日历中的序号，非交易日返回 -1；同一个 dt 的多次 get_bar（如遍历 bar_dict）只换算一次
+        try:
+            return self._ordinals[dt]
+        except KeyError:
+            pass
+        calendar = self._trading_dates.get_trading_date_ints()
+        date_int = convert_date_to_date_int(dt)
+        pos = int(calendar.searchsorted(date_int))
+        ordinal = pos if pos < len(calendar) and calendar[pos] == date_int else -1
+        if len(self._ordinals) >= 64:
+            self._ordinals.clear()
+        self._ordinals[dt] = ordinal
+        return ordinal
+
+    def _day_rows_of(self, instrument):
+        """
+        合约的交易日序号到日线行号的映射，返回 (start, rows)：交易日序号为 start + i 的日线位于第 rows[i] 行，
+        无数据（如停牌）为 -1。映射只覆盖合约有数据的交易日区间，每个交易日仅占 4 字节，不参与日线缓存的淘汰。
+        """
+        try:
+            return self._day_rows[instrument.order_book_id]
+        except KeyError:
+            pass
+        bars = self._all_day_bars_of(instrument)
+        calendar = self._trading_dates.get_trading_date_ints()
+        dates = bars['datetime'] // 1000000
+        ordinals = calendar.searchsorted(dates)
+        valid = ordinals < len(calendar)
+        valid[valid] = calendar[ordinals[valid]] == dates[valid]
+        if not valid.any():
+            rows = self._day_rows[instrument.order_book_id] = 0, np.empty(0, dtype=np.int32)
+            return rows
+        start = ordinals[valid][0]
+        rows = np.full(ordinals[valid][-1] - start + 1, -1, dtype=np.int32)
+        rows[ordinals[valid] - start] = np.nonzero(valid)[0]
+        rows = self._day_rows[instrument.order_book_id] = int(start), rows
+        return rows
+
+    def _prev_values_of(self, instrument, field):
+        """
+        合约每个交易日的前一根日线（不跳过停牌日）的 field 及其复权因子，返回 (start, values, factors, ex_factors)：
+        交易日序号为 start + i 的交易日对应 values[i]，晚于最后一根日线的交易日均对应最后一根日线。
+        无需复权时 factors 为 None。
+        """
+        key = 'prev', field, instrument.order_book_id
+        try:
+            return self._day_bars_cache[key]
+        except KeyError:
+            pass
+
+        bars = self._all_day_bars_of(instrument)
+        if len(bars) == 0 or field not in bars.dtype.names:
+            columns = self._day_bars_cache[key] = 0, np.empty(0), None, None
+            return columns
+
+        calendar = self._trading_dates.get_trading_date_ints()
+        dates = bars['datetime'] // 1000000
+        start = int(calendar.searchsorted(dates[0], side='right'))
+        end = min(int(calendar.searchsorted(dates[-1], side='right')) + 1, len(calendar))
+        rows = dates.searchsorted(calendar[start:end]) - 1
+        values = bars[field].take(rows)
+
+        ex_factors = None
+        factors = None
+        if field in PRICE_FIELDS and instrument.type not in {'Future', 'INDX'}:
+            ex_factors = self.get_ex_cum_factor(instrument.order_book_id)
+            if ex_factors is not None and len(ex_factors) > 0:
+                # 与 adjust_bars 相同的取法
+                factors = ex_factors['ex_cum_factor'].take(
+                    ex_factors['start_date'].searchsorted(bars['datetime'], side='right') - 1
+                ).take(rows)
+            else:
+                ex_factors = None
+
+        columns = self._day_bars_cache[key] = start, values, factors, ex_factors
+        return columns
+
+    def _get_prev_value(self, instrument, dt, field):
+        ordinal = self._trading_date_ordinal(dt)
+        if ordinal <= 0:
+            # 非交易日及交易日历的第一天（没有前一交易日）
+            return None
+        start, values, factors, ex_factors = self._prev_values_of(instrument, field)
+        i = ordinal - start
+        if i < 0 or len(values) == 0:
+            return np.nan
+        i = min(i, len(values) - 1)
+        if factors is None:
+            return values[i]
+        base = _factor_for_date(
+            ex_factors['start_date'], ex_factors['ex_cum_factor'], np.uint64(convert_date_to_int(dt))
+        )
+        return values[i] * (factors[i] / base)
+
+    def get_prev_close(self, instrument, dt):
+        return self._get_prev_value(instrument, dt, 'close')
+
+    def get_prev_settlement(self, instrument, dt):
+        return self._get_prev_value(instrument, dt, 'settlement')
+
     def get_settle_price(self, instrument, date):
         bar = self.get_bar(instrument, date, '1d')
         if bar is None:
@@ -154,13 +387,12 @@ class BaseDataSource(AbstractDataSource):
     def history_bars(self, instrument, bar_count, frequency, fields, dt,
                      skip_suspended=True, include_now=False,
                      adjust_type='pre', adjust_orig=None):
+        if frequency == '1m' and self._minute_bars is not None:
+            return self._history_minute_bars(instrument, bar_count, fields, dt, adjust_type, adjust_orig)
         if frequency != '1d':
             raise NotImplementedError
 
-        if skip_suspended and instrument.type == 'CS':
-            bars = self._filtered_day_bars(instrument)
-        else:
-            bars = self._all_day_bars_of(instrument)
+        bars = self._day_bars_for(instrument, fields, skip_suspended, adjust_type, adjust_orig)
 
         if not self._are_fields_valid(fields, bars.dtype.names):
             return None
@@ -172,15 +404,89 @@ class BaseDataSource(AbstractDataSource):
         i = bars['datetime'].searchsorted(dt, side='right')
         left = i - bar_count if i >= bar_count else 0
         bars = bars[left:i]
+        return bars if fields is None else bars[fields]
+
+    def _history_minute_bars(self, instrument, bar_count, fields, dt, adjust_type, adjust_orig):
+        if not self._are_fields_valid(fields, self._minute_bars.fields + ['datetime']):
+            return None
+
+        names = None if fields is None else [fields] if isinstance(fields, six.string_types) else list(fields)
+        bars = self._minute_bars.get_bars(instrument.order_book_id, np.uint64(convert_dt_to_int(dt)), bar_count, names)
+
         if adjust_type == 'none' or instrument.type in {'Future', 'INDX'}:
-            # 期货及指数无需复权
             return bars if fields is None else bars[fields]
+        return adjust_bars(bars, self.get_ex_cum_factor(instrument.order_book_id), fields, adjust_type, adjust_orig)
+
+    def _day_bars_for(self, instrument, fields, skip_suspended, adjust_type, adjust_orig):
+        skip_suspended = skip_suspended and instrument.type == 'CS'
+        bars = self._filtered_day_bars(instrument) if skip_suspended else self._all_day_bars_of(instrument)
 
+        if adjust_type == 'none' or instrument.type in {'Future', 'INDX'}:
+            # 期货及指数无需复权
+            return bars
         if isinstance(fields, str) and fields not in FIELDS_REQUIRE_ADJUSTMENT:
-            return bars if fields is None else bars[fields]
+            return bars
+
+        ex_factors = self.get_ex_cum_factor(instrument.order_book_id)
+        if ex_factors is None or len(bars) == 0:
+            return bars
+
+        # 复权后的整段行情按除权区间缓存，复权基准未跨越除权日时 history_bars 只需切片
+        key = 'adjusted', instrument.order_book_id, skip_suspended, adjust_type
+        segment = ex_factor_segment(ex_factors, adjust_type, adjust_orig)
+        try:
+            cached_segment, adjusted = self._day_bars_cache[key]
+            if cached_segment == segment:
+                return adjusted
+        except KeyError:
+            pass
+
+        adjusted = adjust_bars(bars, ex_factors, None, adjust_type, adjust_orig)
+        if adjusted is bars:
+            self._day_bars_cache.pop(key)
+        else:
+            self._day_bars_cache[key] = segment, adjusted
+        return adjusted
 
-        return adjust_bars(bars, self.get_ex_cum_factor(instrument.order_book_id),
-                           fields, adjust_type, adjust_orig)
+    def history_bars_batch(self, instruments, bar_count, frequency, fields, dt,
+                           include_now=False, adjust_type='pre', adjust_orig=None):
+        if frequency != '1d':
+            raise NotImplementedError
+
+        # 按交易日历对齐，缺失的数据（未上市、已退市等）以 NaN 填充
+        calendar = self._trading_dates.get_trading_date_ints()
+        right = calendar.searchsorted(convert_date_to_date_int(dt), side='right')
+        dates = calendar[max(right - bar_count, 0):right].astype(np.uint64) * np.uint64(1000000)
+
+        names = [fields] if isinstance(fields, six.string_types) else list(fields)
+        result = np.empty((len(dates), len(instruments)), dtype=[(f, np.float64) for f in names])
+        for f in names:
+            result[f] = np.nan
+
+        if len(dates) > 0:
+            for col, instrument in enumerate(instruments):
+                bars = self._day_bars_for(instrument, fields, False, adjust_type, adjust_orig)
+                available = [f for f in names if f in bars.dtype.names]
+                if len(bars) == 0 or not available:
+                    continue
+                left = bars['datetime'].searchsorted(dates[0])
+                right = bars['datetime'].searchsorted(dates[-1], side='right')
+                if left >= right:
+                    continue
+                bars = bars[left:right]
+                rows = dates.searchsorted(bars['datetime'])
+                for f in available:
+                    result[f][rows, col] = bars[f]
+
+        return result[fields] if isinstance(fields, six.string_types) else result
+
+    def get_panel(self, fields, start_date, end_date, instruments=None):
+        if self._panel is None:
+            raise NotImplementedError
+        order_book_ids = None if instruments is None else [i.order_book_id for i in instruments]
+        return self._panel.get_panel(
+            fields, convert_date_to_date_int(start_date), convert_date_to_date_int(end_date), order_book_ids
+        )
 
     def get_yield_curve(self, start_date, end_date, tenor=None):
         return self._yield_curve.get_yield_curve(start_date, end_date, tenor)
@@ -188,6 +494,9 @@ class BaseDataSource(AbstractDataSource):
     def get_risk_free_rate(self, start_date, end_date):
         return self._yield_curve.get_risk_free_rate(start_date, end_date)
 
+    def get_risk_free_rates(self, dates, tenor):
+        return self._yield_curve.get_risk_free_rates(dates, tenor)
+
     def current_snapshot(self, instrument, frequency, dt):
         raise NotImplementedError
 
@@ -198,9 +507,36 @@ class BaseDataSource(AbstractDataSource):
         if frequency in ['tick', '1d']:
             s, e = self._day_bars[self.INSTRUMENT_TYPE_MAP['INDX']].get_date_range('000001.XSHG')
             return convert_int_to_date(s).date(), convert_int_to_date(e).date()
+        if frequency == '1m' and self._minute_bars is not None:
+            s, e = self._minute_bars.get_date_range()
+            return convert_int_to_date(s).date(), convert_int_to_date(e).date()
 
-    def get_ticks(self, order_book_id, date):
-        raise NotImplementedError
+    def _to_ticks(self, instrument, records):
+        return [TickObject(instrument, self._ticks.to_tick_dict(r)) for r in records]
+
+    def get_ticks(self, instrument, date):
+        if self._ticks is None:
+            raise NotImplementedError
+        return self._to_ticks(instrument, self._ticks.get_ticks(
+            instrument.order_book_id, convert_date_to_date_int(date)
+        ))
+
+    def history_ticks(self, instrument, count, dt):
+        if self._ticks is None:
+            raise NotImplementedError
+        return self._to_ticks(instrument, self._ticks.get_ticks_until(
+            instrument.order_book_id, np.uint64(convert_dt_to_ms_int(dt)), count
+        ))
+
+    def get_merge_ticks(self, order_book_id_list, trading_date, last_dt=None):
+        if self._ticks is None:
+            raise NotImplementedError
+        if self._instrument_map is None:
+            self._instrument_map = {i.order_book_id: i for i in self.get_all_instruments()}
+        if last_dt is not None:
+            last_dt = np.uint64(convert_dt_to_ms_int(last_dt))
+        merged = self._ticks.merge_ticks(order_book_id_list, convert_date_to_date_int(trading_date), last_dt)
+        return (TickObject(self._instrument_map[o], self._ticks.to_tick_dict(r)) for o, r in merged)
 
     def public_fund_commission(self, instrument, buy):
         if buy:
@@ -35,6 +35,13 @@ def _factor_for_date(dates, factors, d):
     return factors[pos-1]
 
 
+def ex_factor_segment(ex_factors, adjust_type, adjust_orig):
+    # 复权基准所在的除权区间，只有该区间发生变化时前复权的结果才会改变
+    if adjust_type != 'pre':
+        return None
+    return bisect_right(ex_factors['start_date'], np.uint64(convert_date_to_int(adjust_orig)))
+
+
 def adjust_bars(bars, ex_factors, fields, adjust_type, adjust_orig):
     if ex_factors is None or len(bars) == 0:
         return bars if fields is None else bars[fields]
@@ -41,10 +41,23 @@ class Converter(object):
         except KeyError:
             return dt
 
+    def compile(self, name, data, float_dtype):
+        # 供 `rqalpha bundle compile` 预先转换数据使用；成交量等取整到个位的字段始终保留 float64，避免大数精度损失
+        result = self.convert(name, data)
+        try:
+            r = self._rules[name]
+        except KeyError:
+            return result
+        return result.astype(float_dtype) if r.round else result
+
 
 float64 = np.dtype("float64")
 
 
+# 已经由 `rqalpha bundle compile` 转换过的数据无需再次转换，MmapDayBarStore 读取时直接返回 memmap 上的视图
+CompiledBarConverter = Converter({})
+
+
 StockBarConverter = Converter(
     {
         "open": Rule(float64, 1 / 10000.0, 2),
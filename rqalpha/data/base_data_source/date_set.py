@@ -14,40 +14,81 @@
 
 import bcolz
 import numpy as np
+import pandas as pd
 
-from rqalpha.utils.py2 import lru_cache
+
+def _to_date_ints(dates):
+    # 将 datetime/date/Timestamp/int(YYYYMMDD 或 YYYYMMDDHHMMSS) 序列统一转换为 YYYYMMDD 的整数数组
+    if isinstance(dates, pd.DatetimeIndex):
+        return np.asarray(dates.year * 10000 + dates.month * 100 + dates.day, dtype=np.int64)
+    arr = np.asarray(dates)
+    if arr.dtype.kind in 'iu':
+        arr = arr.astype(np.int64)
+        return np.where(arr > 100000000, arr // 1000000, arr)
+    if arr.dtype.kind == 'M':
+        return _to_date_ints(pd.DatetimeIndex(arr))
+    return np.array([
+        (int(d // 1000000) if d > 100000000 else int(d)) if isinstance(d, (int, np.integer))
+        else d.year * 10000 + d.month * 100 + d.day
+        for d in dates
+    ], dtype=np.int64)
 
 
 class DateSet(object):
     def __init__(self, f):
         dates = bcolz.open(f, 'r')
         self._index = dates.attrs['line_map']
-        self._dates = dates[:]
-
-    @lru_cache(None)
-    def _get_set(self, s, e):
-        return set(self._dates[s:e].tolist())
+        # 每个合约对应的日期片段在 bundle 中已按升序排列，这里直接保留为 uint32 数组
+        self._dates = dates[:].astype(np.uint32)
+        self._by_date = None
 
-    def get_days(self, order_book_id):
+    def _get_dates(self, order_book_id):
         try:
             s, e = self._index[order_book_id]
         except KeyError:
-            return []
+            return None
+        return self._dates[s:e]
 
-        return self._get_set(s, e)
+    def get_days(self, order_book_id):
+        dates = self._get_dates(order_book_id)
+        if dates is None:
+            return []
+        return set(dates.tolist())
 
     def contains(self, order_book_id, dates):
-        try:
-            s, e = self._index[order_book_id]
-        except KeyError:
-            return [False] * len(dates)
+        date_ints = _to_date_ints(dates)
+        days = self._get_dates(order_book_id)
+        if days is None or len(days) == 0:
+            return [False] * len(date_ints)
 
-        def _to_dt_int(d):
-            if isinstance(d, (int, np.int64, np.uint64)):
-                return int(d // 1000000) if d > 100000000 else int(d)
-            else:
-                return d.year*10000 + d.month*100 + d.day
+        pos = days.searchsorted(date_ints)
+        pos[pos == len(days)] = 0
+        return (days[pos] == date_ints).tolist()
+
+    def _build_date_index(self):
+        # 按日期重排 (日期, 合约) 对，以便一次性查出某日落在集合中的全部合约
+        codes = np.full(len(self._dates), -1, dtype=np.int32)
+        order_book_ids = list(self._index)
+        for code, order_book_id in enumerate(order_book_ids):
+            s, e = self._index[order_book_id]
+            codes[s:e] = code
+        order = np.argsort(self._dates, kind='mergesort')
+        self._by_date = (
+            self._dates[order], codes[order], {o: i for i, o in enumerate(order_book_ids)}
+        )
+        return self._by_date
 
-        date_set = self._get_set(s, e)
+    def contains_batch(self, order_book_ids, date):
+        """
+        批量判断多个合约在某一日期是否落在集合中
 
-        return [(_to_dt_int(d) in date_set) for d in dates]
+        :param order_book_ids: 合约代码列表
+        :param date: 查询日期
+        :return: `numpy.ndarray` 与 order_book_ids 等长的 bool 数组
+        """
+        sorted_dates, sorted_codes, code_map = self._by_date or self._build_date_index()
+        date_int = _to_date_ints([date])[0]
+        left = sorted_dates.searchsorted(date_int)
+        right = sorted_dates.searchsorted(date_int, side='right')
+        codes = np.array([code_map.get(o, -1) for o in order_book_ids], dtype=np.int32)
+        return (codes >= 0) & np.isin(codes, sorted_codes[left:right])
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import os
+import sys
+import pickle
+import importlib
+
+import six
+
+from rqalpha.utils.logger import system_log
+
+CACHE_DIR = '.cache'
+# 缓存内容的格式发生变化时递增
+CACHE_VERSION = 2
+
+
+class _ClassRecorder(pickle.Unpickler):
+    # 记录反序列化过程中引用到的全部类（及函数）所在的模块
+    def __init__(self, f):
+        pickle.Unpickler.__init__(self, f)
+        self.modules = set()
+
+    def find_class(self, module, name):
+        self.modules.add(module)
+        return pickle.Unpickler.find_class(self, module, name)
+
+
+def _module_fingerprint(module_names):
+    fingerprint = []
+    for name in sorted(module_names):
+        try:
+            module = sys.modules.get(name) or importlib.import_module(name)
+        except ImportError:
+            fingerprint.append((name, None))
+            continue
+        path = getattr(module, '__file__', None)
+        if path is None:
+            continue
+        stat = os.stat(path)
+        fingerprint.append((name, stat.st_size, stat.st_mtime))
+    return fingerprint
+
+
+class DerivedCache(object):
+    """
+    bundle 衍生数据的持久化缓存，保存在 <bundle>/.cache/v<CACHE_VERSION>/ 下。
+
+    每个缓存项记录生成它所依赖的 bundle 文件、定义 builder 的模块以及缓存对象中各个类所在模块的文件大小和修改时间，
+    bundle 更新或相关代码修改后自动失效重建。
+    缓存目录不可写（如只读的 bundle）时仅退化为每次重新计算。
+    """
+
+    def __init__(self, bundle_path):
+        from rqalpha import __version__
+
+        self._bundle_path = bundle_path
+        self._cache_dir = os.path.join(bundle_path, CACHE_DIR, 'v{}'.format(CACHE_VERSION))
+        # 缓存的对象由 pickle 序列化，rqalpha 或 Python 版本变化时同样需要失效
+        self._version = (__version__, sys.version_info[:2])
+
+    def _fingerprint(self, sources, builder=None):
+        # builder 的逻辑改变（即使版本号不变）后旧的缓存同样不再可用
+        module = getattr(builder, '__module__', None)
+        fingerprint = [self._version, _module_fingerprint([module] if module else [])]
+        for source in sources:
+            path = os.path.join(self._bundle_path, source)
+            if os.path.isdir(path):
+                for root, dirs, files in os.walk(path):
+                    dirs.sort()
+                    for name in sorted(files):
+                        stat = os.stat(os.path.join(root, name))
+                        fingerprint.append((os.path.relpath(os.path.join(root, name), self._bundle_path),
+                                            stat.st_size, stat.st_mtime))
+            else:
+                stat = os.stat(path)
+                fingerprint.append((source, stat.st_size, stat.st_mtime))
+        return fingerprint
+
+    def load(self, name, sources, builder, *args):
+        """
+        读取缓存项 name，缓存不存在或已失效时调用 builder(*args) 重新生成并写入缓存
+
+        :param str name: 缓存项名称
+        :param list sources: 缓存项所依赖的 bundle 中的文件（或目录），相对于 bundle 的路径
+        """
+        path = os.path.join(self._cache_dir, name + '.pkl')
+        fingerprint = self._fingerprint(sources, builder)
+        try:
+            with open(path, 'rb') as f:
+                # 先校验 bundle 文件及缓存对象所引用的类的模块，都未变化时才反序列化缓存的对象
+                if pickle.load(f) == fingerprint:
+                    module_fingerprint, modules = pickle.load(f), pickle.load(f)
+                    if module_fingerprint == _module_fingerprint(modules):
+                        return pickle.load(f)
+        except Exception:
+            # 缓存不存在、已损坏或无法反序列化，都重新生成
+            pass
+
+        value = builder(*args)
+        tmp = '{}.{}.tmp'.format(path, os.getpid())
+        try:
+            if not os.path.exists(self._cache_dir):
+                os.makedirs(self._cache_dir)
+            payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            recorder = _ClassRecorder(six.BytesIO(payload))
+            recorder.load()
+            modules = sorted(recorder.modules)
+            with open(tmp, 'wb') as f:
+                pickle.dump(fingerprint, f, protocol=2)
+                pickle.dump(_module_fingerprint(modules), f, protocol=2)
+                pickle.dump(modules, f, protocol=2)
+                f.write(payload)
+            # 先写临时文件再替换，并发启动的多个进程不会读到写了一半的缓存
+            os.rename(tmp, path)
+        except Exception as e:
+            system_log.debug("failed to write derived cache {}: {}".format(name, e))
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        return value
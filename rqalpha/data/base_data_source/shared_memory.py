@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import os
+import pickle
+import shutil
+import tempfile
+
+import numpy as np
+
+from rqalpha.utils.logger import system_log
+
+from rqalpha.data.base_data_source import BaseDataSource
+
+from .storages import LazyStore, RecordDayBarStore, SimpleFactorStore, TradingDatesStore
+from .date_set import DateSet
+
+SHM_META_FILE = 'meta.pk'
+SHM_PREFIX = 'rqalpha-'
+# 转换后的日线、交易日历、除权因子及 DateSet，其余数据仍由各进程自行从 bundle（及其 .cache）加载
+SHM_DATE_SETS = (
+    ('st_stock_days', '_st_stock_days'),
+    ('suspended_days', '_suspend_days'),
+    ('non_subscribable_days', '_non_subscribable_days'),
+    ('non_redeemable_days', '_non_redeemable_days'),
+)
+
+
+def default_shm_root():
+    # Linux 下 /dev/shm 为 tmpfs，其中的文件即 POSIX 共享内存；其他平台退化为临时目录下的文件映射
+    return '/dev/shm' if os.path.isdir('/dev/shm') else tempfile.gettempdir()
+
+
+def shm_path_of(name, root=None):
+    return os.path.join(root or default_shm_root(), SHM_PREFIX + name)
+
+
+def _save(path, name, array):
+    np.save(os.path.join(path, name + '.npy'), np.ascontiguousarray(array))
+
+
+def _load(path, name):
+    return np.load(os.path.join(path, name + '.npy'), mmap_mode='r')
+
+
+def publish_bundle(data_source, name, root=None):
+    """
+    将数据源中转换后的日线、交易日历、除权因子及 DateSet 发布到共享内存，返回发布的路径。
+    同一台机器上的多个回测进程可以通过 SharedMemoryDataSource 以只读方式共享这一份数据。
+
+    :param BaseDataSource data_source: 发布数据的数据源
+    :param str name: 共享内存的名称
+    :param str root: 共享内存所在的目录，默认为 /dev/shm
+    """
+    target = shm_path_of(name, root)
+    tmp = '{}.{}.tmp'.format(target, os.getpid())
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    meta = {'day_bars': [], 'date_sets': {}}
+    try:
+        for store in data_source._day_bars:
+            index = store.load()._index
+            order_book_ids = sorted(index)
+            line_map, length, dtype = {}, 0, None
+            for order_book_id in order_book_ids:
+                s, e = index[order_book_id]
+                line_map[order_book_id] = (length, length + e - s)
+                length += e - s
+            # 逐个合约转换并写入 memmap，整张表不需要同时放在内存中
+            for order_book_id in order_book_ids:
+                bars = store.get_bars(order_book_id)
+                if dtype is None:
+                    dtype = bars.dtype
+                    table = np.lib.format.open_memmap(
+                        os.path.join(tmp, store.name + '.npy'), mode='w+', dtype=dtype, shape=(length, )
+                    )
+                s, e = line_map[order_book_id]
+                table[s:e] = bars
+            if dtype is None:
+                _save(tmp, store.name, store.get_bars(None))
+            else:
+                table.flush()
+                del table
+            meta['day_bars'].append((store.name, line_map))
+
+        _save(tmp, 'trading_dates', data_source._trading_dates.get_trading_date_ints())
+
+        ex_cum_factor = data_source._ex_cum_factor.load()
+        _save(tmp, 'ex_cum_factor', ex_cum_factor._table)
+        meta['ex_cum_factor'] = ex_cum_factor._index
+
+        for date_set_name, attr in SHM_DATE_SETS:
+            store = getattr(data_source, attr, None)
+            if store is None:
+                continue
+            date_set = store.load()
+            _save(tmp, date_set_name, date_set._dates)
+            meta['date_sets'][date_set_name] = date_set._index
+
+        with open(os.path.join(tmp, SHM_META_FILE), 'wb') as f:
+            pickle.dump(meta, f, protocol=2)
+    except Exception:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+    # 先写入临时目录再整体替换，正在启动的进程不会读到写了一半的数据
+    shutil.rmtree(target, ignore_errors=True)
+    os.rename(tmp, target)
+    system_log.debug("bundle published to shared memory {}".format(target))
+    return target
+
+
+def release_bundle(name, root=None):
+    """
+    释放 publish_bundle 发布的共享内存。已经打开的进程仍可继续访问，直至其退出
+    """
+    shutil.rmtree(shm_path_of(name, root), ignore_errors=True)
+
+
+class SharedDayBarStore(RecordDayBarStore):
+    # 发布时已经完成了转换，get_bars 直接返回共享内存上的只读视图
+    pass
+
+
+class SharedFactorStore(SimpleFactorStore):
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+        self._by_date = {}
+
+
+class SharedTradingDatesStore(TradingDatesStore):
+    def __init__(self, date_ints):
+        import pandas as pd
+
+        self._date_ints = date_ints
+        self._dates = pd.Index(pd.Timestamp(str(d)) for d in date_ints)
+
+
+class SharedDateSet(DateSet):
+    def __init__(self, dates, index):
+        self._dates = dates
+        self._index = index
+        self._by_date = None
+
+
+class SharedMemoryDataSource(BaseDataSource):
+    """
+    从 publish_bundle 发布的共享内存中读取日线、交易日历、除权因子及 DateSet 的数据源。
+    日线直接以共享内存上的只读视图返回，多个进程同时回测时只占用一份内存。
+
+    :param str path: bundle 路径，合约、分红等其余数据仍从 bundle 读取
+    :param str shm_path: publish_bundle 返回的共享内存路径
+    """
+
+    def __init__(self, path, shm_path, custom_future_info, data_cache_mb=None):
+        super(SharedMemoryDataSource, self).__init__(path, custom_future_info, data_cache_mb)
+        meta_file = os.path.join(shm_path, SHM_META_FILE)
+        if not os.path.exists(meta_file):
+            raise RuntimeError('shared memory bundle {} not exist'.format(shm_path))
+        with open(meta_file, 'rb') as f:
+            meta = pickle.load(f)
+
+        def _store(name, factory, *args):
+            # 共享内存中的数组在首次使用时才映射到本进程
+            return LazyStore(name, lambda: factory(_load(shm_path, name), *args))
+
+        self._day_bars = [_store(name, SharedDayBarStore, line_map) for name, line_map in meta['day_bars']]
+        self._trading_dates = _store('trading_dates', SharedTradingDatesStore)
+        self._ex_cum_factor = _store('ex_cum_factor', SharedFactorStore, meta['ex_cum_factor'])
+        shared = self._day_bars + [self._trading_dates, self._ex_cum_factor]
+        for date_set_name, attr in SHM_DATE_SETS:
+            if date_set_name in meta['date_sets']:
+                store = _store(date_set_name, SharedDateSet, meta['date_sets'][date_set_name])
+                setattr(self, attr, store)
+                shared.append(store)
+
+        names = {store.name for store in shared}
+        self._stores = shared + [store for store in self._stores if store.name not in names]
+
+    def _all_day_bars_of(self, instrument):
+        # 共享内存上的视图无需再放入本进程的缓存
+        return self._day_bars[self._index_of(instrument)].get_bars(instrument.order_book_id)
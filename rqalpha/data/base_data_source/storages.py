@@ -12,9 +12,14 @@
 #         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
+import os
+import time
 import codecs
+import heapq
 import pickle
+import threading
 from copy import copy
+from collections import namedtuple
 
 import six
 import json
@@ -23,9 +28,46 @@ import numpy as np
 import pandas as pd
 
 from rqalpha.utils.i18n import gettext as _
+from rqalpha.utils.logger import system_log
 from rqalpha.const import COMMISSION_TYPE
 from rqalpha.model.instrument import Instrument
 from rqalpha.utils import risk_free_helper
+from rqalpha.data.base_data_source.converter import CompiledBarConverter
+from rqalpha.data.base_data_source.date_set import _to_date_ints
+
+
+class LazyStore(object):
+    """
+    延迟打开的 store：首次访问其属性时才真正构造底层 store，并在 debug 日志中记录加载耗时。
+    加载过程加锁，可以在预加载线程与主线程之间安全地共享。
+    """
+
+    def __init__(self, name, factory, *args):
+        self._name = name
+        self._factory = factory
+        self._args = args
+        self._store = None
+        self._lock = threading.Lock()
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def loaded(self):
+        return self._store is not None
+
+    def load(self):
+        if self._store is None:
+            with self._lock:
+                if self._store is None:
+                    start = time.time()
+                    self._store = self._factory(*self._args)
+                    system_log.debug("data store {} loaded in {:.3f}s".format(self._name, time.time() - start))
+        return self._store
+
+    def __getattr__(self, item):
+        return getattr(self.load(), item)
 
 
 class DayBarStore(object):
@@ -73,6 +115,324 @@ class DayBarStore(object):
         return self._table.cols['date'][s], self._table.cols['date'][e - 1]
 
 
+MMAP_META_FILE = 'meta.json'
+MMAP_LINE_MAP_FILE = 'line_map.json'
+MMAP_RECORDS_FILE = 'records.npy'
+MMAP_RECORDS_LAYOUT = 'records'
+
+MmapTable = namedtuple('MmapTable', ['names', 'cols', 'records'])
+
+
+def open_mmap_table(path):
+    """
+    读取 dump_mmap_table / dump_mmap_records 写出的 memmap 数据，返回 meta、只读的 MmapTable 及 line_map。
+
+    列式布局的 records 为 None；行式布局（compile 生成的日线）的 records 为整张表的结构化 memmap，
+    cols 中的各列均是 records 上的视图。
+    """
+    with open(os.path.join(path, MMAP_META_FILE), 'r') as f:
+        meta = json.load(f)
+    with open(os.path.join(path, MMAP_LINE_MAP_FILE), 'r') as f:
+        index = {k: tuple(v) for k, v in six.iteritems(json.load(f))}
+    if meta.get('layout') == MMAP_RECORDS_LAYOUT:
+        records = np.load(os.path.join(path, MMAP_RECORDS_FILE), mmap_mode='r')
+        table = MmapTable(meta['names'], {name: records[name] for name in meta['names']}, records)
+    else:
+        table = MmapTable(meta['names'], {
+            name: np.load(os.path.join(path, name + '.npy'), mmap_mode='r') for name in meta['names']
+        }, None)
+    return meta, table, index
+
+
+class RecordDayBarStore(DayBarStore):
+    # 已经转换好的行式日线数据（datetime 为 YYYYmmddHHMMSS 格式），get_bars 直接返回 self._records 上的只读视图
+    def __init__(self, records, index):
+        self._records = records
+        self._index = index
+
+    def get_bars(self, order_book_id, fields=None):
+        try:
+            s, e = self._index[order_book_id]
+        except KeyError:
+            s = e = 0
+        bars = self._records[s:e]
+        if fields is None:
+            return bars
+        if isinstance(fields, six.string_types):
+            return bars[fields]
+        fields = [f for f in fields if f != 'datetime']
+        if len(fields) == 1:
+            return bars[fields[0]]
+        # numpy >= 1.16 中多字段索引返回的也是视图，更早的版本返回拷贝
+        return bars[['datetime'] + fields]
+
+    def get_date_range(self, order_book_id):
+        s, e = self._index[order_book_id]
+        return self._records['datetime'][s] // 1000000, self._records['datetime'][e - 1] // 1000000
+
+
+class MmapDayBarStore(RecordDayBarStore):
+    """
+    memmap 格式的日线数据，通过 np.load(mmap_mode='r') 只读打开，多个进程可共享 page cache。
+
+    * `rqalpha bundle compile` 生成的行式布局：get_bars 返回 memmap 上的视图，不拷贝数据
+    * `rqalpha bundle convert` 生成的列式布局：每列一个 .npy 文件，读取时需要经 converter 转换，
+      除已转换过的单个字段外，get_bars 返回的都是拷贝
+    """
+
+    def __init__(self, path, converter):
+        meta, self._table, self._index = open_mmap_table(path)
+        self._records = self._table.records
+        # compiled 的数据已经预先完成了缩放及取整，无需再次转换
+        self._converter = CompiledBarConverter if meta.get('compiled') else converter
+
+    def get_bars(self, order_book_id, fields=None):
+        if self._records is None:
+            return DayBarStore.get_bars(self, order_book_id, None if fields is None else list(fields))
+        return super(MmapDayBarStore, self).get_bars(order_book_id, fields)
+
+    def get_date_range(self, order_book_id):
+        if self._records is None:
+            return DayBarStore.get_date_range(self, order_book_id)
+        return super(MmapDayBarStore, self).get_date_range(order_book_id)
+
+
+MINUTE_BARS_TABLE = 'bars'
+TICKS_TABLE = 'ticks'
+INTRADAY_DAYS_TABLE = 'days'
+
+
+class IntradayStore(object):
+    """
+    日内数据（分钟线、tick），包含两张列式 memmap 表：
+
+    * 数据表：按合约、时间排序，datetime 为整数格式的时间，其余字段均为 float64
+    * days: 每个合约每个交易日一行，记录交易日 date、该日首行数据的行号 start 及其 datetime
+
+    定位某一时点只需要在该合约的交易日索引及当日数据中各做一次二分查找，而不必扫描合约的全部数据。
+    """
+
+    def __init__(self, path, table):
+        meta, self._data, self._index = open_mmap_table(os.path.join(path, table))
+        _, self._days, self._day_index = open_mmap_table(os.path.join(path, INTRADAY_DAYS_TABLE))
+        self._date_range = tuple(meta['date_range'])
+        self._fields = [n for n in self._data.names if n != 'datetime']
+
+    @property
+    def fields(self):
+        return self._fields
+
+    def get_date_range(self):
+        return self._date_range
+
+    def _day_rows(self, order_book_id, pos):
+        # 第 pos 个交易日（合约内的相对位置）在数据表中的行号范围
+        ds, de = self._day_index[order_book_id]
+        start = int(self._days.cols['start'][ds + pos])
+        end = int(self._days.cols['start'][ds + pos + 1]) if ds + pos + 1 < de else self._index[order_book_id][1]
+        return start, end
+
+    def _rows_of_date(self, order_book_id, trading_date):
+        try:
+            ds, de = self._day_index[order_book_id]
+        except KeyError:
+            return None
+        pos = self._days.cols['date'][ds:de].searchsorted(trading_date)
+        if pos >= de - ds or self._days.cols['date'][ds + pos] != trading_date:
+            return None
+        return self._day_rows(order_book_id, pos)
+
+    def _position_until(self, order_book_id, dt):
+        # 合约在 dt（含）之前的最后一行数据之后的行号
+        try:
+            ds, de = self._day_index[order_book_id]
+        except KeyError:
+            return None
+        pos = self._days.cols['datetime'][ds:de].searchsorted(dt, side='right') - 1
+        if pos < 0:
+            return self._index[order_book_id][0]
+        start, end = self._day_rows(order_book_id, pos)
+        return start + int(self._data.cols['datetime'][start:end].searchsorted(dt, side='right'))
+
+    def _to_records(self, s, e, fields=None):
+        fields = self._fields if fields is None else fields
+        dtype = np.dtype([('datetime', np.uint64)] + [(f, np.float64) for f in fields if f != 'datetime'])
+        result = np.empty(shape=(e - s, ), dtype=dtype)
+        for f in dtype.names:
+            result[f] = self._data.cols[f][s:e]
+        return result
+
+    def _records_until(self, order_book_id, dt, count, fields=None):
+        i = self._position_until(order_book_id, dt)
+        if i is None:
+            return self._to_records(0, 0, fields)
+        return self._to_records(max(self._index[order_book_id][0], i - count), i, fields)
+
+
+class MinuteBarStore(IntradayStore):
+    """
+    分钟线数据，由 `rqalpha bundle ingest-minute` 生成，datetime 为 YYYYMMDDHHMMSS 格式的整数
+    """
+
+    def __init__(self, path):
+        super(MinuteBarStore, self).__init__(path, MINUTE_BARS_TABLE)
+
+    def get_bar(self, order_book_id, dt):
+        i = self._position_until(order_book_id, dt)
+        if i is None or i <= self._index[order_book_id][0] or self._data.cols['datetime'][i - 1] != dt:
+            return None
+        return self._to_records(i - 1, i)[0]
+
+    def get_bars(self, order_book_id, dt, bar_count, fields=None):
+        return self._records_until(order_book_id, dt, bar_count, fields)
+
+    def get_trading_minutes(self, order_book_id, trading_date):
+        rows = self._rows_of_date(order_book_id, trading_date)
+        if rows is None:
+            return None
+        return self._data.cols['datetime'][rows[0]:rows[1]].tolist()
+
+
+class TickStore(IntradayStore):
+    """
+    tick 数据，由 `rqalpha bundle ingest-tick` 生成，datetime 为 YYYYMMDDHHMMSSmmm 格式（精确到毫秒）的整数。
+    五档盘口以 a1~a5、a1_v~a5_v、b1~b5、b1_v~b5_v 列保存，转换为 tick 时合并为 asks、ask_vols、bids、bid_vols。
+    """
+
+    DEPTH_FIELDS = (('asks', 'a{}'), ('ask_vols', 'a{}_v'), ('bids', 'b{}'), ('bid_vols', 'b{}_v'))
+    # 逐 tick 归并时每次从 memmap 中读取的行数
+    CHUNK_SIZE = 4096
+
+    def __init__(self, path):
+        super(TickStore, self).__init__(path, TICKS_TABLE)
+        self._depth_fields = [
+            (key, [f for f in (pattern.format(level) for level in range(1, 6)) if f in self._fields])
+            for key, pattern in self.DEPTH_FIELDS
+        ]
+
+    def to_tick_dict(self, record):
+        d = dict(zip(record.dtype.names, record.tolist()))
+        for key, fields in self._depth_fields:
+            if fields:
+                d[key] = [d.pop(f) for f in fields]
+        return d
+
+    def get_ticks(self, order_book_id, trading_date):
+        rows = self._rows_of_date(order_book_id, trading_date)
+        if rows is None:
+            return self._to_records(0, 0)
+        return self._to_records(*rows)
+
+    def get_ticks_until(self, order_book_id, dt, count):
+        return self._records_until(order_book_id, dt, count)
+
+    def _iter_records(self, s, e):
+        for chunk_start in range(s, e, self.CHUNK_SIZE):
+            for record in self._to_records(chunk_start, min(chunk_start + self.CHUNK_SIZE, e)):
+                yield record
+
+    def merge_ticks(self, order_book_ids, trading_date, last_dt=None):
+        """
+        按时间顺序归并多个合约在某一交易日的 tick，惰性地逐个返回 (order_book_id, record)。
+        指定 last_dt 时各合约直接从 last_dt 之后的位置开始读取，不必从当日开头重新扫描。
+        """
+        order_book_ids = list(order_book_ids)
+        heap = []
+        for k, order_book_id in enumerate(order_book_ids):
+            rows = self._rows_of_date(order_book_id, trading_date)
+            if rows is None:
+                continue
+            s, e = rows
+            if last_dt is not None:
+                s += int(self._data.cols['datetime'][s:e].searchsorted(last_dt, side='right'))
+            records = self._iter_records(s, e)
+            for record in records:
+                heap.append((record['datetime'], k, record, records))
+                break
+
+        # k 同时用于区分同一时刻不同合约的 tick，并保证同一合约的 tick 按原有顺序输出
+        heapq.heapify(heap)
+        while heap:
+            dt, k, record, records = heap[0]
+            yield order_book_ids[k], record
+            for record in records:
+                heapq.heapreplace(heap, (record['datetime'], k, record, records))
+                break
+            else:
+                heapq.heappop(heap)
+
+
+PANEL_DIR = 'panel'
+PANEL_DATES_FILE = 'dates.npy'
+
+
+class PanelStore(object):
+    """
+    由 `rqalpha bundle build-panel` 生成的截面数据：每个字段一个 [交易日, 合约] 的 float64 二维数组，
+    行与 bundle 的交易日历对齐，列按 order_book_id 排序，缺失数据为 NaN，价格均未复权。
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, MMAP_META_FILE), 'r') as f:
+            meta = json.load(f)
+        self._order_book_ids = meta['order_book_ids']
+        self._columns = {o: i for i, o in enumerate(self._order_book_ids)}
+        self._date_ints = np.load(os.path.join(path, PANEL_DATES_FILE))
+        self._dates = pd.DatetimeIndex([pd.Timestamp(str(d)) for d in self._date_ints])
+        self._fields = {f: np.load(os.path.join(path, f + '.npy'), mmap_mode='r') for f in meta['names']}
+
+    @property
+    def fields(self):
+        return list(self._fields)
+
+    def get_panel(self, fields, start_date, end_date, order_book_ids=None):
+        """
+        :param list fields: 字段列表
+        :param int start_date: YYYYMMDD 格式的开始日期（含）
+        :param int end_date: YYYYMMDD 格式的结束日期（含）
+        :param list order_book_ids: 合约列表，为 None 时返回全部合约
+
+        :return: dict，字段到 `pandas.DataFrame` 的映射。order_book_ids 为 None 时 DataFrame 直接引用 memmap 上的数据，
+            否则按列取出（不在 panel 中的合约为 NaN）
+        """
+        s = self._date_ints.searchsorted(start_date)
+        e = self._date_ints.searchsorted(end_date, side='right')
+        index = self._dates[s:e]
+        if order_book_ids is None:
+            return {f: pd.DataFrame(
+                self._fields[f][s:e], index=index, columns=self._order_book_ids, copy=False
+            ) for f in fields}
+
+        columns = np.array([self._columns.get(o, -1) for o in order_book_ids], dtype=np.int64)
+        missing = columns < 0
+        result = {}
+        for f in fields:
+            values = self._fields[f][s:e].take(columns, axis=1)
+            values[:, missing] = np.nan
+            result[f] = pd.DataFrame(values, index=index, columns=list(order_book_ids), copy=False)
+        return result
+
+
+def index_by_date(dates, index):
+    """
+    按日期重新索引按合约存放、合约内按日期升序排列的表
+
+    :param dates: 日期列
+    :param dict index: line_map，合约到行号范围 (s, e) 的映射
+    :return: dict，日期到 [(order_book_id, s, e), ...] 的映射，(s, e) 为该合约在该日期的行号范围
+    """
+    by_date = {}
+    for order_book_id, (s, e) in six.iteritems(index):
+        d = dates[s:e]
+        if len(d) == 0:
+            continue
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(d)) + 1))
+        ends = np.concatenate((starts[1:], [len(d)]))
+        for i, j in zip(starts.tolist(), ends.tolist()):
+            by_date.setdefault(int(d[i]), []).append((order_book_id, s + i, s + j))
+    return by_date
+
+
 class DividendStore(object):
     def __init__(self, f):
         ct = bcolz.open(f, 'r')
@@ -88,6 +448,7 @@ class DividendStore(object):
         self._table['payable_date'][:] = ct['payable_date']
         self._table['dividend_cash_before_tax'] = ct['cash_before_tax'][:] / 10000.0
         self._table['round_lot'][:] = ct['round_lot']
+        self._by_book_date = None
 
     def get_dividend(self, order_book_id):
         try:
@@ -97,6 +458,15 @@ class DividendStore(object):
 
         return self._table[s:e]
 
+    def get_dividends_by_book_date(self, date):
+        """
+        :param int date: YYYYMMDD 格式的股权登记日
+        :return: dict，合约到该日登记的分红记录的映射
+        """
+        if self._by_book_date is None:
+            self._by_book_date = index_by_date(self._table['book_closure_date'], self._index)
+        return {o: self._table[s:e] for o, s, e in self._by_book_date.get(date, ())}
+
 
 class FutureInfoStore(object):
     COMMISSION_TYPE_MAP = {
@@ -104,15 +474,19 @@ class FutureInfoStore(object):
         "by_money": COMMISSION_TYPE.BY_MONEY
     }
 
-    def __init__(self, f, custom_future_info):
+    def __init__(self, default_data, custom_future_info):
+        self._default_data = default_data
+        self._custom_data = custom_future_info
+        self._future_info = {}
+
+    @classmethod
+    def load_default_data(cls, f):
         with open(f, "r") as json_file:
-            self._default_data = {
-                item.get("order_book_id") or item.get("underlying_symbol"): self._process_future_info_item(
+            return {
+                item.get("order_book_id") or item.get("underlying_symbol"): cls._process_future_info_item(
                     item
                 ) for item in json.load(json_file)
             }
-        self._custom_data = custom_future_info
-        self._future_info = {}
 
     @classmethod
     def _process_future_info_item(cls, item):
@@ -136,13 +510,20 @@ class FutureInfoStore(object):
 
 class InstrumentStore(object):
     def __init__(self, f):
+        from rqalpha.data.instrument_mixin import build_instrument_indexes
+
         with open(f, 'rb') as store:
             d = pickle.load(store)
         self._instruments = [Instrument(i) for i in d]
+        # 与合约对象一同构造（及缓存）InstrumentMixin 所需的索引，二者引用同一批 Instrument 对象
+        self._indexes = build_instrument_indexes(self._instruments)
 
     def get_all_instruments(self):
         return self._instruments
 
+    def get_instrument_indexes(self):
+        return self._indexes
+
 
 class ShareTransformationStore(object):
     def __init__(self, f):
@@ -162,6 +543,7 @@ class SimpleFactorStore(object):
         table = bcolz.open(f, 'r')
         self._index = table.attrs['line_map']
         self._table = table[:]
+        self._by_date = {}
 
     def get_factors(self, order_book_id):
         try:
@@ -170,19 +552,47 @@ class SimpleFactorStore(object):
         except KeyError:
             return None
 
+    def get_factors_by_date(self, date_field, date):
+        """
+        :param str date_field: 用于索引的日期字段
+        :param int date: 日期，格式与 date_field 列相同
+        :return: dict，合约到该日的记录的映射
+        """
+        try:
+            by_date = self._by_date[date_field]
+        except KeyError:
+            by_date = self._by_date[date_field] = index_by_date(self._table[date_field], self._index)
+        return {o: self._table[s:e] for o, s, e in by_date.get(date, ())}
+
 
 class TradingDatesStore(object):
     def __init__(self, f):
-        self._dates = pd.Index(pd.Timestamp(str(d)) for d in bcolz.open(f, 'r'))
+        self._date_ints = bcolz.open(f, 'r')[:]
+        self._dates = pd.Index(pd.Timestamp(str(d)) for d in self._date_ints)
 
     def get_trading_calendar(self):
         return self._dates
 
+    def get_trading_date_ints(self):
+        return self._date_ints
+
 
 class YieldCurveStore(object):
+    """
+    国债收益率曲线。加载时即转换为 [日期, 期限] 的 float64 矩阵及日期索引，另外保存一份沿日期向前填充缺失值的矩阵，
+    查询时只需切片。
+    """
+
     def __init__(self, f):
-        self._table = bcolz.open(f, 'r')
-        self._dates = self._table.cols['date'][:]
+        table = bcolz.open(f, 'r')
+        self._dates = table.cols['date'][:]
+        self._index = pd.DatetimeIndex(pd.to_datetime(self._dates.astype(np.int64).astype(str), format='%Y%m%d'))
+        names = [n for n in table.names if n != 'date']
+        # bundle 中的期限为 S0、M1、Y10 的形式，对外为 0S、1M、10Y
+        self._tenors = [n[1:] + n[0] for n in names]
+        self._columns = {t: i for i, t in enumerate(self._tenors)}
+        self._matrix = np.column_stack([table.cols[n][:] for n in names]).astype(np.float64)
+        self._filled = pd.DataFrame(self._matrix).ffill().values
 
     def get_yield_curve(self, start_date, end_date, tenor):
         d1 = start_date.year * 10000 + start_date.month * 100 + start_date.day
@@ -200,26 +610,26 @@ class YieldCurveStore(object):
         if e < s:
             return None
 
-        df = pd.DataFrame(self._table[s:e])
-        df.index = pd.Index(pd.Timestamp(str(d)) for d in df['date'])
-        del df['date']
-
-        df.rename(columns=lambda n: n[1:]+n[0], inplace=True)
+        df = pd.DataFrame(self._matrix[s:e].copy(), index=self._index[s:e], columns=self._tenors)
         if tenor is not None:
             return df[tenor]
         return df
 
+    def _positions_of(self, date_ints):
+        # 各日期（含）之前最近的一条数据的位置，早于第一条数据时为 0
+        pos = self._dates.searchsorted(date_ints)
+        exact = self._dates[np.minimum(pos, len(self._dates) - 1)] == date_ints
+        return np.where((pos > 0) & ((pos == len(self._dates)) | ~exact), pos - 1, pos)
+
     def get_risk_free_rate(self, start_date, end_date):
         tenor = risk_free_helper.get_tenor_for(start_date, end_date)
-        tenor = tenor[-1] + tenor[:-1]
         d = start_date.year * 10000 + start_date.month * 100 + start_date.day
-        pos = self._dates.searchsorted(d)
-        if pos > 0 and (pos == len(self._dates) or self._dates[pos] != d):
-            pos -= 1
-
-        col = self._table.cols[tenor]
-        while pos >= 0 and np.isnan(col[pos]):
-            # data is missing ...
-            pos -= 1
-
-        return self._table.cols[tenor][pos]
+        return self._filled[self._positions_of(d), self._columns[tenor]]
+
+    def get_risk_free_rates(self, dates, tenor):
+        """
+        :param dates: 日期序列
+        :param str tenor: 期限，如 0S、1M、1Y
+        :return: `numpy.ndarray`，各日期（含）之前最近一条非缺失的收益率
+        """
+        return self._filled[self._positions_of(_to_date_ints(dates)), self._columns[tenor]]
@@ -33,7 +33,11 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
             self.get_risk_free_rate = data_source.get_risk_free_rate
         except AttributeError:
             pass
-        InstrumentMixin.__init__(self, data_source.get_all_instruments())
+        try:
+            indexes = data_source.get_instrument_indexes()
+        except AttributeError:
+            indexes = None
+        InstrumentMixin.__init__(self, data_source.get_all_instruments(), indexes)
         TradingDatesMixin.__init__(self, data_source.get_trading_calendar())
 
     def __getattr__(self, item):
@@ -57,6 +61,10 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
         rate = yc.values[0, 0]
         return 0 if np.isnan(rate) else rate
 
+    def get_risk_free_rates(self, dates, tenor='0S'):
+        rates = self._data_source.get_risk_free_rates(dates, tenor)
+        return np.nan_to_num(rates)
+
     def get_dividend(self, order_book_id):
         if self.instruments(order_book_id).type == 'PublicFund':
             return self._data_source.get_dividend(order_book_id, public_fund=True)
@@ -89,6 +97,30 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
 
         return table[left_pos: right_pos]
 
+    def get_dividends_by_book_date(self, date):
+        """
+        获取在 date 进行股权登记的全部分红，返回 order_book_id 到分红记录的映射；数据源不支持时返回 None
+        """
+        dividends = self._data_source.get_dividends_by_book_date(date)
+        if dividends is None:
+            return None
+        # 与 get_dividend 一致，场外基金的分红从单独的表中读取
+        result = {o: d for o, d in six.iteritems(dividends) if not self._is_public_fund(o)}
+        for order_book_id, dividend in six.iteritems(self._data_source.get_dividends_by_book_date(date, True) or {}):
+            if self._is_public_fund(order_book_id):
+                result[order_book_id] = dividend
+        return result
+
+    def _is_public_fund(self, order_book_id):
+        instrument = self.instruments(order_book_id)
+        return instrument is not None and instrument.type == 'PublicFund'
+
+    def get_splits_by_ex_date(self, date):
+        """
+        获取在 date 除权的全部拆分，返回 order_book_id 到拆分比例的映射；数据源不支持时返回 None
+        """
+        return self._data_source.get_splits_by_ex_date(date)
+
     def get_split_by_ex_date(self, order_book_id, date):
         df = self.get_split(order_book_id)
         if df is None or len(df) == 0:
@@ -112,7 +144,11 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
         return bar[0]
 
     def get_prev_close(self, order_book_id, dt):
-        return self._get_prev_close(order_book_id, dt.replace(hour=0, minute=0, second=0))
+        dt = dt.replace(hour=0, minute=0, second=0)
+        prev_close = self._data_source.get_prev_close(self.instruments(order_book_id), dt)
+        if prev_close is None:
+            return self._get_prev_close(order_book_id, dt)
+        return prev_close
 
     @lru_cache(10240)
     def _get_prev_settlement(self, instrument, dt):
@@ -127,7 +163,10 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
         instrument = self.instruments(order_book_id)
         if instrument.type != 'Future':
             return np.nan
-        return self._get_prev_settlement(instrument, dt)
+        prev_settlement = self._data_source.get_prev_settlement(instrument, dt)
+        if prev_settlement is None:
+            return self._get_prev_settlement(instrument, dt)
+        return prev_settlement
 
     def get_settle_price(self, order_book_id, date):
         instrument = self.instruments(order_book_id)
@@ -162,6 +201,24 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
                                               skip_suspended=skip_suspended, include_now=include_now,
                                               adjust_type=adjust_type, adjust_orig=adjust_orig)
 
+    def history_bars_batch(self, order_book_ids, bar_count, frequency, fields, dt,
+                           include_now=False, adjust_type='pre', adjust_orig=None):
+        instruments = [self.instruments(o) for o in order_book_ids]
+        if adjust_orig is None:
+            adjust_orig = dt
+        return self._data_source.history_bars_batch(instruments, bar_count, frequency, fields, dt,
+                                                    include_now=include_now, adjust_type=adjust_type,
+                                                    adjust_orig=adjust_orig)
+
+    def get_panel(self, fields, start_date, end_date, order_book_ids=None):
+        instruments = None
+        if order_book_ids is not None:
+            instruments = [self.instruments(o) for o in order_book_ids]
+            for order_book_id, instrument in zip(order_book_ids, instruments):
+                if instrument is None:
+                    raise ValueError("get_panel: invalid order_book_id {}".format(order_book_id))
+        return self._data_source.get_panel(fields, start_date, end_date, instruments)
+
     def history_ticks(self, order_book_id, count, dt):
         instrument = self.instruments(order_book_id)
         return self._data_source.history_ticks(instrument, count, dt)
@@ -187,7 +244,7 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
                 return None
             d = {k: bar[k] for k in tick_fields_for(instrument) if k in bar.dtype.names}
             d['last'] = bar['close']
-            d['prev_close'] = self._get_prev_close(order_book_id, dt)
+            d['prev_close'] = self.get_prev_close(order_book_id, dt)
             return TickObject(instrument, d)
 
         return self._data_source.current_snapshot(instrument, frequency, dt)
@@ -210,28 +267,34 @@ class DataProxy(InstrumentMixin, TradingDatesMixin):
         if count == 1:
             return self._data_source.is_suspended(order_book_id, [dt])[0]
 
-        trading_dates = self.get_n_trading_dates_until(dt, count)
+        trading_dates = self.get_n_trading_date_ints_until(dt, count)
         return self._data_source.is_suspended(order_book_id, trading_dates)
 
     def is_st_stock(self, order_book_id, dt, count=1):
         if count == 1:
             return self._data_source.is_st_stock(order_book_id, [dt])[0]
 
-        trading_dates = self.get_n_trading_dates_until(dt, count)
+        trading_dates = self.get_n_trading_date_ints_until(dt, count)
         return self._data_source.is_st_stock(order_book_id, trading_dates)
 
+    def is_suspended_batch(self, order_book_ids, dt):
+        return self._data_source.is_suspended_batch(order_book_ids, dt)
+
+    def is_st_stock_batch(self, order_book_ids, dt):
+        return self._data_source.is_st_stock_batch(order_book_ids, dt)
+
     def non_subscribable(self, order_book_id, dt, count=1):
         if count == 1:
             return self._data_source.non_subscribable(order_book_id, [dt])[0]
 
-        trading_dates = self.get_n_trading_dates_until(dt, count)
+        trading_dates = self.get_n_trading_date_ints_until(dt, count)
         return self._data_source.non_subscribable(order_book_id, trading_dates)
 
     def non_redeemable(self, order_book_id, dt, count=1):
         if count == 1:
             return self._data_source.non_redeemable(order_book_id, [dt])[0]
 
-        trading_dates = self.get_n_trading_dates_until(dt, count)
+        trading_dates = self.get_n_trading_date_ints_until(dt, count)
         return self._data_source.non_redeemable(order_book_id, trading_dates)
 
     def public_fund_commission(self, order_book_id, buy):
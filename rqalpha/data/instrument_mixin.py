@@ -13,46 +13,121 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 import re
 import six
+import numpy as np
 
-from rqalpha.utils import merge_trading_period, INST_TYPE_IN_STOCK_ACCOUNT
+from rqalpha.model.instrument import Instrument
+from rqalpha.utils import merge_trading_period, INST_TYPE_IN_STOCK_ACCOUNT, INSTRUMENT_TYPE_STR_EHUM_MAP
 
 
-class InstrumentMixin(object):
+def _date_int(dt):
+    return dt.year * 10000 + dt.month * 100 + dt.day
+
+
+class InstrumentCatalog(object):
+    """
+    合约的列式目录：上市/退市日期保存为 YYYYMMDD 整数数组，类型、板块、行业、标的代码保存为分类编码，
+    按类型、板块、行业及上市区间的查询均转化为向量化的掩码运算。
+    """
+
+    CATEGORICAL_FIELDS = ('type', 'sector_code', 'industry_code', 'underlying_symbol')
+    CONTINUOUS_CONTRACT = re.compile("^[A-Z]{1,2}(88|888|99|889)$")
+
     def __init__(self, instruments):
-        self._instruments = {i.order_book_id: i for i in instruments}
-        self._sym_id_map = {i.symbol: k for k, i in six.iteritems(self._instruments)
-                            # 过滤掉 CSI300, SSE50, CSI500, SSE180
-                            if not i.order_book_id.endswith('INDX')}
-        try:
-            # FIXME
-            # 沪深300 中证500 固定使用上证的
-            for o in ['000300.XSHG', '000905.XSHG']:
-                self._sym_id_map[self._instruments[o].symbol] = o
-            # 上证180 及 上证180指数 两个symbol都指向 000010.XSHG
-            self._sym_id_map[self._instruments['SSE180.INDX'].symbol] = '000010.XSHG'
-        except KeyError:
-            pass
+        self._instruments = list(instruments)
+        self._order_book_ids = np.array([i.order_book_id for i in self._instruments], dtype=object)
+        self._listed_dates = np.array([
+            _date_int(i.__dict__.get("listed_date", Instrument.DEFAULT_LISTED_DATE)) for i in self._instruments
+        ], dtype=np.int64)
+        self._de_listed_dates = np.array([
+            _date_int(i.__dict__.get("de_listed_date", Instrument.DEFAULT_DE_LISTED_DATE)) for i in self._instruments
+        ], dtype=np.int64)
+        # 股票账户的品种在退市日当天即不再可交易，其余品种（期货）在交割日当天仍可交易
+        self._de_listed_inclusive = np.array([
+            INSTRUMENT_TYPE_STR_EHUM_MAP.get(i.type) not in INST_TYPE_IN_STOCK_ACCOUNT for i in self._instruments
+        ], dtype=bool)
+        self._is_continuous = np.array(
+            [bool(self.CONTINUOUS_CONTRACT.match(i.order_book_id)) for i in self._instruments], dtype=bool
+        )
+
+        self._codes = {}
+        self._categories = {}
+        for field in self.CATEGORICAL_FIELDS:
+            categories = {}
+            self._codes[field] = np.array([
+                categories.setdefault(i.__dict__.get(field), len(categories)) for i in self._instruments
+            ], dtype=np.int32)
+            self._categories[field] = categories
+
+    def _mask_of(self, field, values):
+        categories = self._categories[field]
+        codes = [categories[v] for v in values if v in categories]
+        if len(codes) == 1:
+            return self._codes[field] == codes[0]
+        return np.isin(self._codes[field], codes)
+
+    def _listed_mask(self, date):
+        return (self._listed_dates <= date) & np.where(
+            self._de_listed_inclusive, date <= self._de_listed_dates, date < self._de_listed_dates
+        )
+
+    def _pick(self, mask):
+        return [self._instruments[n] for n in np.flatnonzero(mask)]
+
+    def filter(self, types=None, dt=None):
+        mask = np.ones(len(self._instruments), dtype=bool)
+        if isinstance(types, six.string_types):
+            types = [types]
+        if types is not None:
+            mask &= self._mask_of('type', types)
+        if dt is not None:
+            mask &= self._listed_mask(_date_int(dt))
+        return self._pick(mask)
+
+    def stocks_of(self, field, code):
+        mask = self._mask_of('type', ['CS']) & self._mask_of(field, [code])
+        return self._order_book_ids[mask].tolist()
+
+    def future_contracts(self, underlying, dt):
+        date = _date_int(dt)
+        mask = self._mask_of('type', ['Future']) & self._mask_of('underlying_symbol', [underlying])
+        mask &= ~self._is_continuous
+        mask &= (self._listed_dates <= date) & (date <= self._de_listed_dates)
+        return sorted(self._order_book_ids[mask].tolist())
+
+
+def build_instrument_indexes(instruments):
+    """
+    构造 InstrumentMixin 所需的各个索引，返回 (order_book_id -> Instrument, symbol -> order_book_id, InstrumentCatalog)
+    """
+    instrument_map = {i.order_book_id: i for i in instruments}
+    sym_id_map = {i.symbol: k for k, i in six.iteritems(instrument_map)
+                  # 过滤掉 CSI300, SSE50, CSI500, SSE180
+                  if not i.order_book_id.endswith('INDX')}
+    try:
+        # FIXME
+        # 沪深300 中证500 固定使用上证的
+        for o in ['000300.XSHG', '000905.XSHG']:
+            sym_id_map[instrument_map[o].symbol] = o
+        # 上证180 及 上证180指数 两个symbol都指向 000010.XSHG
+        sym_id_map[instrument_map['SSE180.INDX'].symbol] = '000010.XSHG'
+    except KeyError:
+        pass
+    return instrument_map, sym_id_map, InstrumentCatalog(six.itervalues(instrument_map))
+
+
+class InstrumentMixin(object):
+    def __init__(self, instruments, indexes=None):
+        # indexes 为 build_instrument_indexes 预先构造好的索引，数据源可以缓存它以加快启动
+        self._instruments, self._sym_id_map, self._catalog = indexes or build_instrument_indexes(instruments)
 
     def sector(self, code):
-        return [v.order_book_id for v in self._instruments.values()
-                if v.type == 'CS' and v.sector_code == code]
+        return self._catalog.stocks_of('sector_code', code)
 
     def industry(self, code):
-        return [v.order_book_id for v in self._instruments.values()
-                if v.type == 'CS' and v.industry_code == code]
+        return self._catalog.stocks_of('industry_code', code)
 
     def all_instruments(self, types, dt=None):
-        return [i for i in self._instruments.values() if (
-            (dt is None or (
-                i.listed_date.date() <= dt.date() < i.de_listed_date.date() if (
-                    i.enum_type in INST_TYPE_IN_STOCK_ACCOUNT
-                ) else (
-                    i.listed_date.date() <= dt.date() <= i.de_listed_date.date()
-                )
-            )) and (
-                types is None or i.type in types
-            )
-        )]
+        return self._catalog.filter(types, dt)
 
     def _instrument(self, sym_or_id):
         try:
@@ -70,17 +145,10 @@ class InstrumentMixin(object):
 
         return [i for i in [self._instrument(sid) for sid in sym_or_ids] if i is not None]
 
-    CONTINUOUS_CONTRACT = re.compile("^[A-Z]{1,2}(88|888|99|889)$")
+    CONTINUOUS_CONTRACT = InstrumentCatalog.CONTINUOUS_CONTRACT
 
     def get_future_contracts(self, underlying, date):
-        date = date.replace(hour=0, minute=0, second=0)
-        futures = [v for o, v in six.iteritems(
-            self._instruments
-        ) if v.type == 'Future' and v.underlying_symbol == underlying and not re.match(self.CONTINUOUS_CONTRACT, o)]
-        if not futures:
-            return []
-
-        return sorted(i.order_book_id for i in futures if i.listed_date <= date <= i.de_listed_date)
+        return self._catalog.future_contracts(underlying, date)
 
     def get_trading_period(self, sym_or_ids, default_trading_period=None):
         trading_period = default_trading_period or []
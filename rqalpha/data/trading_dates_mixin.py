@@ -13,57 +13,100 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
 import datetime
+import numpy as np
 import pandas as pd
 
 from rqalpha.utils.py2 import lru_cache
 
+# 1970-01-01 对应的 proleptic Gregorian ordinal
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
 
-def _to_timestamp(d):
-    return pd.Timestamp(d).replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _to_ordinal(d):
+    try:
+        return d.toordinal()
+    except AttributeError:
+        return pd.Timestamp(d).toordinal()
 
 
 class TradingDatesMixin(object):
     def __init__(self, dates):
         self._dates = dates
+        self._date_ints = np.asarray(dates.year * 10000 + dates.month * 100 + dates.day, dtype=np.int64)
+
+        # 偏移表：_offsets[k] 为日历日 (_first_ordinal + k) 之前的交易日个数，
+        # 任意日期在交易日历中的位置（等价于 searchsorted）都可以通过一次数组读取得到
+        ordinals = dates.values.astype('datetime64[D]').astype(np.int64) + _EPOCH_ORDINAL
+        self._first_ordinal = int(ordinals[0])
+        self._offsets = np.searchsorted(
+            ordinals, np.arange(self._first_ordinal, int(ordinals[-1]) + 2)
+        ).tolist()
+
+    def _position_of(self, ordinal):
+        k = ordinal - self._first_ordinal
+        if k < 0:
+            return 0
+        if k >= len(self._offsets):
+            return len(self._date_ints)
+        return self._offsets[k]
+
+    def _left(self, date):
+        # 等价于 self._dates.searchsorted(date)
+        return self._position_of(_to_ordinal(date))
+
+    def _right(self, date):
+        # 等价于 self._dates.searchsorted(date, side='right')
+        return self._position_of(_to_ordinal(date) + 1)
 
     def get_trading_dates(self, start_date, end_date):
-        # 只需要date部分
-        start_date = _to_timestamp(start_date)
-        end_date = _to_timestamp(end_date)
-        left = self._dates.searchsorted(start_date)
-        right = self._dates.searchsorted(end_date, side='right')
-        return self._dates[left:right]
+        return self._dates[self._left(start_date):self._right(end_date)]
 
     def get_previous_trading_date(self, date, n=1):
-        date = _to_timestamp(date)
-        pos = self._dates.searchsorted(date)
+        pos = self._left(date)
         if pos >= n:
             return self._dates[pos - n]
         else:
             return self._dates[0]
 
     def get_next_trading_date(self, date, n=1):
-        date = _to_timestamp(date)
-        pos = self._dates.searchsorted(date, side='right')
+        pos = self._right(date)
         if pos + n > len(self._dates):
             return self._dates[-1]
         else:
             return self._dates[pos + n - 1]
 
     def is_trading_date(self, date):
-        date = _to_timestamp(date)
-        pos = self._dates.searchsorted(date)
-        return pos < len(self._dates) and self._dates[pos] == date
+        ordinal = _to_ordinal(date)
+        return self._position_of(ordinal + 1) > self._position_of(ordinal)
+
+    def get_trading_date_ordinal(self, date):
+        """
+        获取日期在交易日历中的序号（第几个交易日，从 0 开始）；非交易日返回其后第一个交易日的序号
+        """
+        return self._left(date)
+
+    def get_previous_trading_date_int(self, date, n=1):
+        """
+        与 get_previous_trading_date 相同，但返回 YYYYMMDD 格式的整数
+        """
+        pos = self._left(date)
+        return int(self._date_ints[pos - n] if pos >= n else self._date_ints[0])
+
+    def get_n_trading_date_ints_until(self, dt, n):
+        """
+        与 get_n_trading_dates_until 相同，但返回 YYYYMMDD 格式的整数数组
+        """
+        pos = self._right(dt)
+        return self._date_ints[max(pos - n, 0):pos]
 
     @lru_cache(512)
     def _get_future_trading_date(self, dt):
         dt1 = dt - datetime.timedelta(hours=4)
         td = pd.Timestamp(dt1.date())
-        pos = self._dates.searchsorted(td)
-        if self._dates[pos] != td:
+        if not self.is_trading_date(td):
             raise RuntimeError('invalid future calendar datetime: {}'.format(dt))
         if dt1.hour >= 16:
-            return self._dates[pos + 1]
+            return self._dates[self._left(td) + 1]
 
         return td
 
@@ -77,16 +120,11 @@ class TradingDatesMixin(object):
     get_nth_previous_trading_date = get_previous_trading_date
 
     def get_n_trading_dates_until(self, dt, n):
-        date = _to_timestamp(dt)
-        pos = self._dates.searchsorted(date, side='right')
+        pos = self._right(dt)
         if pos >= n:
             return self._dates[pos - n:pos]
 
         return self._dates[:pos]
 
     def count_trading_dates(self, start_date, end_date):
-        start_date = _to_timestamp(start_date)
-        end_date = _to_timestamp(end_date)
-
-        return self._dates.searchsorted(end_date, side='right') - self._dates.searchsorted(start_date)
-
+        return self._right(end_date) - self._left(start_date)
@@ -13,6 +13,7 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 
 from enum import Enum
+from timeit import default_timer
 from collections import defaultdict
 
 
@@ -29,23 +30,122 @@ class EventBus(object):
     def __init__(self):
         self._listeners = defaultdict(list)
         self._user_listeners = defaultdict(list)
+        # freeze 之后为 event_type -> (系统监听函数元组, 用户监听函数元组)，没有监听函数的事件类型为 None
+        self._compiled = None
 
     def add_listener(self, event_type, listener, user=False):
         (self._user_listeners if user else self._listeners)[event_type].append(listener)
+        self._invalidate(event_type)
 
     def prepend_listener(self, event_type, listener, user=False):
         (self._user_listeners if user else self._listeners)[event_type].insert(0, listener)
+        self._invalidate(event_type)
+
+    def freeze(self):
+        """
+        进入编译模式：各事件类型的监听函数在第一次发布时解析为元组，之后发布事件不再查找和复制列表。
+        之后再增加的监听函数会使对应事件类型重新解析，行为与未编译时一致。
+        """
+        self._compiled = {}
+
+    def _invalidate(self, event_type):
+        if self._compiled is not None:
+            self._compiled.pop(event_type, None)
+
+    def _compile(self, event_type):
+        system = tuple(self._listeners.get(event_type, ()))
+        user = tuple(self._user_listeners.get(event_type, ()))
+        compiled = self._compiled[event_type] = (system, user) if system or user else None
+        return compiled
+
+    def has_listeners(self, event_type):
+        if self._compiled is None:
+            return bool(self._listeners.get(event_type) or self._user_listeners.get(event_type))
+        try:
+            return self._compiled[event_type] is not None
+        except KeyError:
+            return self._compile(event_type) is not None
 
     def publish_event(self, event):
-        for listener in self._listeners[event.event_type]:
+        if self._compiled is None:
+            system, user = self._listeners[event.event_type], self._user_listeners[event.event_type]
+        else:
+            try:
+                compiled = self._compiled[event.event_type]
+            except KeyError:
+                compiled = self._compile(event.event_type)
+            if compiled is None:
+                return
+            system, user = compiled
+
+        for listener in system:
             # 如果返回 True ，那么消息不再传递下去
             if listener(event):
                 break
 
-        for listener in self._user_listeners[event.event_type]:
+        for listener in user:
             listener(event)
 
 
+def _listener_name(listener):
+    func = getattr(listener, 'func', listener)
+    name = getattr(func, '__qualname__', None)
+    if name is None:
+        name = getattr(func, '__name__', repr(func))
+        owner = getattr(func, '__self__', None)
+        if owner is not None:
+            name = '{}.{}'.format(type(owner).__name__, name)
+    return name
+
+
+class ProfilingEventBus(EventBus):
+    """
+    记录每个 (事件类型, 监听函数) 的调用次数、累计耗时及单次最大耗时的 EventBus。
+    耗时包含监听函数内部再次发布的事件的处理时间。
+    """
+
+    def __init__(self):
+        super(ProfilingEventBus, self).__init__()
+        # (event_type, listener_name) -> [调用次数, 累计耗时, 最大耗时]
+        self._stats = {}
+
+    def _timed(self, event_type, listener):
+        stat = self._stats.setdefault((event_type, _listener_name(listener)), [0, 0., 0.])
+
+        def timed_listener(event):
+            start = default_timer()
+            try:
+                return listener(event)
+            finally:
+                elapsed = default_timer() - start
+                stat[0] += 1
+                stat[1] += elapsed
+                if elapsed > stat[2]:
+                    stat[2] = elapsed
+
+        return timed_listener
+
+    def add_listener(self, event_type, listener, user=False):
+        super(ProfilingEventBus, self).add_listener(event_type, self._timed(event_type, listener), user)
+
+    def prepend_listener(self, event_type, listener, user=False):
+        super(ProfilingEventBus, self).prepend_listener(event_type, self._timed(event_type, listener), user)
+
+    def get_profile(self):
+        """
+        :return: `pandas.DataFrame`，每行为一个 (事件类型, 监听函数)，按累计耗时降序排列
+        """
+        import pandas as pd
+
+        df = pd.DataFrame([{
+            'event': getattr(event_type, 'value', event_type), 'listener': name,
+            'calls': calls, 'total_time': total, 'max_time': max_time,
+            'mean_time': total / calls if calls else 0.,
+        } for (event_type, name), (calls, total, max_time) in self._stats.items()],
+            columns=['event', 'listener', 'calls', 'total_time', 'mean_time', 'max_time'])
+        return df.sort_values('total_time', ascending=False).reset_index(drop=True)
+
+
 class EVENT(Enum):
     # 系统初始化后触发
     # post_system_init()
@@ -306,6 +306,17 @@ class AbstractDataSource(object):
         """
         raise NotImplementedError
 
+    def get_risk_free_rates(self, dates, tenor):
+        """
+        批量获取无风险利率，各日期取该日（含）之前最近一条非缺失的数据
+
+        :param dates: 日期序列
+        :param str tenor: 利率期限，如 0S、1M、1Y
+
+        :return: numpy.ndarray
+        """
+        raise NotImplementedError
+
     def get_dividend(self, order_book_id):
         """
         获取股票/基金分红信息
@@ -354,6 +365,54 @@ class AbstractDataSource(object):
         """
         raise NotImplementedError
 
+    def get_dividends_by_book_date(self, date, public_fund=False):
+        """
+        获取在 date 进行股权登记的全部分红
+
+        :param datetime.date date: 股权登记日
+        :param bool public_fund: 是否为场外基金的分红
+
+        :return: dict，order_book_id 到分红记录（格式同 :meth:`get_dividend`）的映射；
+            返回 None 时由账户逐个持仓调用 :meth:`get_dividend` 查询
+        """
+        return None
+
+    def get_splits_by_ex_date(self, date):
+        """
+        获取在 date 除权的全部拆分
+
+        :param datetime.date date: 除权日
+
+        :return: dict，order_book_id 到拆分比例的映射；返回 None 时由账户逐个持仓调用 :meth:`get_split` 查询
+        """
+        return None
+
+    def get_prev_close(self, instrument, dt):
+        """
+        获取合约在交易日 dt 的昨收盘价（以 dt 为基准前复权，不跳过停牌日）
+
+        :param instrument: 合约对象
+        :type instrument: :class:`~Instrument`
+
+        :param datetime.datetime dt: 交易日
+
+        :return: `float`，返回 None 时由 DataProxy 通过 history_bars 计算
+        """
+        return None
+
+    def get_prev_settlement(self, instrument, dt):
+        """
+        获取期货合约在交易日 dt 的昨结算价
+
+        :param instrument: 合约对象
+        :type instrument: :class:`~Instrument`
+
+        :param datetime.datetime dt: 交易日
+
+        :return: `float`，返回 None 时由 DataProxy 通过 history_bars 计算
+        """
+        return None
+
     def history_bars(self, instrument, bar_count, frequency, fields, dt, skip_suspended=True,
                      include_now=False, adjust_type='pre', adjust_orig=None):
         """
@@ -394,6 +453,43 @@ class AbstractDataSource(object):
         """
         raise NotImplementedError
 
+    def history_bars_batch(self, instruments, bar_count, frequency, fields, dt,
+                           include_now=False, adjust_type='pre', adjust_orig=None):
+        """
+        批量获取多个合约的历史数据，结果按交易日历对齐
+
+        :param instruments: 合约对象列表
+        :type instruments: list[:class:`~Instrument`]
+
+        :param int bar_count: 获取的历史数据数量
+        :param str frequency: 周期频率，`1d` 表示日周期, `1m` 表示分钟周期
+        :param fields: 返回数据字段，可选字段同 :meth:`history_bars`，不包括 datetime
+        :type fields: str | list[str]
+
+        :param datetime.datetime dt: 时间
+        :param bool include_now: 是否包含当天最新数据
+        :param str adjust_type: 复权类型，'pre', 'none', 'post'
+        :param datetime.datetime adjust_orig: 复权起点；
+
+        :return: `numpy.ndarray`, shape 为 (bar_count, len(instruments))，缺失数据为 NaN；
+            fields 为 list 时返回以各字段为 dtype.names 的结构化数组
+        """
+        raise NotImplementedError
+
+    def get_panel(self, fields, start_date, end_date, instruments=None):
+        """
+        获取按交易日历对齐的截面数据，价格均未复权
+
+        :param list fields: 字段列表
+        :param datetime.date start_date: 开始日期
+        :param datetime.date end_date: 结束日期
+        :param instruments: 合约对象列表，为 None 时返回全部合约
+        :type instruments: list[:class:`~Instrument`]
+
+        :return: dict，字段到 `pandas.DataFrame` 的映射，index 为交易日，columns 为 order_book_id
+        """
+        raise NotImplementedError
+
     def history_ticks(self, instrument, count, dt):
         """
         获取历史tick数据
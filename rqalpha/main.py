@@ -31,7 +31,7 @@ from rqalpha.core.strategy_context import StrategyContext
 from rqalpha.data.base_data_source import BaseDataSource
 from rqalpha.data.data_proxy import DataProxy
 from rqalpha.environment import Environment
-from rqalpha.events import EVENT, Event
+from rqalpha.events import EVENT, Event, ProfilingEventBus
 from rqalpha.execution_context import ExecutionContext
 from rqalpha.interface import Persistable
 from rqalpha.mod import ModHandler
@@ -68,6 +68,23 @@ def _adjust_start_date(config, data_proxy):
     config.base.timezone = pytz.utc
 
 
+def create_data_source(config):
+    if getattr(config.base, "data_shm_path", None):
+        from rqalpha.data.base_data_source.shared_memory import SharedMemoryDataSource
+        data_source = SharedMemoryDataSource(
+            config.base.data_bundle_path, config.base.data_shm_path, getattr(config.base, "future_info", {}),
+            getattr(config.base, "data_cache_mb", None)
+        )
+    else:
+        data_source = BaseDataSource(
+            config.base.data_bundle_path, getattr(config.base, "future_info", {}),
+            getattr(config.base, "data_cache_mb", None)
+        )
+    if getattr(config.base, "data_preload_workers", 0):
+        data_source.preload(config.base.data_preload_workers)
+    return data_source
+
+
 def create_base_scope(copy_scope=False):
     from rqalpha.utils.logger import user_print, user_log
     from . import user_module
@@ -119,8 +136,10 @@ def init_strategy_loader(env, source_code, user_funcs, config):
         return FileStrategyLoader(config.base.strategy_file)
 
 
-def run(config, source_code=None, user_funcs=None):
+def run(config, source_code=None, user_funcs=None, data_source=None):
     env = Environment(config)
+    if getattr(config.extra, "enable_event_profiler", False):
+        env.event_bus = ProfilingEventBus()
     persist_helper = None
     init_succeed = False
     mod_handler = ModHandler()
@@ -137,7 +156,7 @@ def run(config, source_code=None, user_funcs=None):
         mod_handler.start_up()
 
         if not env.data_source:
-            env.set_data_source(BaseDataSource(config.base.data_bundle_path, getattr(config.base, "future_info", {})))
+            env.set_data_source(data_source if data_source is not None else create_data_source(config))
 
         if env.price_board is None:
             from rqalpha.data.bar_dict_price_board import BarDictPriceBoard
@@ -174,6 +193,7 @@ def run(config, source_code=None, user_funcs=None):
         ctx._push()
 
         env.event_bus.publish_event(Event(EVENT.POST_SYSTEM_INIT))
+        env.event_bus.freeze()
 
         scope = create_base_scope(config.base.run_type == RUN_TYPE.BACKTEST)
         scope.update({
@@ -232,6 +252,8 @@ def run(config, source_code=None, user_funcs=None):
 
         if env.profile_deco:
             output_profile_result(env)
+        if isinstance(env.event_bus, ProfilingEventBus):
+            output_event_profile_result(env)
     except CustomException as e:
         if init_succeed and persist_helper and env.config.base.persist_mode == const.PERSIST_MODE.ON_CRASH:
             persist_helper.persist()
@@ -298,6 +320,10 @@ def output_profile_result(env):
     env.event_bus.publish_event(Event(EVENT.ON_LINE_PROFILER_RESULT, result=profile_output))
 
 
+def output_event_profile_result(env):
+    six.print_(env.event_bus.get_profile().to_string(index=False))
+
+
 def set_loggers(config):
     from rqalpha.utils.logger import user_log, user_system_log, user_detail_log, system_log, basic_system_log, std_log
     from rqalpha.utils.logger import user_std_handler, init_logger
@@ -173,12 +173,20 @@ class StockAccount(AssetAccount):
         return order_cost + Environment.get_instance().get_order_transaction_cost(DEFAULT_ACCOUNT_TYPE.STOCK, order)
 
     def _handle_dividend_book_closure(self, trading_date):
-        for order_book_id, position in six.iteritems(self._positions):
-            if position.quantity == 0:
-                continue
-
-            dividend = Environment.get_instance().data_proxy.get_dividend_by_book_date(order_book_id, trading_date)
-            if dividend is None:
+        data_proxy = Environment.get_instance().data_proxy
+        dividends = data_proxy.get_dividends_by_book_date(trading_date)
+        if dividends is None:
+            # 数据源不支持按日期查询，逐个持仓查询
+            dividends = {}
+            for order_book_id in self._positions:
+                dividend = data_proxy.get_dividend_by_book_date(order_book_id, trading_date)
+                if dividend is not None:
+                    dividends[order_book_id] = dividend
+
+        # 只处理当日登记且仍然持有的合约
+        for order_book_id, dividend in six.iteritems(dividends):
+            position = self._positions.get(order_book_id)
+            if position is None or position.quantity == 0:
                 continue
 
             dividend_per_share = sum(dividend['dividend_cash_before_tax'] / dividend['round_lot'])
@@ -211,9 +219,12 @@ class StockAccount(AssetAccount):
 
     def _handle_split(self, trading_date):
         data_proxy = Environment.get_instance().data_proxy
-        for order_book_id, position in six.iteritems(self._positions):
-            ratio = data_proxy.get_split_by_ex_date(order_book_id, trading_date)
-            if ratio is None:
+        splits = data_proxy.get_splits_by_ex_date(trading_date)
+        if splits is None:
+            splits = {o: data_proxy.get_split_by_ex_date(o, trading_date) for o in self._positions}
+        for order_book_id, ratio in six.iteritems(splits):
+            position = self._positions.get(order_book_id)
+            if position is None or ratio is None:
                 continue
             position.split_(ratio)
 
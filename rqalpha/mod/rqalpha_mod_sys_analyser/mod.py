@@ -24,7 +24,7 @@ import pandas as pd
 from rqrisk import Risk
 
 from rqalpha.const import EXIT_CODE, DEFAULT_ACCOUNT_TYPE
-from rqalpha.events import EVENT
+from rqalpha.events import EVENT, ProfilingEventBus
 from rqalpha.interface import AbstractMod
 
 
@@ -190,24 +190,10 @@ class AnalyserMod(AbstractMod):
         for account_type, starting_cash in six.iteritems(self._env.config.base.accounts):
             summary[account_type] = starting_cash
 
-        risk = Risk(
-            np.array(self._portfolio_daily_returns),
-            np.array(self._benchmark_daily_returns),
-            data_proxy.get_risk_free_rate(
-                self._env.config.base.start_date, self._env.config.base.end_date
-            )
-        )
-        summary.update({
-            'alpha': self._safe_convert(risk.alpha, 3),
-            'beta': self._safe_convert(risk.beta, 3),
-            'sharpe': self._safe_convert(risk.sharpe, 3),
-            'information_ratio': self._safe_convert(risk.information_ratio, 3),
-            'downside_risk': self._safe_convert(risk.annual_downside_risk, 3),
-            'tracking_error': self._safe_convert(risk.annual_tracking_error, 3),
-            'sortino': self._safe_convert(risk.sortino, 3),
-            'volatility': self._safe_convert(risk.annual_volatility, 3),
-            'max_drawdown': self._safe_convert(risk.max_drawdown, 3),
-        })
+        summary.update(risk_summary(
+            self._portfolio_daily_returns, self._benchmark_daily_returns,
+            data_proxy.get_risk_free_rate(self._env.config.base.start_date, self._env.config.base.end_date)
+        ))
 
         summary.update({
             'total_value': self._safe_convert(self._env.portfolio.total_value),
@@ -223,67 +209,105 @@ class AnalyserMod(AbstractMod):
             summary['benchmark_annualized_returns'] = self._safe_convert(
                 self._env.benchmark_portfolio.annualized_returns)
 
-        trades = pd.DataFrame(self._trades)
-        if 'datetime' in trades.columns:
-            trades = trades.set_index('datetime')
+        plots = None if self._env.get_plot_store().empty else self._env.get_plot_store().get_plots()
+        result_dict = build_result_dict(
+            summary, self._trades, self._total_portfolios,
+            self._total_benchmark_portfolios if self._env.benchmark_portfolio is not None else None,
+            [(account_type, self._sub_accounts[account_type], self._positions[account_type])
+             for account_type in self._env.portfolio.accounts],
+            plots
+        )
 
-        df = pd.DataFrame(self._total_portfolios)
+        if isinstance(self._env.event_bus, ProfilingEventBus):
+            result_dict["event_profile"] = self._env.event_bus.get_profile()
 
-        df['date'] = pd.to_datetime(df['date'])
+        output_result(result_dict, self._mod_config)
+        return result_dict
 
-        total_portfolios = df.set_index('date').sort_index()
 
-        result_dict = {
-            'summary': summary,
-            'trades': trades,
-            'portfolio': total_portfolios,
-        }
+def risk_summary(portfolio_daily_returns, benchmark_daily_returns, risk_free_rate):
+    risk = Risk(np.array(portfolio_daily_returns), np.array(benchmark_daily_returns), risk_free_rate)
+    return {
+        'alpha': AnalyserMod._safe_convert(risk.alpha, 3),
+        'beta': AnalyserMod._safe_convert(risk.beta, 3),
+        'sharpe': AnalyserMod._safe_convert(risk.sharpe, 3),
+        'information_ratio': AnalyserMod._safe_convert(risk.information_ratio, 3),
+        'downside_risk': AnalyserMod._safe_convert(risk.annual_downside_risk, 3),
+        'tracking_error': AnalyserMod._safe_convert(risk.annual_tracking_error, 3),
+        'sortino': AnalyserMod._safe_convert(risk.sortino, 3),
+        'volatility': AnalyserMod._safe_convert(risk.annual_volatility, 3),
+        'max_drawdown': AnalyserMod._safe_convert(risk.max_drawdown, 3),
+    }
 
-        if self._env.benchmark_portfolio is not None:
-            b_df = pd.DataFrame(self._total_benchmark_portfolios)
-            df['date'] = pd.to_datetime(df['date'])
-            benchmark_portfolios = b_df.set_index('date').sort_index()
-            result_dict['benchmark_portfolio'] = benchmark_portfolios
 
-        if not self._env.get_plot_store().empty:
-            plots = self._env.get_plot_store().get_plots()
-            plots_items = defaultdict(dict)
-            for series_name, value_dict in six.iteritems(plots):
-                for date, value in six.iteritems(value_dict):
-                    plots_items[date][series_name] = value
-                    plots_items[date]["date"] = date
+def build_result_dict(summary, trades, total_portfolios, total_benchmark_portfolios, accounts, plots=None):
+    """
+    将回测过程中逐日收集的记录整理为 sys_analyser 的结果
 
-            df = pd.DataFrame([dict_data for date, dict_data in six.iteritems(plots_items)])
+    :param accounts: list of (account_type, 账户逐日记录, 持仓逐日记录)
+    :param total_benchmark_portfolios: 没有基准时为 None
+    :param plots: plot store 中的 {series_name: {date: value}}
+    """
+    trades = pd.DataFrame(trades)
+    if 'datetime' in trades.columns:
+        trades = trades.set_index('datetime')
 
-            df["date"] = pd.to_datetime(df["date"])
-            df = df.set_index("date").sort_index()
-            result_dict["plots"] = df
+    df = pd.DataFrame(total_portfolios)
 
-        for account_type, account in six.iteritems(self._env.portfolio.accounts):
-            account_name = account_type.lower()
-            portfolios_list = self._sub_accounts[account_type]
-            df = pd.DataFrame(portfolios_list)
-            df["date"] = pd.to_datetime(df["date"])
-            account_df = df.set_index("date").sort_index()
-            result_dict["{}_account".format(account_name)] = account_df
-
-            positions_list = self._positions[account_type]
-            positions_df = pd.DataFrame(positions_list)
-            if "date" in positions_df.columns:
-                positions_df["date"] = pd.to_datetime(positions_df["date"])
-                positions_df = positions_df.set_index("date").sort_index()
-            result_dict["{}_positions".format(account_name)] = positions_df
-
-        if self._mod_config.output_file:
-            with open(self._mod_config.output_file, 'wb') as f:
-                pickle.dump(result_dict, f)
-
-        if self._mod_config.report_save_path:
-            from .report import generate_report
-            generate_report(result_dict, self._mod_config.report_save_path)
-
-        if self._mod_config.plot or self._mod_config.plot_save_file:
-            from .plot import plot_result
-            plot_result(result_dict, self._mod_config.plot, self._mod_config.plot_save_file)
+    df['date'] = pd.to_datetime(df['date'])
 
-        return result_dict
+    total_portfolios = df.set_index('date').sort_index()
+
+    result_dict = {
+        'summary': summary,
+        'trades': trades,
+        'portfolio': total_portfolios,
+    }
+
+    if total_benchmark_portfolios is not None:
+        b_df = pd.DataFrame(total_benchmark_portfolios)
+        df['date'] = pd.to_datetime(df['date'])
+        benchmark_portfolios = b_df.set_index('date').sort_index()
+        result_dict['benchmark_portfolio'] = benchmark_portfolios
+
+    if plots:
+        plots_items = defaultdict(dict)
+        for series_name, value_dict in six.iteritems(plots):
+            for date, value in six.iteritems(value_dict):
+                plots_items[date][series_name] = value
+                plots_items[date]["date"] = date
+
+        df = pd.DataFrame([dict_data for date, dict_data in six.iteritems(plots_items)])
+
+        df["date"] = pd.to_datetime(df["date"])
+        df = df.set_index("date").sort_index()
+        result_dict["plots"] = df
+
+    for account_type, portfolios_list, positions_list in accounts:
+        account_name = account_type.lower()
+        df = pd.DataFrame(portfolios_list)
+        df["date"] = pd.to_datetime(df["date"])
+        account_df = df.set_index("date").sort_index()
+        result_dict["{}_account".format(account_name)] = account_df
+
+        positions_df = pd.DataFrame(positions_list)
+        if "date" in positions_df.columns:
+            positions_df["date"] = pd.to_datetime(positions_df["date"])
+            positions_df = positions_df.set_index("date").sort_index()
+        result_dict["{}_positions".format(account_name)] = positions_df
+
+    return result_dict
+
+
+def output_result(result_dict, mod_config):
+    if mod_config.output_file:
+        with open(mod_config.output_file, 'wb') as f:
+            pickle.dump(result_dict, f)
+
+    if mod_config.report_save_path:
+        from .report import generate_report
+        generate_report(result_dict, mod_config.report_save_path)
+
+    if mod_config.plot or mod_config.plot_save_file:
+        from .plot import plot_result
+        plot_result(result_dict, mod_config.plot, mod_config.plot_save_file)
@@ -40,7 +40,7 @@ def generate_report(result_dict, target_report_csv_path):
         csvfile.write(csv_txt.getvalue())
 
     for name in ["portfolio", "stock_account", "future_account",
-                 "stock_positions", "future_positions", "trades"]:
+                 "stock_positions", "future_positions", "trades", "event_profile"]:
         try:
             df = result_dict[name]
         except KeyError:
@@ -87,9 +87,12 @@ class StockTransactionCostDecider(AbstractTransactionCostDecider):
 
 
 class CNStockTransactionCostDecider(StockTransactionCostDecider):
+    COMMISSION_RATE = 0.0008
+    TAX_RATE = 0.001
+
     def __init__(self, commission_multiplier, min_commission):
-        super(CNStockTransactionCostDecider, self).__init__(0.0008, commission_multiplier, min_commission)
-        self.tax_rate = 0.001
+        super(CNStockTransactionCostDecider, self).__init__(self.COMMISSION_RATE, commission_multiplier, min_commission)
+        self.tax_rate = self.TAX_RATE
 
     def _get_tax(self, order_book_id, side, cost_money):
         instrument = Environment.get_instance().get_instrument(order_book_id)
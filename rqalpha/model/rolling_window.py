@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import six
+import numpy as np
+
+from rqalpha.events import EVENT
+from rqalpha.execution_context import ExecutionContext
+from rqalpha.const import EXECUTION_PHASE
+from rqalpha.data.base_data_source.adjust import PRICE_FIELDS, _factor_for_date
+from rqalpha.utils.datetime_func import convert_date_to_int
+
+
+class RollingWindow(object):
+    """
+    多个合约最近 bar_count 个交易日的日线数据，按交易日历对齐，缺失数据（未上市、已退市等）为 NaN。
+
+    每个字段预先分配 2 * bar_count 行的缓冲区，每个交易日只追加一行，追加到末尾时将后半段整体移回前半段，
+    因此窗口始终是缓冲区上连续的一段，读取时直接返回视图而不必拷贝。前复权的数据只在合约的复权基准
+    （当前交易日所在的除权区间）发生变化时才重新读取整列数据。
+
+    窗口在 PRE_BAR 事件中提前更新；tick 回测中没有 PRE_BAR 事件，由读取时的 _sync 按当前时间更新。
+    每个窗口都会注册一个不会被移除的事件监听，因此只应在策略初始化时创建。
+    """
+
+    def __init__(self, env, order_book_ids, bar_count, fields, adjust_type='pre'):
+        self._env = env
+        self._order_book_ids = list(order_book_ids)
+        self._instruments = [env.data_proxy.instruments(o) for o in self._order_book_ids]
+        self._bar_count = bar_count
+        self._fields = [fields] if isinstance(fields, six.string_types) else list(fields)
+        self._adjust_type = adjust_type
+
+        self._buffers = {f: np.full((bar_count * 2, len(self._order_book_ids)), np.nan) for f in self._fields}
+        self._datetime = np.zeros(bar_count * 2, dtype=np.uint64)
+        self._end = bar_count
+        self._ordinal = None
+        self._trading_date = None
+        self._synced_dt = None
+
+        # 除权因子，None 表示无需复权；数据源不提供除权因子时每次都重新读取整个窗口
+        self._ex_factors = [self._ex_factors_of(i) for i in self._instruments]
+        self._base_factors = [None] * len(self._instruments)
+
+        env.event_bus.add_listener(EVENT.PRE_BAR, self._on_pre_bar)
+
+    def _ex_factors_of(self, instrument):
+        if self._adjust_type == 'none' or instrument.type in {'Future', 'INDX'}:
+            return None
+        if len(self._fields) == 1 and self._fields[0] not in PRICE_FIELDS and self._fields[0] != 'volume':
+            return None
+        if not hasattr(self._env.data_source, 'get_ex_cum_factor'):
+            return False
+        ex_factors = self._env.data_source.get_ex_cum_factor(instrument.order_book_id)
+        if ex_factors is None or len(ex_factors) == 0:
+            return None
+        return ex_factors['start_date'], ex_factors['ex_cum_factor']
+
+    @property
+    def order_book_ids(self):
+        return self._order_book_ids
+
+    @property
+    def fields(self):
+        return self._fields
+
+    @property
+    def datetime(self):
+        """
+        [numpy.ndarray] 窗口内各交易日，YYYYMMDDHHMMSS 格式的整数，尚未覆盖的部分为 0
+        """
+        self._sync()
+        return self._datetime[self._end - self._bar_count:self._end]
+
+    def __getitem__(self, field):
+        """
+        :return: shape 为 (bar_count, len(order_book_ids)) 的视图，最后一行为最近的交易日
+        """
+        self._sync()
+        return self._buffers[field][self._end - self._bar_count:self._end]
+
+    def __repr__(self):
+        return "{}({}, {}, {})".format(type(self).__name__, self._order_book_ids, self._bar_count, self._fields)
+
+    def _on_pre_bar(self, _):
+        env = self._env
+        if env.config.base.frequency == '1d':
+            self._advance(env.calendar_dt)
+        else:
+            # 分钟及 tick 回测中当日的日线尚未完成
+            self._advance(env.data_proxy.get_previous_trading_date(env.trading_dt.date()))
+
+    def _sync(self):
+        # 与 history_bars(include_now=False) 的口径一致
+        env = self._env
+        if env.calendar_dt == self._synced_dt:
+            return
+        phase = ExecutionContext.phase()
+        if phase == EXECUTION_PHASE.BEFORE_TRADING or (
+            env.config.base.frequency != '1d' and phase != EXECUTION_PHASE.AFTER_TRADING
+        ):
+            self._advance(env.data_proxy.get_previous_trading_date(env.trading_dt.date()))
+        else:
+            self._advance(env.calendar_dt)
+        self._synced_dt = env.calendar_dt
+
+    def _advance(self, dt):
+        data_proxy = self._env.data_proxy
+        ordinal = data_proxy.get_trading_date_ordinal(dt)
+        if not data_proxy.is_trading_date(dt):
+            ordinal -= 1
+        trading_date = self._env.trading_dt.date()
+        if ordinal == self._ordinal and trading_date == self._trading_date:
+            return
+
+        refill = []
+        if trading_date != self._trading_date:
+            # 复权基准随交易日变化，只有跨越除权日的合约需要重新读取
+            base_factors = self._current_base_factors()
+            refill = [
+                col for col, (ex_factors, old, new) in enumerate(
+                    zip(self._ex_factors, self._base_factors, base_factors)
+                ) if ex_factors is False or old != new
+            ]
+            self._base_factors = base_factors
+            self._trading_date = trading_date
+
+        if self._ordinal is None or ordinal - self._ordinal not in (0, 1) or len(refill) == len(self._instruments):
+            self._fill(dt, range(len(self._instruments)), reset=True)
+        else:
+            if ordinal == self._ordinal + 1:
+                self._append(dt)
+            if refill:
+                self._fill(dt, refill)
+        self._ordinal = ordinal
+
+    def _current_base_factors(self):
+        if self._adjust_type != 'pre':
+            return [1.] * len(self._instruments)
+        adjust_orig = np.uint64(convert_date_to_int(self._env.trading_dt))
+        return [
+            _factor_for_date(ex_factors[0], ex_factors[1], adjust_orig) if ex_factors else 1.
+            for ex_factors in self._ex_factors
+        ]
+
+    def _append(self, dt):
+        n = self._bar_count
+        if self._end == 2 * n:
+            for buffer in six.itervalues(self._buffers):
+                buffer[:n] = buffer[n:]
+            self._datetime[:n] = self._datetime[n:]
+            self._end = n
+
+        row = self._end
+        date = np.uint64(convert_date_to_int(dt))
+        self._datetime[row] = date
+        data_source = self._env.data_source
+        for col, instrument in enumerate(self._instruments):
+            bar = data_source.get_bar(instrument, dt, '1d')
+            names = () if bar is None else bar.dtype.names
+            ex_factors = self._ex_factors[col]
+            factor = _factor_for_date(ex_factors[0], ex_factors[1], date) / self._base_factors[col] if ex_factors else 1.
+            for f, buffer in six.iteritems(self._buffers):
+                if f not in names:
+                    buffer[row, col] = np.nan
+                elif f in PRICE_FIELDS:
+                    buffer[row, col] = bar[f] * factor
+                elif f == 'volume':
+                    buffer[row, col] = bar[f] * (1 / factor)
+                else:
+                    buffer[row, col] = bar[f]
+        self._end += 1
+
+    def _fill(self, dt, cols, reset=False):
+        data_proxy = self._env.data_proxy
+        n = self._bar_count
+        if reset:
+            for buffer in six.itervalues(self._buffers):
+                buffer[:] = np.nan
+            self._datetime[:] = 0
+            self._end = n
+            dates = data_proxy.get_n_trading_date_ints_until(dt, n)
+            self._datetime[n - len(dates):n] = np.asarray(dates, dtype=np.uint64) * np.uint64(1000000)
+
+        bars = data_proxy.history_bars_batch(
+            [self._order_book_ids[col] for col in cols], n, '1d', self._fields, dt,
+            adjust_type=self._adjust_type, adjust_orig=self._env.trading_dt
+        )
+        rows = slice(self._end - len(bars), self._end)
+        for f, buffer in six.iteritems(self._buffers):
+            buffer[rows, list(cols)] = bars[f]
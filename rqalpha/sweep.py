@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import copy
+import itertools
+import multiprocessing
+import os
+
+import pandas as pd
+import six
+
+from rqalpha import main
+from rqalpha.environment import Environment
+from rqalpha.execution_context import ExecutionContext
+from rqalpha.utils import RqAttrDict, scheduler as mod_scheduler
+from rqalpha.utils.py2 import clear_all_cached_functions
+
+# 进程内复用的数据源，以 (data_bundle_path, data_shm_path) 为 key；fork 出的 worker 直接继承父进程中已创建的数据源
+_data_sources = {}
+
+
+def _data_source_key(config):
+    return config.base.data_bundle_path, getattr(config.base, "data_shm_path", None)
+
+
+def _get_data_source(config):
+    key = _data_source_key(config)
+    try:
+        return _data_sources[key]
+    except KeyError:
+        data_source = _data_sources[key] = main.create_data_source(config)
+        return data_source
+
+
+def expand_param_grid(param_grid):
+    """
+    将 {name: [value, ...]} 展开为参数组合的列表，也可以直接传入参数组合的列表
+    """
+    if isinstance(param_grid, dict):
+        names = list(param_grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+    return [dict(params) for params in param_grid]
+
+
+def apply_params(config, params):
+    """
+    返回应用了一组参数的配置副本。包含 `.` 的参数名视为配置路径（如 mod.sys_simulation.slippage），
+    其余参数通过 extra.context_vars 在策略 init 之后设置到 context 上。
+    """
+    config = copy.deepcopy(config)
+    # context_vars 可能为 None、RqAttrDict 或由 --extra-vars 的 json 解析得到的 dict，统一为 dict 后按 key 赋值
+    context_vars = config.extra.context_vars
+    if isinstance(context_vars, RqAttrDict):
+        context_vars = dict(context_vars.items())
+    context_vars = dict(context_vars or {})
+    for name, value in six.iteritems(params):
+        if "." not in name:
+            context_vars[name] = value
+            continue
+        path = name.split(".")
+        target = config
+        for p in path[:-1]:
+            try:
+                target = getattr(target, p)
+            except AttributeError:
+                raise ValueError("invalid config path {}".format(name))
+        if name in ("base.start_date", "base.end_date"):
+            value = pd.Timestamp(value).date()
+        setattr(target, path[-1], value)
+    if context_vars:
+        config.extra.context_vars = context_vars
+    return config
+
+
+def suffix_analyser_outputs(config, suffix):
+    """
+    为 sys_analyser 输出的 pickle、report 及图片路径加上后缀，避免多次运行写入同一个文件；同时关闭画图窗口。原地修改 config。
+    """
+    mod_config = getattr(config.mod, "sys_analyser", None)
+    if mod_config is None:
+        return
+    for key in ("output_file", "plot_save_file"):
+        path = getattr(mod_config, key, None)
+        if path:
+            root, ext = os.path.splitext(path)
+            setattr(mod_config, key, "{}_{}{}".format(root, suffix, ext))
+    # report_save_path 为目录
+    path = getattr(mod_config, "report_save_path", None)
+    if path:
+        mod_config.report_save_path = "{}_{}".format(path.rstrip("/\\"), suffix)
+    mod_config.plot = False
+
+
+def _run_job(job):
+    index, params, config = job
+
+    # Environment 及调度器等是进程级的单例，每次运行前后都需要复位，避免上一次运行的状态泄漏到下一次
+    Environment._env = None
+    mod_scheduler._scheduler = None
+    depth = len(ExecutionContext.stack.stack)
+    clear_all_cached_functions()
+    try:
+        result = main.run(config, data_source=_get_data_source(config))
+    finally:
+        del ExecutionContext.stack.stack[depth:]
+        Environment._env = None
+        mod_scheduler._scheduler = None
+
+    summary = None
+    if result is not None and result.get("sys_analyser"):
+        summary = result["sys_analyser"]["summary"]
+    return index, params, summary
+
+
+def iter_sweep(config, param_grid, workers=None):
+    """
+    以进程池并行运行参数网格中的每一组参数，按完成的先后顺序 yield (index, params, summary)。
+    运行失败时 summary 为 None。sys_analyser 输出的文件路径加上参数组合的序号作为后缀，参见 :func:`suffix_analyser_outputs`。
+
+    :param config: 经过 parse_config 处理的配置
+    :param param_grid: {name: [value, ...]} 或参数组合的列表，参见 :func:`apply_params`
+    :param workers: 进程数，默认为 CPU 核数；为 1 时在当前进程中依次运行
+    """
+    jobs = []
+    for i, params in enumerate(expand_param_grid(param_grid)):
+        job_config = apply_params(config, params)
+        suffix_analyser_outputs(job_config, i)
+        jobs.append((i, params, job_config))
+    if not jobs:
+        return
+    workers = min(workers or multiprocessing.cpu_count(), len(jobs))
+
+    # 在创建进程池之前创建数据源，使用 fork 时各 worker 共享父进程中已加载的数据（写时复制）
+    for _, _, job_config in jobs:
+        _get_data_source(job_config)
+
+    if workers == 1:
+        for job in jobs:
+            yield _run_job(job)
+        return
+
+    pool = multiprocessing.Pool(workers)
+    try:
+        for r in pool.imap_unordered(_run_job, jobs):
+            yield r
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def to_row(params, summary):
+    row = dict(summary or {})
+    row.update(params)
+    return row
+
+
+def run_sweep(config, param_grid, workers=None, callback=None):
+    """
+    运行参数网格并将各次运行的 sys_analyser summary 汇总为 DataFrame，index 与参数组合的顺序一致
+
+    :param callback: 每完成一次运行即以 (index, params, summary) 调用
+    """
+    rows = {}
+    for index, params, summary in iter_sweep(config, param_grid, workers):
+        rows[index] = to_row(params, summary)
+        if callback is not None:
+            callback(index, params, summary)
+    indexes = sorted(rows)
+    return pd.DataFrame([rows[i] for i in indexes], index=indexes)
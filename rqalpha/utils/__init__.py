@@ -160,6 +160,7 @@ def run_when_strategy_not_hold(func):
     from rqalpha.environment import Environment
     from rqalpha.utils.logger import system_log
 
+    @six.wraps(func)
     def wrapper(*args, **kwargs):
         if not Environment.get_instance().config.extra.is_hold:
             return func(*args, **kwargs)
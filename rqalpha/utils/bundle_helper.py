@@ -13,6 +13,7 @@
 #         详细的授权流程，请联系 public@ricequant.com 获取。
 import os
 import shutil
+import hashlib
 import tarfile
 import tempfile
 import time
@@ -21,12 +22,30 @@ import datetime
 import click
 import requests
 import six
+import simplejson as json
+import numpy as np
 
 from rqalpha.utils.config import set_locale
 from rqalpha.utils.i18n import gettext as _
 
 CDN_URL = 'http://bundle.assets.ricequant.com/bundles_v3/rqbundle_%04d%02d%02d.tar.bz2'
 
+DAY_BAR_TABLES = ['stocks', 'indexes', 'futures', 'funds', 'public_funds']
+MMAP_LAYOUT_VERSION = 1
+
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+MANIFEST_BLOCK_SIZE = 4 << 20
+# 由本机生成的衍生数据，不写入 manifest，同步时保留在本地：衍生数据缓存、convert/compile 生成的 memmap 日线及临时文件
+LOCAL_ONLY_DIRS = ('.cache', )
+LOCAL_ONLY_SUFFIXES = ('.mmap', '.tmp')
+
+
+def get_bundle_path(data_bundle_path=None):
+    if data_bundle_path is None:
+        return os.path.abspath(os.path.expanduser('~/.rqalpha/bundle'))
+    return os.path.abspath(os.path.join(data_bundle_path, './bundle/'))
+
 
 def get_exactly_url():
     day = datetime.date.today()
@@ -66,11 +85,8 @@ def download(out, total_length, url):
 
 def update_bundle(data_bundle_path=None, locale="zh_Hans_CN", confirm=True):
     set_locale(locale)
-    default_bundle_path = os.path.abspath(os.path.expanduser('~/.rqalpha/bundle'))
-    if data_bundle_path is None:
-        data_bundle_path = default_bundle_path
-    else:
-        data_bundle_path = os.path.abspath(os.path.join(data_bundle_path, './bundle/'))
+    default_bundle_path = get_bundle_path()
+    data_bundle_path = get_bundle_path(data_bundle_path)
     if (confirm and os.path.exists(data_bundle_path) and data_bundle_path != default_bundle_path and
             os.listdir(data_bundle_path)):
         click.confirm(_(u"""
@@ -92,3 +108,652 @@ Are you sure to continue?""").format(data_bundle_path=data_bundle_path), abort=T
     tar.close()
     os.remove(tmp)
     six.print_(_(u"Data bundle download successfully in {bundle_path}").format(bundle_path=data_bundle_path))
+
+
+def _file_digest(path, block_size):
+    # 返回整个文件的 md5，以及按 block_size 切分后各块的 md5
+    total = hashlib.md5()
+    blocks = []
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(block_size)
+            if not data:
+                break
+            total.update(data)
+            blocks.append(hashlib.md5(data).hexdigest())
+    return total.hexdigest(), blocks
+
+
+def _is_local_only(rel):
+    parts = rel.split('/')
+    return parts[0] in LOCAL_ONLY_DIRS or any(p.endswith(LOCAL_ONLY_SUFFIXES) for p in parts)
+
+
+def make_manifest(data_bundle_path, block_size=MANIFEST_BLOCK_SIZE):
+    """
+    生成 bundle 目录的 manifest：各文件的大小、md5，超过 block_size 的文件另外记录各块的 md5，
+    供 sync_bundle 只下载发生变化的块。本机生成的衍生数据（见 LOCAL_ONLY_DIRS、LOCAL_ONLY_SUFFIXES）不写入 manifest。
+    """
+    dirs = []
+    files = {}
+    for root, dir_names, file_names in os.walk(data_bundle_path):
+        for name in list(dir_names):
+            rel = os.path.relpath(os.path.join(root, name), data_bundle_path).replace(os.sep, '/')
+            if _is_local_only(rel):
+                dir_names.remove(name)
+            else:
+                dirs.append(rel)
+        for name in file_names:
+            path = os.path.join(root, name)
+            rel = os.path.relpath(path, data_bundle_path).replace(os.sep, '/')
+            if rel == MANIFEST_FILE or _is_local_only(rel):
+                continue
+            md5, blocks = _file_digest(path, block_size)
+            entry = {'size': os.path.getsize(path), 'md5': md5}
+            if len(blocks) > 1:
+                entry['blocks'] = blocks
+            files[rel] = entry
+    return {'version': MANIFEST_VERSION, 'block_size': block_size, 'dirs': sorted(dirs), 'files': files}
+
+
+def dump_manifest(data_bundle_path=None, block_size=MANIFEST_BLOCK_SIZE):
+    data_bundle_path = get_bundle_path(data_bundle_path)
+    manifest = make_manifest(data_bundle_path, block_size)
+    with open(os.path.join(data_bundle_path, MANIFEST_FILE), 'w') as f:
+        json.dump(manifest, f)
+    return manifest
+
+
+def _link_or_copy(src, dst):
+    # 未变化的文件直接硬链接到新目录，不支持时退化为拷贝
+    try:
+        os.link(src, dst)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst)
+
+
+def _download_file(url, dst):
+    r = requests.get(url, stream=True, timeout=30)
+    r.raise_for_status()
+    size = 0
+    with open(dst, 'wb') as out:
+        for data in r.iter_content(chunk_size=65536):
+            out.write(data)
+            size += len(data)
+    return size
+
+
+def _patch_file(url, src, dst, remote_blocks, local_blocks, block_size):
+    """
+    与本地文件相同位置上 md5 一致的块直接从本地拷贝，其余连续的块合并为一次 Range 请求下载。
+    对于只在末尾追加数据的列文件（bcolz 的数据块、memmap 的 .npy），只需下载头部和新增的部分。
+    服务器不支持 Range 时退化为下载整个文件。返回下载的字节数。
+    """
+    reuse = [i < len(local_blocks) and local_blocks[i] == b for i, b in enumerate(remote_blocks)]
+    size = 0
+    with open(src, 'rb') as local, open(dst, 'wb') as out:
+        i = 0
+        while i < len(reuse):
+            j = i
+            while j < len(reuse) and reuse[j] == reuse[i]:
+                j += 1
+            if reuse[i]:
+                local.seek(i * block_size)
+                out.write(local.read((j - i) * block_size))
+            else:
+                headers = {'Range': 'bytes={}-{}'.format(i * block_size, j * block_size - 1)}
+                r = requests.get(url, headers=headers, stream=True, timeout=30)
+                r.raise_for_status()
+                if r.status_code != 206:
+                    r.close()
+                    break
+                for data in r.iter_content(chunk_size=65536):
+                    out.write(data)
+                    size += len(data)
+            i = j
+        else:
+            return size
+    return _download_file(url, dst)
+
+
+def _check_manifest_path(rel):
+    # manifest 中的路径必须是 bundle 目录下的相对路径，防止写到 bundle 目录之外
+    parts = rel.split('/')
+    if not rel or os.path.isabs(rel) or '\\' in rel or ':' in parts[0] or any(p in ('', '.', '..') for p in parts):
+        raise RuntimeError(_(u"invalid path in manifest: {path}").format(path=rel))
+
+
+def _sync_file(base_url, data_bundle_path, staging, rel, entry, block_size):
+    # 将 manifest 中的一个文件放入 staging 目录并校验，返回下载的字节数，本地文件未变化时返回 None
+    src = os.path.join(data_bundle_path, *rel.split('/'))
+    dst = os.path.join(staging, *rel.split('/'))
+    url = base_url + six.moves.urllib.parse.quote(rel)
+
+    local_md5, local_blocks = _file_digest(src, block_size) if os.path.isfile(src) else (None, [])
+    if local_md5 == entry['md5'] and os.path.getsize(src) == entry['size']:
+        _link_or_copy(src, dst)
+        return None
+
+    if local_blocks and 'blocks' in entry:
+        size = _patch_file(url, src, dst, entry['blocks'], local_blocks, block_size)
+    else:
+        size = _download_file(url, dst)
+
+    if os.path.getsize(dst) != entry['size'] or _file_digest(dst, block_size)[0] != entry['md5']:
+        raise RuntimeError(_(u"checksum mismatch: {url}").format(url=url))
+    return size
+
+
+def sync_bundle(base_url, data_bundle_path=None, workers=4, locale="zh_Hans_CN"):
+    """
+    根据 base_url 下的 manifest.json 增量更新 bundle：未变化的文件直接复用，变化的文件只下载不同的块。
+    全部文件在临时目录中下载并校验完毕后再整体替换 bundle 目录，更新失败时原 bundle 不受影响。
+    不在 manifest 中的本地数据（分钟线、tick、panel、衍生数据缓存等）原样保留；数据源表发生变化的 memmap 日线
+    不再保留，需要重新运行 `rqalpha bundle convert` 或 `rqalpha bundle compile`。
+    base_url 可以是任意 HTTP 地址，例如在 dump_manifest 之后的 bundle 目录下启动的 `python -m http.server`。
+    """
+    set_locale(locale)
+    data_bundle_path = get_bundle_path(data_bundle_path)
+    count, total, size, dropped = sync_from_manifest(base_url, data_bundle_path, workers)
+    six.print_(_(u"Data bundle synced in {bundle_path}, {count} of {total} files downloaded, {size} bytes").format(
+        bundle_path=data_bundle_path, count=count, total=total, size=size
+    ))
+    for rel in dropped:
+        six.print_(_(u"{path} is removed since its source table is updated, please convert or compile again").format(
+            path=rel
+        ))
+
+
+def _read_manifest(data_bundle_path):
+    # 上次同步时保存的 manifest，不存在时为空
+    try:
+        with open(os.path.join(data_bundle_path, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+        return set(manifest['dirs']), set(manifest['files'])
+    except (IOError, OSError, ValueError, KeyError):
+        return set(), set()
+
+
+def _link_tree(src, dst):
+    if not os.path.isdir(src):
+        _link_or_copy(src, dst)
+        return
+    os.makedirs(dst)
+    for name in os.listdir(src):
+        _link_tree(os.path.join(src, name), os.path.join(dst, name))
+
+
+def _carry_over_local(data_bundle_path, staging, manifest, updated):
+    """
+    将 bundle 中不属于 manifest 的本地数据硬链接到 staging 目录，返回因数据源表更新而不再保留的路径。
+
+    上次同步的 manifest 中出现过、而新的 manifest 中没有的路径视为在服务端已被删除，不再保留。
+    """
+    old_dirs, old_files = _read_manifest(data_bundle_path)
+    dirs, files = set(manifest['dirs']), set(manifest['files'])
+    dropped = []
+
+    def walk(rel_dir):
+        path = os.path.join(data_bundle_path, *rel_dir.split('/')) if rel_dir else data_bundle_path
+        for name in sorted(os.listdir(path)):
+            rel = rel_dir + '/' + name if rel_dir else name
+            src = os.path.join(path, name)
+            if rel == MANIFEST_FILE or rel in files or rel in old_files or (rel in old_dirs and rel not in dirs):
+                continue
+            if rel in dirs:
+                if os.path.isdir(src):
+                    walk(rel)
+                continue
+            table = name[:-len('.mmap')] if not rel_dir and name.endswith('.mmap') else None
+            if table is not None and any(r.startswith(table + '.bcolz/') for r in updated):
+                # 由已更新的 bcolz 表生成的 memmap 日线已过期，保留会覆盖新的数据
+                dropped.append(rel)
+                continue
+            _link_tree(src, os.path.join(staging, *rel.split('/')))
+
+    if os.path.isdir(data_bundle_path):
+        walk('')
+    return dropped
+
+
+def sync_from_manifest(base_url, data_bundle_path, workers=4):
+    # 返回 (更新的文件数, 文件总数, 下载的字节数, 因数据源表更新而删除的本地 memmap 日线)
+    from multiprocessing.pool import ThreadPool
+
+    base_url = base_url.rstrip('/') + '/'
+    r = requests.get(base_url + MANIFEST_FILE, timeout=30)
+    r.raise_for_status()
+    manifest = r.json()
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise RuntimeError(_(u"unsupported manifest version {version}").format(version=manifest.get('version')))
+    block_size = manifest['block_size']
+    for rel in list(manifest['dirs']) + list(manifest['files']):
+        _check_manifest_path(rel)
+    files = sorted(six.iteritems(manifest['files']))
+
+    staging = data_bundle_path + '.sync'
+    shutil.rmtree(staging, ignore_errors=True)
+    try:
+        os.makedirs(staging)
+        for rel in manifest['dirs']:
+            os.makedirs(os.path.join(staging, *rel.split('/')))
+
+        pool = ThreadPool(max(workers, 1))
+        try:
+            downloaded = {}
+            with click.progressbar(length=len(files), label=_(u"syncing ...")) as bar:
+                for rel, size in pool.imap_unordered(
+                    lambda item: (
+                        item[0], _sync_file(base_url, data_bundle_path, staging, item[0], item[1], block_size)
+                    ), files
+                ):
+                    downloaded[rel] = size
+                    bar.update(1)
+        finally:
+            pool.close()
+            pool.join()
+
+        updated = [rel for rel, size in six.iteritems(downloaded) if size is not None]
+        dropped = _carry_over_local(data_bundle_path, staging, manifest, updated)
+        with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _swap_dir(staging, data_bundle_path)
+    return len(updated), len(files), sum(size or 0 for size in six.itervalues(downloaded)), dropped
+
+
+def _write_mmap_meta(path, names, line_map, **meta):
+    from rqalpha.data.base_data_source.storages import MMAP_META_FILE, MMAP_LINE_MAP_FILE
+
+    with open(os.path.join(path, MMAP_LINE_MAP_FILE), 'w') as f:
+        json.dump({k: [int(s), int(e)] for k, (s, e) in six.iteritems(line_map)}, f)
+    meta.update(version=MMAP_LAYOUT_VERSION, names=list(names))
+    with open(os.path.join(path, MMAP_META_FILE), 'w') as f:
+        json.dump(meta, f)
+
+
+def _swap_dir(tmp, target):
+    # 先将旧目录改名移开再放入新目录，target 只在两次 rename 之间的极短时间内不存在
+    old = target + '.old'
+    shutil.rmtree(old, ignore_errors=True)
+    if os.path.exists(target):
+        os.rename(target, old)
+    os.rename(tmp, target)
+    shutil.rmtree(old, ignore_errors=True)
+
+
+def dump_mmap_table(target, names, columns, line_map, compiled=False):
+    """
+    将按列组织的数据写为 memmap 格式：每列一个 little-endian 的 .npy 文件，外加 line_map 索引。
+    先写入临时目录再整体替换 target，避免读到写了一半的数据。
+
+    compiled 表示 columns 已经经过 Converter 转换，读取时不再转换。
+    """
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    for name in names:
+        col = np.asarray(columns[name][:])
+        np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(col, dtype=col.dtype.newbyteorder('<')))
+    _write_mmap_meta(tmp, names, line_map, compiled=compiled)
+    _swap_dir(tmp, target)
+
+
+def dump_mmap_records(target, names, columns, line_map):
+    """
+    将已经经过 Converter 转换的日线数据写为行式的 memmap 格式：整张表为一个结构化的 .npy 文件，
+    date 列写为 YYYYmmddHHMMSS 格式的 datetime 字段。MmapDayBarStore 读取时直接返回该文件上的视图。
+    """
+    from rqalpha.data.base_data_source.storages import MMAP_RECORDS_FILE, MMAP_RECORDS_LAYOUT
+
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    fields = [name for name in names if name != 'date']
+    # 逐列转换并暂存为 .npy，再拼为一张结构化的表，整张表不需要同时放在内存中
+    cols = {}
+    for name in fields:
+        col = np.asarray(columns[name])
+        np.save(os.path.join(tmp, name + '.npy'), np.ascontiguousarray(col, dtype=col.dtype.newbyteorder('<')))
+        del col
+        cols[name] = np.load(os.path.join(tmp, name + '.npy'), mmap_mode='r')
+    dtype = np.dtype([('datetime', '<u8')] + [(name, cols[name].dtype) for name in fields])
+    date = np.asarray(columns['date'][:])
+    records = np.lib.format.open_memmap(
+        os.path.join(tmp, MMAP_RECORDS_FILE), mode='w+', dtype=dtype, shape=(len(date), )
+    )
+    records['datetime'] = date
+    records['datetime'] *= 1000000
+    for name in fields:
+        col = cols.pop(name)
+        records[name] = col
+        del col
+        os.remove(os.path.join(tmp, name + '.npy'))
+    records.flush()
+    del records
+    _write_mmap_meta(tmp, dtype.names, line_map, compiled=True, layout=MMAP_RECORDS_LAYOUT)
+    _swap_dir(tmp, target)
+
+
+class _MmapTableWriter(object):
+    """
+    逐块追加写入 memmap 格式的数据，整张表不需要同时放在内存中。
+    各列先以裸二进制追加到临时文件，close 时再拷贝为 .npy 文件。
+    """
+
+    def __init__(self, target, dtypes):
+        self._target = target
+        self._tmp = target + '.tmp'
+        self._dtypes = [(name, np.dtype(dtype).newbyteorder('<')) for name, dtype in dtypes]
+        self._length = 0
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        os.makedirs(self._tmp)
+        self._files = {name: open(self._raw_path(name), 'wb') for name, _ in self._dtypes}
+
+    def _raw_path(self, name):
+        return os.path.join(self._tmp, name + '.raw')
+
+    def __len__(self):
+        return self._length
+
+    def append(self, columns):
+        length = None
+        for name, dtype in self._dtypes:
+            col = np.ascontiguousarray(columns[name], dtype=dtype)
+            col.tofile(self._files[name])
+            length = len(col)
+        self._length += length
+
+    def close(self, line_map, **meta):
+        for name, dtype in self._dtypes:
+            self._files[name].close()
+            out = np.lib.format.open_memmap(
+                os.path.join(self._tmp, name + '.npy'), mode='w+', dtype=dtype, shape=(self._length, )
+            )
+            if self._length > 0:
+                out[:] = np.memmap(self._raw_path(name), dtype=dtype, mode='r', shape=(self._length, ))
+            out.flush()
+            del out
+            os.remove(self._raw_path(name))
+        _write_mmap_meta(self._tmp, [name for name, _ in self._dtypes], line_map, **meta)
+        _swap_dir(self._tmp, self._target)
+
+
+def convert_bundle(data_bundle_path=None, locale="zh_Hans_CN"):
+    import bcolz
+
+    set_locale(locale)
+    data_bundle_path = get_bundle_path(data_bundle_path)
+    for name in DAY_BAR_TABLES:
+        src = os.path.join(data_bundle_path, name + '.bcolz')
+        if not os.path.exists(src):
+            continue
+        table = bcolz.open(src, 'r')
+        target = os.path.join(data_bundle_path, name + '.mmap')
+        dump_mmap_table(target, table.names, table.cols, table.attrs['line_map'])
+        six.print_(_(u"{src} converted to {target}").format(src=src, target=target))
+
+
+class _CompiledColumns(object):
+    def __init__(self, cols, converter, float_dtype):
+        self._cols = cols
+        self._converter = converter
+        self._float_dtype = float_dtype
+
+    def __getitem__(self, name):
+        return self._converter.compile(name, self._cols[name][:], self._float_dtype)
+
+
+def _day_bar_converters():
+    from rqalpha.data.base_data_source.converter import (
+        StockBarConverter, IndexBarConverter, FutureDayBarConverter, FundDayBarConverter, PublicFundDayBarConverter
+    )
+
+    return {
+        'stocks': StockBarConverter,
+        'indexes': IndexBarConverter,
+        'futures': FutureDayBarConverter,
+        'funds': FundDayBarConverter,
+        'public_funds': PublicFundDayBarConverter,
+    }
+
+
+def compile_bundle(data_bundle_path=None, locale="zh_Hans_CN", float_dtype='float64'):
+    import bcolz
+
+    converters = _day_bar_converters()
+
+    set_locale(locale)
+    data_bundle_path = get_bundle_path(data_bundle_path)
+    float_dtype = np.dtype(float_dtype)
+    for name in DAY_BAR_TABLES:
+        src = os.path.join(data_bundle_path, name + '.bcolz')
+        if not os.path.exists(src):
+            continue
+        table = bcolz.open(src, 'r')
+        target = os.path.join(data_bundle_path, name + '.mmap')
+        columns = _CompiledColumns(table.cols, converters[name], float_dtype)
+        dump_mmap_records(target, table.names, columns, table.attrs['line_map'])
+        six.print_(_(u"{src} compiled to {target}").format(src=src, target=target))
+
+
+def build_panel(data_bundle_path=None, fields=('close', 'volume'), tables=('stocks', ), locale="zh_Hans_CN"):
+    """
+    将 tables 中全部合约的 fields 字段按交易日历展开为 [交易日, 合约] 的二维 memmap，供 get_panel 读取
+    """
+    set_locale(locale)
+    data_bundle_path = get_bundle_path(data_bundle_path)
+    count = dump_panel(data_bundle_path, fields, tables)
+    six.print_(_(u"panel of {count} instruments built").format(count=count))
+
+
+def dump_panel(data_bundle_path, fields, tables):
+    # 返回写入的合约个数
+    from rqalpha.data.base_data_source.storages import (
+        DayBarStore, MmapDayBarStore, TradingDatesStore, PANEL_DIR, PANEL_DATES_FILE
+    )
+
+    converters = _day_bar_converters()
+    calendar = TradingDatesStore(os.path.join(data_bundle_path, 'trading_dates.bcolz')).get_trading_date_ints()
+
+    stores = {}
+    for name in tables:
+        if os.path.exists(os.path.join(data_bundle_path, name + '.mmap')):
+            store = MmapDayBarStore(os.path.join(data_bundle_path, name + '.mmap'), converters[name])
+        elif os.path.exists(os.path.join(data_bundle_path, name + '.bcolz')):
+            store = DayBarStore(os.path.join(data_bundle_path, name + '.bcolz'), converters[name])
+        else:
+            continue
+        for order_book_id in store._index:
+            # 同一个 order_book_id 出现在多张表中时以 tables 中靠前的为准
+            stores.setdefault(order_book_id, store)
+    order_book_ids = sorted(stores)
+
+    target = os.path.join(data_bundle_path, PANEL_DIR)
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    panels = {}
+    for f in fields:
+        panels[f] = np.lib.format.open_memmap(
+            os.path.join(tmp, f + '.npy'), mode='w+', dtype='<f8', shape=(len(calendar), len(order_book_ids))
+        )
+        panels[f][:] = np.nan
+
+    for col, order_book_id in enumerate(order_book_ids):
+        bars = stores[order_book_id].get_bars(order_book_id)
+        if len(bars) == 0:
+            continue
+        dates = bars['datetime'] // 1000000
+        rows = calendar.searchsorted(dates)
+        valid = rows < len(calendar)
+        valid[valid] = calendar[rows[valid]] == dates[valid]
+        for f in fields:
+            if f in bars.dtype.names:
+                panels[f][rows[valid], col] = bars[f][valid]
+
+    for panel in six.itervalues(panels):
+        panel.flush()
+    del panels
+    np.save(os.path.join(tmp, PANEL_DATES_FILE), calendar.astype('<u4'))
+    _write_mmap_meta(tmp, fields, {}, order_book_ids=order_book_ids)
+    _swap_dir(tmp, target)
+    return len(order_book_ids)
+
+
+INTRADAY_RESERVED_COLUMNS = ('datetime', 'trading_date', 'order_book_id')
+
+
+def _read_intraday_file(path):
+    import pandas as pd
+
+    if path.endswith('.npy'):
+        return pd.DataFrame(np.load(path))
+    return pd.read_csv(path)
+
+
+def _read_intraday_columns(path):
+    import pandas as pd
+
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r').dtype.names
+    return pd.read_csv(path, nrows=0).columns
+
+
+def _to_dt_int(col, ms=False):
+    # 转换为 YYYYMMDDHHMMSS 格式的整数，ms 为 True 时转换为精确到毫秒的 YYYYMMDDHHMMSSmmm
+    import pandas as pd
+
+    if np.issubdtype(col.dtype, np.integer):
+        values = col.values.astype(np.uint64)
+        if ms:
+            values = np.where(values < 10000000000000000, values * 1000, values).astype(np.uint64)
+        return values
+    dt = pd.DatetimeIndex(pd.to_datetime(col))
+    values = (
+        (dt.year * 10000 + dt.month * 100 + dt.day).values.astype(np.uint64) * 1000000 +
+        (dt.hour * 10000 + dt.minute * 100 + dt.second).values.astype(np.uint64)
+    )
+    if ms:
+        values = values * 1000 + (dt.microsecond // 1000).values.astype(np.uint64)
+    return values
+
+
+def _infer_trading_dates(dt, calendar, ms=False):
+    # 夜盘（18 点之后）归属下一个交易日，凌晨（8 点之前）归属当日或之后的第一个交易日，其余归属当日
+    if ms:
+        dt = dt // 1000
+    dates = (dt // 1000000).astype(np.int64)
+    hours = (dt // 10000 % 100).astype(np.int64)
+    night = np.minimum(calendar.searchsorted(dates, side='right'), len(calendar) - 1)
+    early = np.minimum(calendar.searchsorted(dates), len(calendar) - 1)
+    return np.where(hours >= 18, calendar[night], np.where(hours < 8, calendar[early], dates))
+
+
+def _ingest_intraday(source, data_bundle_path, locale, name, build):
+    from rqalpha.data.base_data_source.storages import TradingDatesStore
+
+    set_locale(locale)
+    data_bundle_path = get_bundle_path(data_bundle_path)
+    calendar = TradingDatesStore(os.path.join(data_bundle_path, 'trading_dates.bcolz')).get_trading_date_ints()
+    target = os.path.join(data_bundle_path, name)
+    count = build(source, target, calendar)
+    six.print_(_(u"{count} instruments ingested to {target}").format(count=count, target=target))
+
+
+def ingest_minute_bars(source, data_bundle_path=None, locale="zh_Hans_CN"):
+    """
+    从 source 目录下按合约存放的分钟线文件（<order_book_id>.csv 或 <order_book_id>.npy）生成分钟线数据。
+
+    每个文件须包含 datetime 列（YYYYMMDDHHMMSS 整数或可被 pandas 解析的时间字符串），可选 trading_date 列
+    （YYYYMMDD 整数，缺省时按交易日历推断夜盘所属的交易日），其余列均作为 float64 字段保存。
+    """
+    _ingest_intraday(source, data_bundle_path, locale, 'minute_bars', build_minute_bar_store)
+
+
+def ingest_ticks(source, data_bundle_path=None, locale="zh_Hans_CN"):
+    """
+    从 source 目录下按合约存放的 tick 文件（<order_book_id>.csv 或 <order_book_id>.npy）生成 tick 数据。
+
+    文件格式与分钟线相同，datetime 列可以精确到毫秒（YYYYMMDDHHMMSSmmm 整数或时间字符串），
+    五档盘口以 a1~a5、a1_v~a5_v、b1~b5、b1_v~b5_v 列给出。
+    """
+    _ingest_intraday(source, data_bundle_path, locale, 'ticks', build_tick_store)
+
+
+def build_minute_bar_store(source, target, calendar):
+    # calendar 为 YYYYMMDD 整数格式的交易日历，返回写入的合约个数
+    from rqalpha.data.base_data_source.storages import MINUTE_BARS_TABLE
+    return _build_intraday_store(source, target, calendar, MINUTE_BARS_TABLE, ms=False)
+
+
+def build_tick_store(source, target, calendar):
+    from rqalpha.data.base_data_source.storages import TICKS_TABLE
+    return _build_intraday_store(source, target, calendar, TICKS_TABLE, ms=True)
+
+
+def _build_intraday_store(source, target, calendar, table, ms):
+    from rqalpha.data.base_data_source.storages import INTRADAY_DAYS_TABLE
+
+    calendar = np.asarray(calendar, dtype=np.int64)
+
+    files = {}
+    for name in sorted(os.listdir(source)):
+        order_book_id, ext = os.path.splitext(name)
+        if ext in ('.csv', '.npy'):
+            files[order_book_id] = os.path.join(source, name)
+
+    fields = []
+    for path in six.itervalues(files):
+        fields.extend(c for c in _read_intraday_columns(path) if c not in INTRADAY_RESERVED_COLUMNS and c not in fields)
+
+    tmp = target + '.tmp'
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+    data = _MmapTableWriter(os.path.join(tmp, table), [('datetime', np.uint64)] + [
+        (f, np.float64) for f in fields
+    ])
+    days = _MmapTableWriter(os.path.join(tmp, INTRADAY_DAYS_TABLE), [
+        ('date', np.uint32), ('start', np.uint64), ('datetime', np.uint64)
+    ])
+    line_map, day_line_map = {}, {}
+    date_range = [0, 0]
+
+    with click.progressbar(list(six.iteritems(files)), label=_(u"ingesting {} ...").format(table)) as bar:
+        for order_book_id, path in bar:
+            df = _read_intraday_file(path)
+            if len(df) == 0:
+                continue
+            dt = _to_dt_int(df['datetime'], ms)
+            order = np.argsort(dt, kind='mergesort')
+            dt = dt[order]
+            if 'trading_date' in df.columns:
+                trading_dates = df['trading_date'].values.astype(np.int64)[order]
+            else:
+                trading_dates = _infer_trading_dates(dt, calendar, ms)
+
+            columns = {'datetime': dt}
+            for f in fields:
+                columns[f] = df[f].values[order] if f in df.columns else np.full(len(dt), np.nan)
+
+            offset = len(data)
+            data.append(columns)
+            line_map[order_book_id] = (offset, len(data))
+
+            day_starts = np.flatnonzero(np.r_[True, trading_dates[1:] != trading_dates[:-1]])
+            day_offset = len(days)
+            days.append({'date': trading_dates[day_starts], 'start': day_starts + offset, 'datetime': dt[day_starts]})
+            day_line_map[order_book_id] = (day_offset, len(days))
+
+            date_range = [
+                int(trading_dates[0]) if day_offset == 0 else min(date_range[0], int(trading_dates[0])),
+                max(date_range[1], int(trading_dates[-1]))
+            ]
+
+    data.close(line_map, compiled=True, date_range=date_range)
+    days.close(day_line_map)
+    _swap_dir(tmp, target)
+    return len(line_map)
@@ -58,6 +58,10 @@ def convert_dt_to_int(dt):
     return t
 
 
+def convert_dt_to_ms_int(dt):
+    return convert_dt_to_int(dt) * 1000 + dt.microsecond // 1000
+
+
 def convert_int_to_date(dt_int):
     dt_int = int(dt_int)
     if dt_int > 100000000:
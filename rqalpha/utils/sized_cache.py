@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+from collections import OrderedDict, namedtuple
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "currsize", "maxsize"])
+
+
+def nbytes_of(value):
+    if isinstance(value, tuple):
+        return sum(nbytes_of(v) for v in value)
+    return getattr(value, "nbytes", 0)
+
+
+class SizedLRUCache(object):
+    """
+    按占用字节数而非条目数限制容量的 LRU 缓存，max_bytes 为 None 时不限制容量。
+    """
+    def __init__(self, max_bytes=None, sizeof=nbytes_of):
+        self._max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._data = OrderedDict()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __getitem__(self, key):
+        try:
+            value, size = self._data.pop(key)
+        except KeyError:
+            self._misses += 1
+            raise
+        self._data[key] = value, size
+        self._hits += 1
+        return value
+
+    def __setitem__(self, key, value):
+        self.pop(key, None)
+        size = self._sizeof(value)
+        if self._max_bytes is not None:
+            if size > self._max_bytes:
+                # 单个对象超出整个预算，不缓存
+                return
+            while self._data and self._size + size > self._max_bytes:
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+        self._data[key] = value, size
+        self._size += size
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def pop(self, key, default=None):
+        try:
+            value, size = self._data.pop(key)
+        except KeyError:
+            return default
+        self._size -= size
+        return value
+
+    def clear(self):
+        self._data.clear()
+        self._size = 0
+
+    def cache_info(self):
+        return CacheInfo(self._hits, self._misses, self._evictions, self._size, self._max_bytes)
@@ -0,0 +1,525 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import copy
+import datetime
+import importlib
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import six
+
+from rqalpha.const import DAYS_CNT, DEFAULT_ACCOUNT_TYPE, MARKET, POSITION_EFFECT, SIDE
+from rqalpha.data.data_proxy import DataProxy
+from rqalpha.main import _adjust_start_date, create_data_source, set_loggers
+from rqalpha.mod.rqalpha_mod_sys_analyser.mod import AnalyserMod, build_result_dict, output_result, risk_summary
+from rqalpha.mod.rqalpha_mod_sys_transaction_cost.deciders import CNStockTransactionCostDecider
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.exception import patch_user_exc
+from rqalpha.utils.i18n import gettext as _
+
+_safe_convert = AnalyserMod._safe_convert
+
+
+def _mod_config(config, mod_name):
+    # 与 ModHandler 相同，以 mod 的默认配置为基础合并用户配置
+    module = importlib.import_module("rqalpha.mod.rqalpha_mod_" + mod_name)
+    mod_config = RqAttrDict(copy.deepcopy(getattr(module, "__config__", {})))
+    mod_config.update(getattr(config.mod, mod_name, {}))
+    return mod_config
+
+
+def _int_to_date(d):
+    r, d = divmod(int(d), 100)
+    y, m = divmod(r, 100)
+    return datetime.date(year=y, month=m, day=d)
+
+
+class VectorizedBacktest(object):
+    """
+    面向日频目标权重策略的向量化回测
+
+    全部行情在回测开始前按 (交易日, 合约) 矩阵一次性读出，逐日只做以合约为列的数组运算；撮合规则与 sys_simulation 的
+    current_bar 模式一致（收盘价成交、涨跌停、成交量限制、滑点），手续费与税费与 sys_transaction_cost 的 A 股规则一致，
+    分红、拆分及退市的处理与 sys_accounts 的股票账户一致。结果的格式与 sys_analyser 相同。
+
+    与逐笔调用 order_target_percent 的区别在于：当日全部目标市值都按调仓前的总权益计算，并且先卖后买，买单按列的顺序
+    依次占用可用资金。
+    """
+
+    FIELDS = ['close', 'volume', 'limit_up', 'limit_down']
+
+    def __init__(self, config, data_proxy):
+        self._config = config
+        self._data_proxy = data_proxy
+
+        self._simulation_config = _mod_config(config, "sys_simulation")
+        self._accounts_config = _mod_config(config, "sys_accounts")
+        self._cost_config = _mod_config(config, "sys_transaction_cost")
+        self._analyser_config = _mod_config(config, "sys_analyser")
+        self._benchmark_config = _mod_config(config, "sys_benchmark")
+        self._check_config()
+
+        self._calendar = [d.date() for d in config.base.trading_calendar]
+        self._date_index = {d: i for i, d in enumerate(self._calendar)}
+        self._slippage = self._simulation_config.slippage
+        self._tick_size_slippage = self._simulation_config.slippage_model == "TickSizeSlippage"
+        self._commission_rate = CNStockTransactionCostDecider.COMMISSION_RATE * self._cost_config.commission_multiplier
+        self._min_commission = self._cost_config.cn_stock_min_commission
+
+        self._order_book_ids = []
+        self._columns = {}
+        self._bars = {f: np.empty((len(self._calendar), 0)) for f in self.FIELDS}
+        self._suspended = np.empty((len(self._calendar), 0), dtype=bool)
+        self._de_listed = np.empty(0, dtype=np.int64)
+        self._round_lots = np.empty(0)
+        self._is_cs = np.empty(0, dtype=bool)
+        self._tick_sizes = np.empty(0)
+
+        self._quantity = np.empty(0)
+        self._avg_price = np.empty(0)
+        self._last_price = np.empty(0)
+        self._non_closable = np.empty(0)
+        self._transaction_cost = np.empty(0)
+        self._traded = np.empty(0, dtype=bool)
+
+        self._units = sum(six.itervalues(config.base.accounts))
+        self._cash = float(self._units)
+        self._dividend_receivable = {}
+        self._static_unit_net_value = self._last_unit_net_value = 1.
+
+        self._order_id = self._exec_id = 0
+        self._trades = []
+        self._total_portfolios = []
+        self._sub_accounts = []
+        self._positions = []
+        self._portfolio_daily_returns = []
+
+    def _check_config(self):
+        config = self._config
+        if set(config.base.accounts) != {DEFAULT_ACCOUNT_TYPE.STOCK.name}:
+            raise patch_user_exc(ValueError(_(u"vectorized backtest only supports stock account")))
+        if config.base.market != MARKET.CN:
+            raise patch_user_exc(ValueError(_(u"vectorized backtest only supports market CN")))
+        if config.base.frequency != '1d':
+            raise patch_user_exc(ValueError(_(u"vectorized backtest only supports frequency 1d")))
+        if config.base.init_positions:
+            raise patch_user_exc(ValueError(_(u"vectorized backtest does not support init_positions")))
+        if self._simulation_config.matching_type != "current_bar":
+            raise patch_user_exc(ValueError(_(u"vectorized backtest only supports matching type current_bar")))
+
+    def _extend(self, order_book_ids):
+        """
+        将新出现的合约加入列中，一次读出其整个回测区间的行情
+        """
+        order_book_ids = [o for o in order_book_ids if o not in self._columns]
+        if not order_book_ids:
+            return
+        data_proxy = self._data_proxy
+        instruments = []
+        for order_book_id in order_book_ids:
+            instrument = data_proxy.instruments(order_book_id)
+            if instrument is None:
+                raise patch_user_exc(ValueError(_(u"invalid order_book_id {}").format(order_book_id)))
+            if instrument.type in ('Future', 'INDX', 'PublicFund'):
+                raise patch_user_exc(ValueError(
+                    _(u"vectorized backtest does not support {} of type {}").format(order_book_id, instrument.type)))
+            instruments.append(instrument)
+
+        end_date = self._config.base.end_date
+        n = len(self._calendar)
+        bars = data_proxy.history_bars_batch(order_book_ids, n, '1d', self.FIELDS, end_date, adjust_type='none')
+        for f in self.FIELDS:
+            self._bars[f] = np.hstack([self._bars[f], bars[f]])
+
+        suspended = np.zeros((n, len(instruments)), dtype=bool)
+        de_listed = np.full(len(instruments), n, dtype=np.int64)
+        for col, instrument in enumerate(instruments):
+            if instrument.type == 'CS':
+                suspended[:, col] = np.atleast_1d(data_proxy.is_suspended(instrument.order_book_id, end_date, n))
+            if instrument.de_listed_date.date() <= end_date:
+                # 与 StockPosition.is_de_listed 一致，在退市日的前一个交易日结算时清算持仓
+                last_date = data_proxy.get_previous_trading_date(instrument.de_listed_date).date()
+                de_listed[col] = np.searchsorted(self._calendar, last_date)
+        self._suspended = np.hstack([self._suspended, suspended])
+        self._de_listed = np.concatenate([self._de_listed, de_listed])
+
+        self._round_lots = np.concatenate([self._round_lots, [float(i.round_lot) for i in instruments]])
+        self._is_cs = np.concatenate([self._is_cs, [i.type == 'CS' for i in instruments]])
+        if self._tick_size_slippage:
+            self._tick_sizes = np.concatenate([self._tick_sizes, [i.tick_size() for i in instruments]])
+
+        size = len(instruments)
+        self._quantity = np.concatenate([self._quantity, np.zeros(size)])
+        self._avg_price = np.concatenate([self._avg_price, np.zeros(size)])
+        self._last_price = np.concatenate([self._last_price, np.full(size, np.nan)])
+        self._non_closable = np.concatenate([self._non_closable, np.zeros(size)])
+        self._transaction_cost = np.concatenate([self._transaction_cost, np.zeros(size)])
+        self._traded = np.concatenate([self._traded, np.zeros(size, dtype=bool)])
+
+        for order_book_id in order_book_ids:
+            self._columns[order_book_id] = len(self._order_book_ids)
+            self._order_book_ids.append(order_book_id)
+
+    def _target_weights(self, weights):
+        if weights is None:
+            return None
+        if isinstance(weights, pd.Series):
+            weights = weights.to_dict()
+        weights = {o: w for o, w in six.iteritems(weights) if not (w is None or np.isnan(w))}
+        for order_book_id, w in six.iteritems(weights):
+            if w < 0 or w > 1:
+                raise patch_user_exc(ValueError(
+                    _(u"weight of {} should between 0 and 1, got {}").format(order_book_id, w)))
+        self._extend(list(weights))
+        target = np.zeros(len(self._order_book_ids))
+        for order_book_id, w in six.iteritems(weights):
+            target[self._columns[order_book_id]] = w
+        return target
+
+    @property
+    def _market_value(self):
+        held = self._quantity != 0
+        return float(np.dot(self._quantity[held], self._last_price[held]))
+
+    @property
+    def _dividend_receivable_value(self):
+        return sum(d['quantity'] * d['dividend_per_share'] for d in six.itervalues(self._dividend_receivable))
+
+    @property
+    def _total_value(self):
+        return self._cash + self._market_value + self._dividend_receivable_value
+
+    def _before_trading(self, i, date):
+        unit_net_value = self._total_value / self._units
+        self._static_unit_net_value = self._last_unit_net_value if np.isnan(unit_net_value) else unit_net_value
+        if i == 0:
+            return
+
+        data_proxy = self._data_proxy
+        held = {self._order_book_ids[c] for c in np.flatnonzero(self._quantity)}
+
+        last_date = data_proxy.get_previous_trading_date(date)
+        dividends = data_proxy.get_dividends_by_book_date(last_date)
+        if dividends is None:
+            dividends = {o: data_proxy.get_dividend_by_book_date(o, last_date) for o in held}
+        for order_book_id, dividend in six.iteritems(dividends):
+            if dividend is None or order_book_id not in held:
+                continue
+            col = self._columns[order_book_id]
+            dividend_per_share = sum(dividend['dividend_cash_before_tax'] / dividend['round_lot'])
+            if np.isnan(dividend_per_share):
+                raise RuntimeError("Dividend per share of {} is not supposed to be nan.".format(order_book_id))
+            self._avg_price[col] -= dividend_per_share
+            if self._accounts_config.dividend_reinvestment:
+                last_price = self._last_price[col]
+                quantity = self._quantity[col] * dividend_per_share / last_price
+                self._avg_price[col] = (self._quantity[col] * self._avg_price[col] + quantity * last_price) / (
+                    self._quantity[col] + quantity)
+                self._quantity[col] += quantity
+                self._non_closable[col] += quantity
+            else:
+                try:
+                    payable_date = _int_to_date(dividend['payable_date'][0])
+                except ValueError:
+                    payable_date = _int_to_date(dividend['ex_dividend_date'][0])
+                self._dividend_receivable[order_book_id] = {
+                    'quantity': self._quantity[col],
+                    'dividend_per_share': dividend_per_share,
+                    'payable_date': payable_date,
+                }
+
+        for order_book_id, dividend in list(six.iteritems(self._dividend_receivable)):
+            if dividend['payable_date'] == date:
+                self._cash += dividend['quantity'] * dividend['dividend_per_share']
+                del self._dividend_receivable[order_book_id]
+
+        splits = data_proxy.get_splits_by_ex_date(date)
+        if splits is None:
+            splits = {o: data_proxy.get_split_by_ex_date(o, date) for o in held}
+        for order_book_id, ratio in six.iteritems(splits):
+            if ratio is None or order_book_id not in held:
+                continue
+            col = self._columns[order_book_id]
+            self._quantity[col] *= ratio
+            self._non_closable[col] *= ratio
+            self._avg_price[col] /= ratio
+
+    def _trade_price(self, i, col, side):
+        price = self._bars['close'][i, col]
+        if self._tick_size_slippage:
+            return price + self._tick_sizes[col] * self._slippage * (1 if side == SIDE.BUY else -1)
+        price = price + price * self._slippage * (1 if side == SIDE.BUY else -1)
+        limit_up, limit_down = self._bars['limit_up'][i, col], self._bars['limit_down'][i, col]
+        if limit_up > 0:
+            price = min(price, limit_up)
+        if limit_down > 0:
+            price = max(price, limit_down)
+        return price
+
+    def _commission(self, value):
+        return max(value * self._commission_rate, self._min_commission)
+
+    def _fill(self, i, date, col, quantity, side):
+        """
+        按 current_bar 的撮合规则成交，返回成交数量
+        """
+        if self._simulation_config.price_limit:
+            deal_price = self._bars['close'][i, col]
+            if side == SIDE.BUY and deal_price >= self._bars['limit_up'][i, col]:
+                return 0
+            if side == SIDE.SELL and deal_price <= self._bars['limit_down'][i, col]:
+                return 0
+        if self._simulation_config.volume_limit:
+            round_lot = self._round_lots[col]
+            volume_limit = round(self._bars['volume'][i, col] * self._simulation_config.volume_percent)
+            volume_limit = (volume_limit // round_lot) * round_lot
+            if not volume_limit > 0:
+                return 0
+            quantity = min(quantity, volume_limit)
+
+        price = self._trade_price(i, col, side)
+        value = price * quantity
+        commission = self._commission(value)
+        tax = value * CNStockTransactionCostDecider.TAX_RATE if side == SIDE.SELL and self._is_cs[col] else 0
+        transaction_cost = commission + tax
+
+        if side == SIDE.BUY:
+            self._avg_price[col] = (self._quantity[col] * self._avg_price[col] + value) / (self._quantity[col] + quantity)
+            self._quantity[col] += quantity
+            self._non_closable[col] += quantity
+            self._cash -= value + transaction_cost
+        else:
+            self._quantity[col] -= quantity
+            self._cash += value - transaction_cost
+        self._transaction_cost[col] += transaction_cost
+        self._traded[col] = True
+
+        self._order_id += 1
+        self._exec_id += 1
+        order_book_id = self._order_book_ids[col]
+        dt = datetime.datetime.combine(date, datetime.time(15)).strftime("%Y-%m-%d %H:%M:%S")
+        self._trades.append({
+            'datetime': dt,
+            'trading_datetime': dt,
+            'order_book_id': order_book_id,
+            'symbol': self._data_proxy.instruments(order_book_id).symbol,
+            'side': _safe_convert(side),
+            'position_effect': _safe_convert(POSITION_EFFECT.OPEN if side == SIDE.BUY else POSITION_EFFECT.CLOSE),
+            'exec_id': self._exec_id,
+            'tax': tax,
+            'commission': commission,
+            'last_quantity': int(quantity) if quantity == int(quantity) else quantity,
+            'last_price': _safe_convert(price),
+            'order_id': self._order_id,
+            'transaction_cost': transaction_cost,
+        })
+        return quantity
+
+    def _rebalance(self, i, date, target):
+        """
+        与 order_target_percent 相同：权重为 0 时卖出全部可卖数量；买入按一手取整，且买入金额连同预估费用不超过可用资金；
+        卖出不取整，数量不超过可卖数量。停牌、无行情的合约不交易。
+        """
+        n = len(target)
+        close = self._bars['close'][i, :n]
+        tradable = (close > 0) & ~self._suspended[i, :n]
+        quantity = self._quantity[:n]
+        market_value = np.where(quantity != 0, quantity * self._last_price[:n], 0)
+        delta = self._total_value * target - market_value
+        if self._accounts_config.stock_t1:
+            sellable = quantity - self._non_closable[:n]
+        else:
+            sellable = quantity.copy()
+
+        for col in np.flatnonzero(tradable & (target == 0) & (sellable > 0)):
+            self._fill(i, date, col, sellable[col], SIDE.SELL)
+
+        for col in np.flatnonzero(tradable & (target > 0) & (delta < 0)):
+            amount = abs(int(Decimal(delta[col]) / Decimal(close[col])))
+            if self._config.validator.close_amount:
+                amount = min(amount, sellable[col])
+            if amount > 0:
+                self._fill(i, date, col, amount, SIDE.SELL)
+
+        for col in np.flatnonzero(tradable & (target > 0) & (delta > 0)):
+            price = close[col]
+            round_lot = int(self._round_lots[col])
+            cash_amount = min(delta[col], self._cash)
+            amount = int(Decimal(cash_amount) / Decimal(price))
+            amount = int(Decimal(amount) / Decimal(round_lot)) * round_lot
+            while amount > 0:
+                if amount * price + self._commission(amount * price) <= cash_amount:
+                    break
+                amount -= round_lot
+            if amount > 0:
+                self._fill(i, date, col, amount, SIDE.BUY)
+
+    def _collect_daily(self, date):
+        total_value = self._total_value
+        market_value = self._market_value
+        unit_net_value = total_value / self._units
+        self._portfolio_daily_returns.append(
+            np.nan if self._static_unit_net_value == 0 else unit_net_value / self._static_unit_net_value - 1
+        )
+        self._total_portfolios.append({
+            'date': date,
+            'cash': _safe_convert(self._cash),
+            'total_value': _safe_convert(total_value),
+            'market_value': _safe_convert(market_value),
+            'unit_net_value': _safe_convert(unit_net_value, 6),
+            'units': self._units,
+            'static_unit_net_value': _safe_convert(self._static_unit_net_value),
+        })
+        self._sub_accounts.append({
+            'date': date,
+            'cash': _safe_convert(self._cash),
+            'transaction_cost': _safe_convert(self._transaction_cost.sum()),
+            'market_value': _safe_convert(market_value),
+            'total_value': _safe_convert(total_value),
+            'dividend_receivable': _safe_convert(self._dividend_receivable_value),
+        })
+        for col in np.flatnonzero((self._quantity != 0) | self._traded):
+            order_book_id = self._order_book_ids[col]
+            self._positions.append({
+                'order_book_id': order_book_id,
+                'symbol': self._data_proxy.instruments(order_book_id).symbol,
+                'date': date,
+                'quantity': _safe_convert(self._quantity[col]),
+                'last_price': _safe_convert(self._last_price[col]),
+                'avg_price': _safe_convert(self._avg_price[col]),
+                'market_value': _safe_convert(self._quantity[col] * self._last_price[col]),
+            })
+
+    def _settlement(self, i):
+        for col in np.flatnonzero((self._de_listed <= i) & (self._quantity != 0)):
+            if self._accounts_config.cash_return_by_stock_delisted:
+                self._cash += self._quantity[col] * self._last_price[col]
+            self._quantity[col] = 0
+        self._non_closable[:] = 0
+        self._transaction_cost[:] = 0
+        self._traded[:] = False
+        self._last_unit_net_value = self._total_value / self._units
+
+    def _benchmark(self):
+        try:
+            order_book_id = self._benchmark_config.order_book_id or self._config.base.benchmark
+        except AttributeError:
+            order_book_id = None
+        n = len(self._calendar)
+        if not order_book_id:
+            return None, np.zeros(n)
+        if self._data_proxy.instruments(order_book_id) is None:
+            raise patch_user_exc(ValueError(_(u"invalid benchmark {}").format(order_book_id)))
+        close = self._data_proxy.history_bars(
+            order_book_id, n + 1, "1d", "close", self._config.base.end_date, skip_suspended=False, adjust_type='pre'
+        )
+        if len(close) < n + 1:
+            raise RuntimeError(_("Invalid benchmark: unable to load enough close price."))
+        total_returns = (close - close[0]) / close[0]
+        daily_returns = (close[1:] - close[:-1]) / close[:-1]
+        return total_returns[1:], daily_returns
+
+    def run(self, weights):
+        """
+        :param weights: 目标权重。`pandas.DataFrame` 的 index 为调仓日、columns 为 order_book_id，NaN 视为 0；
+            也可以是以交易日为参数的函数，返回 {order_book_id: weight} 或 `pandas.Series`，返回 None 表示当日不调仓。
+            调仓日未出现在目标权重中的持仓全部卖出。
+        """
+        if isinstance(weights, pd.DataFrame):
+            self._extend(list(weights.columns))
+            rows = {d.date(): row for d, row in zip(pd.to_datetime(weights.index), weights.fillna(0).values)}
+            columns = list(weights.columns)
+
+            def get_weights(date):
+                row = rows.get(date)
+                return None if row is None else dict(zip(columns, row))
+        else:
+            get_weights = weights
+
+        for i, date in enumerate(self._calendar):
+            self._before_trading(i, date)
+            target = self._target_weights(get_weights(date))
+            close = self._bars['close'][i]
+            self._last_price = np.where(close > 0, close, self._last_price)
+            if target is not None:
+                self._rebalance(i, date, target)
+            self._collect_daily(date)
+            self._settlement(i)
+
+        return self._result()
+
+    def _result(self):
+        config = self._config
+        n = len(self._calendar)
+        benchmark_total_returns, benchmark_daily_returns = self._benchmark()
+        unit_net_value = self._total_value / self._units
+
+        def annualized(v):
+            return -1 if v <= 0 else v ** (DAYS_CNT.TRADING_DAYS_A_YEAR / float(n)) - 1
+
+        summary = {
+            'strategy_name': 'vectorized',
+            'start_date': config.base.start_date.strftime('%Y-%m-%d'),
+            'end_date': config.base.end_date.strftime('%Y-%m-%d'),
+            'strategy_file': None,
+            'run_type': config.base.run_type.value,
+        }
+        for account_type, starting_cash in six.iteritems(config.base.accounts):
+            summary[account_type] = starting_cash
+        summary.update(risk_summary(
+            self._portfolio_daily_returns, benchmark_daily_returns,
+            self._data_proxy.get_risk_free_rate(config.base.start_date, config.base.end_date)
+        ))
+        summary.update({
+            'total_value': _safe_convert(self._total_value),
+            'cash': _safe_convert(self._cash),
+            'total_returns': _safe_convert(unit_net_value - 1),
+            'annualized_returns': _safe_convert(annualized(unit_net_value)),
+            'unit_net_value': _safe_convert(unit_net_value),
+            'units': self._units,
+        })
+
+        total_benchmark_portfolios = None
+        if benchmark_total_returns is not None:
+            summary['benchmark_total_returns'] = _safe_convert(benchmark_total_returns[-1])
+            summary['benchmark_annualized_returns'] = _safe_convert(annualized(1 + benchmark_total_returns[-1]))
+            total_benchmark_portfolios = []
+            for date, total_returns, daily_returns in zip(
+                    self._calendar, benchmark_total_returns, benchmark_daily_returns):
+                total_value = self._units * (1 + total_returns)
+                total_benchmark_portfolios.append({
+                    'date': date,
+                    'cash': 0,
+                    'total_value': _safe_convert(total_value),
+                    'market_value': _safe_convert(total_value),
+                    'unit_net_value': _safe_convert(1 + total_returns, 6),
+                    'units': self._units,
+                    'static_unit_net_value': _safe_convert((1 + total_returns) / (1 + daily_returns)),
+                })
+
+        result_dict = build_result_dict(
+            summary, self._trades, self._total_portfolios, total_benchmark_portfolios,
+            [(DEFAULT_ACCOUNT_TYPE.STOCK.name, self._sub_accounts, self._positions)]
+        )
+        output_result(result_dict, self._analyser_config)
+        return result_dict
+
+
+def run(config, weights):
+    set_loggers(config)
+    data_proxy = DataProxy(create_data_source(config), None)
+    _adjust_start_date(config, data_proxy)
+    return {"sys_analyser": VectorizedBacktest(config, data_proxy).run(weights)}
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import copy
+import os
+import unittest
+
+from rqalpha.utils.testing import RQAlphaTestCase
+from rqalpha.utils.testing.fixtures import TempDirFixture
+
+STRATEGY = """
+from rqalpha.api import *
+import datetime
+
+
+def init(context):
+    context.pct = 0.5
+
+
+def handle_bar(context, bar_dict):
+    # fork 日之前的预热阶段与参数无关
+    if context.now.date() <= datetime.date(2018, 7, 31):
+        order_target_percent("000001.XSHE", 0.5 if context.now.day % 10 < 5 else 0.3)
+    else:
+        order_target_percent("000001.XSHE", context.pct)
+"""
+
+
+@unittest.skipUnless(hasattr(os, "fork"), "os.fork is not available")
+class RunForkedTestCase(TempDirFixture, RQAlphaTestCase):
+    config = {
+        "base": {
+            "start_date": "2018-06-01",
+            "end_date": "2018-09-28",
+            "frequency": "1d",
+            "benchmark": "000300.XSHG",
+            "accounts": {"stock": 1000000},
+        },
+        "extra": {"log_level": "error"},
+    }
+
+    def init_fixture(self):
+        super(RunForkedTestCase, self).init_fixture()
+        self.strategy_file = os.path.join(self.temp_dir.name, "strategy.py")
+        with open(self.strategy_file, "w") as f:
+            f.write(STRATEGY)
+
+    def test_same_as_run_from_start(self):
+        from rqalpha import run_file, run_forked
+
+        config = copy.deepcopy(self.config)
+        config["mod"] = {"sys_analyser": {"output_file": os.path.join(self.temp_dir.name, "result.pkl")}}
+        variants = [{"pct": 0.2}, {"pct": 0.5}, {"pct": 0.8}]
+        results = run_forked(self.strategy_file, "2018-07-31", variants, config)
+        self.assertEqual(len(results), len(variants))
+        self.assertNotEqual(results[0]["sys_analyser"]["summary"]["total_value"],
+                            results[-1]["sys_analyser"]["summary"]["total_value"])
+
+        for index, (params, result) in enumerate(zip(variants, results)):
+            config = copy.deepcopy(self.config)
+            config["extra"]["context_vars"] = params
+            expected = run_file(self.strategy_file, config)["sys_analyser"]["summary"]
+            summary = result["sys_analyser"]["summary"]
+            for key in ["total_value", "total_returns", "sharpe", "max_drawdown", "alpha", "beta"]:
+                self.assertAlmostEqual(summary[key], expected[key], msg="{} {}".format(params, key))
+            # 各分支的输出文件互不覆盖
+            self.assertTrue(os.path.exists(os.path.join(self.temp_dir.name, "result_{}.pkl".format(index))))
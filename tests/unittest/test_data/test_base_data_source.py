@@ -25,3 +25,89 @@ class BaseDataSourceTestCase(BaseDataSourceFixture, RQAlphaTestCase):
         ), 2)
         with self.assertRaises(RuntimeError):
             self.base_data_source.get_tick_size(mock_instrument(_type=None))
+
+    def test_history_bars_batch(self):
+        from datetime import datetime
+        import numpy as np
+
+        instruments = [self.base_data_source.get_all_instruments()[0]] + [
+            i for i in self.base_data_source.get_all_instruments() if i.order_book_id == "000001.XSHE"
+        ]
+        dt = datetime(2018, 8, 16)
+        bars = self.base_data_source.history_bars_batch(instruments, 20, "1d", "close", dt, adjust_orig=dt)
+        self.assertEqual(bars.shape, (20, 2))
+        for col, instrument in enumerate(instruments):
+            history = self.base_data_source.history_bars(
+                instrument, 20, "1d", "close", dt, skip_suspended=False, adjust_orig=dt
+            )
+            self.assertTrue(np.allclose(bars[-len(history):, col], history, equal_nan=True))
+
+    def test_get_bar(self):
+        from datetime import datetime
+
+        instrument = [i for i in self.base_data_source.get_all_instruments() if i.order_book_id == "000001.XSHE"][0]
+        bars = self.base_data_source.history_bars(
+            instrument, 30, "1d", None, datetime(2018, 8, 16), skip_suspended=False, adjust_type="none"
+        )
+        for bar in bars:
+            dt = datetime.strptime(str(bar["datetime"]), "%Y%m%d%H%M%S")
+            self.assertEqual(self.base_data_source.get_bar(instrument, dt, "1d").tolist(), bar.tolist())
+        # 非交易日没有日线
+        self.assertIsNone(self.base_data_source.get_bar(instrument, datetime(2018, 8, 18), "1d"))
+
+    def test_get_prev_close(self):
+        from datetime import datetime
+
+        instrument = [i for i in self.base_data_source.get_all_instruments() if i.order_book_id == "000001.XSHE"][0]
+        for dt in (datetime(2018, 8, 16), datetime(2018, 7, 12), datetime(2018, 7, 13)):
+            bars = self.base_data_source.history_bars(
+                instrument, 2, "1d", "close", dt, skip_suspended=False, adjust_orig=dt
+            )
+            self.assertEqual(self.base_data_source.get_prev_close(instrument, dt), bars[0])
+        # 非交易日由 DataProxy 计算
+        self.assertIsNone(self.base_data_source.get_prev_close(instrument, datetime(2018, 8, 18)))
+
+    def test_history_bars_adjusted(self):
+        from datetime import datetime
+        import numpy as np
+        from rqalpha.utils.datetime_func import convert_date_to_int
+        from rqalpha.data.base_data_source.adjust import adjust_bars
+
+        source = self.base_data_source
+
+        def expected(instrument, bar_count, fields, dt, skip_suspended, adjust_type, adjust_orig):
+            # 按除权区间缓存之前的做法：先截取窗口，再对窗口复权
+            if skip_suspended and instrument.type == 'CS':
+                bars = source._filtered_day_bars(instrument)
+            else:
+                bars = source._all_day_bars_of(instrument)
+            i = bars['datetime'].searchsorted(np.uint64(convert_date_to_int(dt)), side='right')
+            bars = bars[max(i - bar_count, 0):i]
+            return adjust_bars(bars, source.get_ex_cum_factor(instrument.order_book_id), fields,
+                               adjust_type, adjust_orig)
+
+        instruments = [i for i in source.get_all_instruments() if i.order_book_id in ("000001.XSHE", "600000.XSHG")]
+        self.assertEqual(len(instruments), 2)
+        # 两者均在 2018 年 7 月中旬除权，窗口及复权基准在除权日前后来回切换
+        dts = [datetime(2018, 7, 10), datetime(2018, 7, 11), datetime(2018, 7, 12), datetime(2018, 7, 13),
+               datetime(2018, 7, 14), datetime(2018, 8, 16), datetime(2018, 1, 12)]
+        for instrument in instruments:
+            for adjust_type in ('pre', 'post'):
+                for adjust_orig in (datetime(2018, 8, 16), datetime(2018, 6, 1), datetime(2018, 7, 11),
+                                    datetime(2018, 7, 10)):
+                    for dt in dts:
+                        for skip_suspended in (True, False):
+                            for fields in (None, "close", "volume", ["close", "volume"]):
+                                args = instrument, 20, fields, dt, skip_suspended, adjust_type, adjust_orig
+                                bars = source.history_bars(
+                                    instrument, 20, "1d", fields, dt, skip_suspended=skip_suspended,
+                                    adjust_type=adjust_type, adjust_orig=adjust_orig
+                                )
+                                self.assertEqual(bars.tolist(), expected(*args).tolist(),
+                                                 msg=str((instrument.order_book_id, ) + args[1:]))
+        # 窗口确实跨越了除权日
+        dt, adjust_orig = datetime(2018, 7, 14), datetime(2018, 8, 16)
+        self.assertNotEqual(
+            source.history_bars(instruments[0], 20, "1d", "close", dt, adjust_orig=adjust_orig).tolist(),
+            source.history_bars(instruments[0], 20, "1d", "close", dt, adjust_type="none").tolist()
+        )
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import os
+import datetime
+
+import numpy as np
+
+from rqalpha.utils.testing import RQAlphaTestCase
+from rqalpha.utils.testing.fixtures import TempDirFixture
+
+
+class DateSetTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        import bcolz
+        from rqalpha.data.base_data_source.date_set import DateSet
+
+        super(DateSetTestCase, self).init_fixture()
+        path = os.path.join(self.temp_dir.name, "suspended_days.bcolz")
+        dates = bcolz.carray(np.array([20190102, 20190104, 20190103, 20190104], dtype=np.uint32),
+                             rootdir=path, mode="w")
+        dates.attrs["line_map"] = {"000001.XSHE": (0, 2), "000002.XSHE": (2, 4)}
+        dates.flush()
+        self.date_set = DateSet(path)
+
+    def test_contains(self):
+        self.assertEqual(self.date_set.contains("000001.XSHE", [
+            datetime.date(2019, 1, 2), 20190103, 20190104150000, datetime.datetime(2019, 1, 5)
+        ]), [True, False, True, False])
+        self.assertEqual(self.date_set.contains("000002.XSHE", np.array([20190103, 20190105])), [True, False])
+        self.assertEqual(self.date_set.contains("000003.XSHE", [20190102]), [False])
+
+    def test_contains_batch(self):
+        order_book_ids = ["000001.XSHE", "000002.XSHE", "000003.XSHE"]
+        self.assertEqual(self.date_set.contains_batch(order_book_ids, 20190104).tolist(), [True, True, False])
+        self.assertEqual(
+            self.date_set.contains_batch(order_book_ids, datetime.date(2019, 1, 3)).tolist(), [False, True, False]
+        )
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import os
+
+from rqalpha.utils.testing import RQAlphaTestCase
+from rqalpha.utils.testing.fixtures import TempDirFixture
+
+
+class DerivedCacheTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        super(DerivedCacheTestCase, self).init_fixture()
+        self.source = os.path.join(self.temp_dir.name, "source.json")
+        with open(self.source, "w") as f:
+            f.write("[1, 2]")
+
+    def test_load(self):
+        from rqalpha.data.base_data_source.derived_cache import DerivedCache
+
+        calls = []
+
+        def builder(path):
+            calls.append(path)
+            with open(path) as f:
+                return {"content": f.read()}
+
+        self.assertEqual(DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder, self.source),
+                         {"content": "[1, 2]"})
+        # 新的实例（模拟新的进程）直接读取缓存
+        self.assertEqual(DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder, self.source),
+                         {"content": "[1, 2]"})
+        self.assertEqual(len(calls), 1)
+
+        with open(self.source, "w") as f:
+            f.write("[1, 2, 3]")
+        os.utime(self.source, (0, 0))
+        self.assertEqual(DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder, self.source),
+                         {"content": "[1, 2, 3]"})
+        self.assertEqual(len(calls), 2)
+
+    def test_code_changed(self):
+        import sys
+        import types
+        from rqalpha.data.base_data_source.derived_cache import DerivedCache
+
+        # 模拟定义 builder 的模块
+        module = types.ModuleType("derived_cache_builder")
+        module.__file__ = os.path.join(self.temp_dir.name, "derived_cache_builder.py")
+        with open(module.__file__, "w") as f:
+            f.write("# v1")
+        sys.modules[module.__name__] = module
+        self.addCleanup(sys.modules.pop, module.__name__)
+
+        calls = []
+
+        def builder():
+            calls.append(None)
+            return len(calls)
+        builder.__module__ = module.__name__
+
+        self.assertEqual(DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder), 1)
+        self.assertEqual(DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder), 1)
+
+        # builder 所在模块修改后缓存失效
+        with open(module.__file__, "w") as f:
+            f.write("# v2 ...")
+        os.utime(module.__file__, (0, 0))
+        self.assertEqual(DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder), 2)
+
+    def test_pickled_class_changed(self):
+        import sys
+        import importlib
+        from rqalpha.data.base_data_source.derived_cache import DerivedCache
+
+        # 缓存对象的类定义在 builder 所在模块之外
+        path = os.path.join(self.temp_dir.name, "derived_cache_payload.py")
+        with open(path, "w") as f:
+            f.write("class Payload(object):\n    def __init__(self, value):\n        self.value = value\n")
+        sys.path.insert(0, self.temp_dir.name)
+        self.addCleanup(sys.path.remove, self.temp_dir.name)
+        self.addCleanup(sys.modules.pop, "derived_cache_payload", None)
+        payload = importlib.import_module("derived_cache_payload")
+
+        calls = []
+
+        def builder():
+            calls.append(None)
+            return {"payload": [payload.Payload(len(calls))]}
+
+        def load():
+            return DerivedCache(self.temp_dir.name).load("item", ["source.json"], builder)["payload"][0].value
+
+        self.assertEqual(load(), 1)
+        self.assertEqual(load(), 1)
+
+        with open(path, "w") as f:
+            f.write("class Payload(object):\n    __slots__ = ('value', )\n\n    def __init__(self, value):\n"
+                    "        self.value = value\n")
+        os.utime(path, (0, 0))
+        self.assertEqual(load(), 2)
+        self.assertEqual(len(calls), 2)
@@ -43,3 +43,44 @@ class InstrumentMixinTestCase(DataProxyFixture, RQAlphaTestCase):
     def test_is_night_trading(self):
         assert not self.data_proxy.is_night_trading(["TF1912"])
         assert self.data_proxy.is_night_trading(["AG1912", "000001.XSHE"])
+
+
+class InstrumentCatalogTestCase(RQAlphaTestCase):
+    def setUp(self):
+        from rqalpha.model.instrument import Instrument
+        from rqalpha.data.instrument_mixin import InstrumentMixin
+
+        self.mixin = InstrumentMixin([Instrument(d) for d in [
+            dict(order_book_id="000001.XSHE", symbol="平安银行", type="CS", listed_date="1991-04-03",
+                 de_listed_date="0000-00-00", sector_code="Financials", industry_code="J66"),
+            dict(order_book_id="600001.XSHG", symbol="邯郸钢铁", type="CS", listed_date="1998-01-22",
+                 de_listed_date="2010-01-25", sector_code="Materials", industry_code="C31"),
+            dict(order_book_id="IF1001", symbol="IF1001", type="Future", listed_date="2009-11-23",
+                 de_listed_date="2010-01-15", underlying_symbol="IF"),
+            dict(order_book_id="IF88", symbol="IF88", type="Future", listed_date="0000-00-00",
+                 de_listed_date="0000-00-00", underlying_symbol="IF"),
+        ]])
+
+    def test_all_instruments(self):
+        from datetime import datetime
+
+        def ids(types, dt=None):
+            return [i.order_book_id for i in self.mixin.all_instruments(types, dt)]
+
+        self.assertEqual(ids(None), ["000001.XSHE", "600001.XSHG", "IF1001", "IF88"])
+        self.assertEqual(ids({"CS"}, datetime(2010, 1, 25)), ["000001.XSHE"])
+        self.assertEqual(ids({"CS"}, datetime(2010, 1, 22)), ["000001.XSHE", "600001.XSHG"])
+        self.assertEqual(ids("Future", datetime(2010, 1, 15)), ["IF1001", "IF88"])
+        self.assertEqual(ids({"ETF"}), [])
+
+    def test_sector_industry(self):
+        self.assertEqual(self.mixin.sector("Materials"), ["600001.XSHG"])
+        self.assertEqual(self.mixin.industry("J66"), ["000001.XSHE"])
+        self.assertEqual(self.mixin.industry("K70"), [])
+
+    def test_get_future_contracts(self):
+        from datetime import datetime
+
+        self.assertEqual(self.mixin.get_future_contracts("IF", datetime(2010, 1, 15, 15)), ["IF1001"])
+        self.assertEqual(self.mixin.get_future_contracts("IF", datetime(2010, 1, 18)), [])
+        self.assertEqual(self.mixin.get_future_contracts("IH", datetime(2010, 1, 4)), [])
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import numpy as np
+
+from rqalpha.utils.testing import RQAlphaTestCase
+
+
+class SharedMemoryStoreTestCase(RQAlphaTestCase):
+    def test_day_bar_store(self):
+        from rqalpha.data.base_data_source.shared_memory import SharedDayBarStore
+
+        table = np.zeros(3, dtype=[('datetime', np.uint64), ('close', np.float64)])
+        table['datetime'] = [20180102000000, 20180103000000, 20180102000000]
+        table['close'] = [1., 2., 3.]
+        store = SharedDayBarStore(table, {'A': (0, 2), 'B': (2, 3)})
+
+        bars = store.get_bars('A')
+        self.assertEqual(bars['close'].tolist(), [1., 2.])
+        # 返回的是共享数据上的视图
+        self.assertTrue(np.shares_memory(bars, table))
+        self.assertEqual(store.get_bars('B', 'close').tolist(), [3.])
+        self.assertEqual(len(store.get_bars('C')), 0)
+        self.assertEqual(store.get_date_range('A'), (20180102, 20180103))
+
+    def test_date_set(self):
+        from rqalpha.data.base_data_source.shared_memory import SharedDateSet
+
+        date_set = SharedDateSet(np.array([20180102, 20180105, 20180103], dtype=np.uint32), {'A': (0, 2), 'B': (2, 3)})
+        self.assertEqual(date_set.contains('A', [20180102, 20180103, 20180105]), [True, False, True])
+        self.assertEqual(date_set.contains_batch(['A', 'B', 'C'], 20180103).tolist(), [False, True, False])
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import os
+
+import numpy as np
+
+from rqalpha.utils.testing import RQAlphaTestCase
+from rqalpha.utils.testing.fixtures import TempDirFixture
+
+
+class MmapDayBarStoreTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        from rqalpha.utils.bundle_helper import dump_mmap_table
+        from rqalpha.data.base_data_source.storages import MmapDayBarStore
+        from rqalpha.data.base_data_source.converter import StockBarConverter
+
+        super(MmapDayBarStoreTestCase, self).init_fixture()
+        path = os.path.join(self.temp_dir.name, "stocks.mmap")
+        dump_mmap_table(path, ["date", "close", "volume", "total_turnover"], {
+            "date": np.array([20190102, 20190103, 20190104, 20190103], dtype=np.uint32),
+            "close": np.array([101234, 102345, 103456, 5000], dtype=np.uint32),
+            "volume": np.array([100, 0, 300, 400], dtype=np.float64),
+            "total_turnover": np.array([1000, 0, 3000, 4000], dtype=np.uint64),
+        }, {"000001.XSHE": (0, 3), "000002.XSHE": (3, 4)})
+        self.store = MmapDayBarStore(path, StockBarConverter)
+
+    def test_get_bars(self):
+        bars = self.store.get_bars("000001.XSHE")
+        self.assertEqual(list(bars.dtype.names), ["datetime", "close", "volume", "total_turnover"])
+        self.assertEqual(bars["datetime"].tolist(), [20190102000000, 20190103000000, 20190104000000])
+        self.assertEqual(bars["close"].tolist(), [10.12, 10.23, 10.35])
+
+        bars = self.store.get_bars("000002.XSHE", ["total_turnover"])
+        self.assertIsInstance(bars, np.memmap)
+        self.assertEqual(bars.tolist(), [4000])
+
+        self.assertEqual(len(self.store.get_bars("000003.XSHE")), 0)
+
+    def test_get_date_range(self):
+        self.assertEqual(self.store.get_date_range("000001.XSHE"), (20190102, 20190104))
+
+    def test_compiled(self):
+        from rqalpha.utils.bundle_helper import dump_mmap_table
+        from rqalpha.data.base_data_source.storages import MmapDayBarStore
+        from rqalpha.data.base_data_source.converter import StockBarConverter
+
+        path = os.path.join(self.temp_dir.name, "compiled.mmap")
+        dump_mmap_table(path, ["date", "close"], {
+            "date": np.array([20190102], dtype=np.uint32),
+            "close": np.array([10.12]),
+        }, {"000001.XSHE": (0, 1)}, compiled=True)
+        store = MmapDayBarStore(path, StockBarConverter)
+
+        close = store.get_bars("000001.XSHE", ["close"])
+        self.assertIsInstance(close, np.memmap)
+        self.assertEqual(close.tolist(), [10.12])
+
+
+    def test_compiled_records(self):
+        from rqalpha.utils.bundle_helper import dump_mmap_records
+        from rqalpha.data.base_data_source.storages import MmapDayBarStore
+        from rqalpha.data.base_data_source.converter import StockBarConverter
+
+        path = os.path.join(self.temp_dir.name, "records.mmap")
+        dump_mmap_records(path, ["date", "close", "volume"], {
+            "date": np.array([20190102, 20190103, 20190103], dtype=np.uint32),
+            "close": np.array([10.12, 10.23, 0.5]),
+            "volume": np.array([100., 200., 300.]),
+        }, {"000001.XSHE": (0, 2), "000002.XSHE": (2, 3)})
+        store = MmapDayBarStore(path, StockBarConverter)
+        records = store._table.records
+
+        bars = store.get_bars("000001.XSHE")
+        self.assertTrue(np.shares_memory(bars, records))
+        self.assertEqual(list(bars.dtype.names), ["datetime", "close", "volume"])
+        self.assertEqual(bars["datetime"].tolist(), [20190102000000, 20190103000000])
+        self.assertEqual(bars["close"].tolist(), [10.12, 10.23])
+
+        bars = store.get_bars("000001.XSHE", ["close", "volume"])
+        self.assertTrue(np.shares_memory(bars, records))
+        self.assertEqual(bars["volume"].tolist(), [100., 200.])
+
+        close = store.get_bars("000002.XSHE", ["close"])
+        self.assertTrue(np.shares_memory(close, records))
+        self.assertEqual(close.tolist(), [0.5])
+
+        self.assertEqual(len(store.get_bars("000003.XSHE")), 0)
+        self.assertEqual(store.get_date_range("000001.XSHE"), (20190102, 20190103))
+
+class MinuteBarStoreTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        from rqalpha.utils.bundle_helper import build_minute_bar_store
+        from rqalpha.data.base_data_source.storages import MinuteBarStore
+
+        super(MinuteBarStoreTestCase, self).init_fixture()
+        source = os.path.join(self.temp_dir.name, "source")
+        os.makedirs(source)
+        with open(os.path.join(source, "000001.XSHE.csv"), "w") as f:
+            f.write("datetime,close,volume\n")
+            f.write("2019-01-02 09:31:00,10.0,100\n2019-01-02 15:00:00,10.1,200\n2019-01-03 09:31:00,10.2,300\n")
+        futures = np.zeros(4, dtype=[("datetime", "<i8"), ("close", "<f8")])
+        futures["datetime"] = [20190104210100, 20190105010000, 20190107090100, 20190103090100]
+        futures["close"] = [3.0, 4.0, 5.0, 2.0]
+        np.save(os.path.join(source, "RB88.npy"), futures)
+
+        target = os.path.join(self.temp_dir.name, "minute_bars")
+        build_minute_bar_store(source, target, [20190102, 20190103, 20190104, 20190107])
+        self.store = MinuteBarStore(target)
+
+    def test_get_bar(self):
+        bar = self.store.get_bar("000001.XSHE", 20190102150000)
+        self.assertEqual((bar["close"], bar["volume"]), (10.1, 200))
+        self.assertIsNone(self.store.get_bar("000001.XSHE", 20190102150100))
+        self.assertIsNone(self.store.get_bar("000002.XSHE", 20190102150000))
+        self.assertEqual(self.store.get_date_range(), (20190102, 20190107))
+
+    def test_get_bars(self):
+        bars = self.store.get_bars("000001.XSHE", 20190103093100, 2, ["close"])
+        self.assertEqual(bars["datetime"].tolist(), [20190102150000, 20190103093100])
+        self.assertEqual(bars["close"].tolist(), [10.1, 10.2])
+        self.assertEqual(len(self.store.get_bars("000001.XSHE", 20190101093100, 2)), 0)
+        self.assertEqual(self.store.get_bars("RB88", 20190107000000, 10, ["close"])["close"].tolist(), [2.0, 3.0, 4.0])
+
+    def test_get_trading_minutes(self):
+        # 周五夜盘及周六凌晨的 bar 归属下一个交易日
+        self.assertEqual(self.store.get_trading_minutes("RB88", 20190107),
+                         [20190104210100, 20190105010000, 20190107090100])
+        self.assertIsNone(self.store.get_trading_minutes("RB88", 20190104))
+
+
+class TickStoreTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        from rqalpha.utils.bundle_helper import build_tick_store
+        from rqalpha.data.base_data_source.storages import TickStore
+
+        super(TickStoreTestCase, self).init_fixture()
+        source = os.path.join(self.temp_dir.name, "source")
+        os.makedirs(source)
+        with open(os.path.join(source, "000001.XSHE.csv"), "w") as f:
+            f.write("datetime,last,a1,a2,a1_v,a2_v\n")
+            f.write("2019-01-02 09:30:03,10.0,10.01,10.02,100,200\n2019-01-02 09:30:06,10.1,10.11,10.12,300,400\n")
+        futures = np.zeros(3, dtype=[("datetime", "<i8"), ("last", "<f8")])
+        futures["datetime"] = [20190102093003500, 20190102093000000, 20190101210000000]
+        futures["last"] = [3.0, 2.0, 1.0]
+        np.save(os.path.join(source, "RB88.npy"), futures)
+
+        target = os.path.join(self.temp_dir.name, "ticks")
+        build_tick_store(source, target, [20190102, 20190103])
+        self.store = TickStore(target)
+
+    def test_get_ticks(self):
+        ticks = self.store.get_ticks("RB88", 20190102)
+        self.assertEqual(ticks["last"].tolist(), [1.0, 2.0, 3.0])
+        self.assertEqual(self.store.get_ticks_until("000001.XSHE", 20190102093005000, 5)["last"].tolist(), [10.0])
+
+        tick = self.store.to_tick_dict(self.store.get_ticks("000001.XSHE", 20190102)[1])
+        self.assertEqual((tick["asks"], tick["ask_vols"]), ([10.11, 10.12], [300, 400]))
+        self.assertNotIn("a1", tick)
+        self.assertNotIn("bids", tick)
+
+    def test_merge_ticks(self):
+        merged = [(o, r["datetime"]) for o, r in self.store.merge_ticks(["000001.XSHE", "RB88", "IF88"], 20190102)]
+        self.assertEqual(merged, [
+            ("RB88", 20190101210000000), ("RB88", 20190102093000000), ("000001.XSHE", 20190102093003000),
+            ("RB88", 20190102093003500), ("000001.XSHE", 20190102093006000),
+        ])
+        merged = [(o, r["datetime"]) for o, r in self.store.merge_ticks(
+            ["000001.XSHE", "RB88"], 20190102, 20190102093003000
+        )]
+        self.assertEqual(merged, [("RB88", 20190102093003500), ("000001.XSHE", 20190102093006000)])
+
+
+class PanelStoreTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        import bcolz
+        from rqalpha.utils.bundle_helper import dump_mmap_table, dump_panel
+        from rqalpha.data.base_data_source.storages import PanelStore, PANEL_DIR
+
+        super(PanelStoreTestCase, self).init_fixture()
+        bcolz.carray(
+            np.array([20190102, 20190103, 20190104], dtype=np.uint32),
+            rootdir=os.path.join(self.temp_dir.name, "trading_dates.bcolz"), mode="w"
+        ).flush()
+        dump_mmap_table(os.path.join(self.temp_dir.name, "stocks.mmap"), ["date", "close", "volume"], {
+            "date": np.array([20190102, 20190104, 20190103], dtype=np.uint32),
+            "close": np.array([101234, 103456, 5000], dtype=np.uint32),
+            "volume": np.array([100, 300, 400], dtype=np.float64),
+        }, {"000002.XSHE": (0, 2), "000001.XSHE": (2, 3)})
+        self.assertEqual(dump_panel(self.temp_dir.name, ["close", "volume"], ["stocks"]), 2)
+        self.store = PanelStore(os.path.join(self.temp_dir.name, PANEL_DIR))
+
+    def test_get_panel(self):
+        panel = self.store.get_panel(["close"], 20190102, 20190104)["close"]
+        self.assertEqual(panel.columns.tolist(), ["000001.XSHE", "000002.XSHE"])
+        self.assertEqual([d.day for d in panel.index], [2, 3, 4])
+        self.assertTrue(np.allclose(panel.values, [[np.nan, 10.12], [0.5, np.nan], [np.nan, 10.35]], equal_nan=True))
+
+        panel = self.store.get_panel(["volume"], 20190103, 20190104, ["000002.XSHE", "000003.XSHE"])["volume"]
+        self.assertEqual(panel.columns.tolist(), ["000002.XSHE", "000003.XSHE"])
+        self.assertTrue(np.allclose(panel.values, [[np.nan, np.nan], [300, np.nan]], equal_nan=True))
+
+
+class YieldCurveStoreTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        import bcolz
+        from rqalpha.data.base_data_source.storages import YieldCurveStore
+
+        super(YieldCurveStoreTestCase, self).init_fixture()
+        bcolz.ctable(columns=[
+            np.array([20190102, 20190103, 20190104, 20190107], dtype=np.uint32),
+            np.array([0.01, np.nan, np.nan, 0.04]),
+            np.array([0.1, 0.2, np.nan, 0.4]),
+        ], names=["date", "S0", "Y1"], rootdir=os.path.join(self.temp_dir.name, "yield_curve.bcolz"), mode="w").flush()
+        self.store = YieldCurveStore(os.path.join(self.temp_dir.name, "yield_curve.bcolz"))
+
+    def test_get_yield_curve(self):
+        from datetime import date
+
+        yc = self.store.get_yield_curve(date(2019, 1, 3), date(2019, 1, 4), None)
+        self.assertEqual(yc.columns.tolist(), ["0S", "1Y"])
+        self.assertEqual([d.day for d in yc.index], [3, 4])
+        self.assertTrue(np.allclose(yc.values, [[np.nan, 0.2], [np.nan, np.nan]], equal_nan=True))
+
+    def test_get_risk_free_rates(self):
+        from datetime import date
+
+        self.assertEqual(self.store.get_risk_free_rate(date(2019, 1, 4), date(2019, 1, 5)), 0.01)
+        rates = self.store.get_risk_free_rates([date(2019, 1, 1), 20190104, date(2019, 1, 6), date(2019, 1, 9)], "1Y")
+        self.assertTrue(np.allclose(rates, [0.1, 0.2, 0.2, 0.4]))
+
+
+class IndexByDateTestCase(RQAlphaTestCase):
+    def test_index_by_date(self):
+        from rqalpha.data.base_data_source.storages import index_by_date
+
+        dates = np.array([20180102, 20180102, 20180105, 20180105, 20180106], dtype=np.uint32)
+        by_date = index_by_date(dates, {"A": (0, 3), "B": (3, 5), "C": (5, 5)})
+        self.assertEqual(sorted(by_date), [20180102, 20180105, 20180106])
+        self.assertEqual(by_date[20180102], [("A", 0, 2)])
+        self.assertEqual(sorted(by_date[20180105]), [("A", 2, 3), ("B", 3, 4)])
+        self.assertEqual(by_date[20180106], [("B", 4, 5)])
+
+
+class LazyStoreTestCase(RQAlphaTestCase):
+    def test_load_on_first_access(self):
+        from rqalpha.data.base_data_source.storages import LazyStore
+
+        created = []
+
+        class Store(object):
+            def __init__(self, value):
+                created.append(value)
+                self.value = value
+
+        store = LazyStore("store", Store, 1)
+        self.assertFalse(store.loaded)
+        self.assertEqual(created, [])
+        self.assertEqual(store.value, 1)
+        self.assertEqual(store.value, 1)
+        self.assertTrue(store.loaded)
+        self.assertEqual(created, [1])
@@ -25,3 +25,68 @@ class TradingDateMixinTestCase(DataProxyFixture, RQAlphaTestCase):
         assert self.data_proxy.count_trading_dates(date(2018, 11, 1), date(2018, 11, 12)) == 8
         assert self.data_proxy.count_trading_dates(date(2018, 11, 3), date(2018, 11, 12)) == 6
         assert self.data_proxy.count_trading_dates(date(2018, 11, 3), date(2018, 11, 18)) == 10
+
+
+class IntTradingCalendarTestCase(RQAlphaTestCase):
+    def setUp(self):
+        import pandas as pd
+        from rqalpha.data.trading_dates_mixin import TradingDatesMixin
+
+        self.mixin = TradingDatesMixin(pd.DatetimeIndex(["2018-11-01", "2018-11-02", "2018-11-05", "2018-11-06"]))
+
+    def test_lookup(self):
+        from datetime import date, datetime
+
+        self.assertEqual(self.mixin.get_previous_trading_date(datetime(2018, 11, 5, 9, 30)).date(), date(2018, 11, 2))
+        self.assertEqual(self.mixin.get_next_trading_date("2018-11-03").date(), date(2018, 11, 5))
+        self.assertEqual(self.mixin.get_next_trading_date(date(2018, 11, 6)).date(), date(2018, 11, 6))
+        self.assertTrue(self.mixin.is_trading_date(date(2018, 11, 2)))
+        self.assertFalse(self.mixin.is_trading_date(date(2018, 11, 4)))
+        self.assertFalse(self.mixin.is_trading_date(date(2018, 12, 4)))
+        self.assertEqual(self.mixin.count_trading_dates(date(2018, 10, 1), date(2018, 11, 4)), 2)
+
+    def test_int_path(self):
+        from datetime import date
+
+        self.assertEqual(self.mixin.get_trading_date_ordinal(date(2018, 11, 4)), 2)
+        self.assertEqual(self.mixin.get_previous_trading_date_int(date(2018, 11, 6), 2), 20181102)
+        self.assertEqual(self.mixin.get_n_trading_date_ints_until(date(2018, 11, 4), 3).tolist(), [20181101, 20181102])
+
+    def test_same_as_searchsorted(self):
+        from datetime import date, datetime, timedelta
+        import pandas as pd
+
+        dates = self.mixin._dates
+
+        def to_timestamp(d):
+            return pd.Timestamp(d).replace(hour=0, minute=0, second=0, microsecond=0)
+
+        # 偏移表之前的做法：直接在 DatetimeIndex 上 searchsorted
+        def previous_trading_date(d, n):
+            pos = dates.searchsorted(to_timestamp(d))
+            return dates[pos - n] if pos >= n else dates[0]
+
+        def next_trading_date(d, n):
+            pos = dates.searchsorted(to_timestamp(d), side='right')
+            return dates[-1] if pos + n > len(dates) else dates[pos + n - 1]
+
+        def n_trading_dates_until(d, n):
+            pos = dates.searchsorted(to_timestamp(d), side='right')
+            return dates[pos - n:pos] if pos >= n else dates[:pos]
+
+        # 覆盖交易日历之前、首尾交易日、周末及日历之后的日期
+        days = [date(2018, 10, 25) + timedelta(days=i) for i in range(20)]
+        for d in days:
+            for value in (d, datetime(d.year, d.month, d.day, 21, 30), d.strftime("%Y-%m-%d"), pd.Timestamp(d)):
+                for n in range(1, 6):
+                    self.assertEqual(self.mixin.get_previous_trading_date(value, n), previous_trading_date(d, n),
+                                     msg=(value, n))
+                    self.assertEqual(self.mixin.get_next_trading_date(value, n), next_trading_date(d, n),
+                                     msg=(value, n))
+                    self.assertEqual(self.mixin.get_n_trading_dates_until(value, n).tolist(),
+                                     n_trading_dates_until(d, n).tolist(), msg=(value, n))
+                    self.assertEqual(
+                        self.mixin.get_n_trading_date_ints_until(value, n).tolist(),
+                        [int(t.strftime("%Y%m%d")) for t in n_trading_dates_until(d, n)], msg=(value, n)
+                    )
+                self.assertEqual(self.mixin.is_trading_date(value), to_timestamp(d) in dates, msg=value)
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+from rqalpha.utils.testing import RQAlphaTestCase
+
+
+class EventBusTestCase(RQAlphaTestCase):
+    def test_freeze(self):
+        from rqalpha.events import EventBus, Event, EVENT
+
+        bus = EventBus()
+        called = []
+        bus.add_listener(EVENT.BAR, lambda e: called.append("system") or True)
+        bus.add_listener(EVENT.BAR, lambda e: called.append("stopped"))
+        bus.add_listener(EVENT.BAR, lambda e: called.append("user"), user=True)
+        bus.freeze()
+
+        self.assertTrue(bus.has_listeners(EVENT.BAR))
+        self.assertFalse(bus.has_listeners(EVENT.PRE_BAR))
+        bus.publish_event(Event(EVENT.BAR))
+        bus.publish_event(Event(EVENT.PRE_BAR))
+        self.assertEqual(called, ["system", "user"])
+
+        # 编译之后增加的监听函数同样生效
+        bus.prepend_listener(EVENT.BAR, lambda e: called.append("prepended"))
+        bus.add_listener(EVENT.PRE_BAR, lambda e: called.append("pre_bar"), user=True)
+        self.assertTrue(bus.has_listeners(EVENT.PRE_BAR))
+        del called[:]
+        bus.publish_event(Event(EVENT.PRE_BAR))
+        bus.publish_event(Event(EVENT.BAR))
+        self.assertEqual(called, ["pre_bar", "prepended", "system", "user"])
+
+    def test_profiling(self):
+        from rqalpha.events import ProfilingEventBus, Event, EVENT
+
+        class Listener(object):
+            def on_bar(self, event):
+                return True
+
+        bus = ProfilingEventBus()
+        bus.add_listener(EVENT.BAR, Listener().on_bar)
+        bus.add_listener(EVENT.BAR, lambda e: None)
+        bus.freeze()
+        for _ in range(3):
+            bus.publish_event(Event(EVENT.BAR))
+
+        profile = bus.get_profile()
+        self.assertEqual(profile["event"].tolist(), ["bar", "bar"])
+        self.assertTrue(profile["listener"][0].endswith("Listener.on_bar"))
+        # 前一个监听函数返回 True，之后的监听函数不再被调用
+        self.assertEqual(profile["calls"].tolist(), [3, 0])
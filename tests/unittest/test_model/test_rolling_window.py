@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+from datetime import date, datetime
+
+import numpy as np
+
+from rqalpha.utils.testing import DataProxyFixture, RQAlphaTestCase
+
+
+class RollingWindowTestCase(DataProxyFixture, RQAlphaTestCase):
+    def __init__(self, *args, **kwargs):
+        super(RollingWindowTestCase, self).__init__(*args, **kwargs)
+        self.env_config["base"]["frequency"] = "1d"
+
+    def init_fixture(self):
+        super(RollingWindowTestCase, self).init_fixture()
+        self.env.set_data_source(self.data_source)
+
+    def _run(self, order_book_ids, bar_count, fields, start_date, end_date, adjust_type="pre"):
+        """ 逐个交易日推进窗口，并与 history_bars_batch 的结果比较，返回窗口对象及每日重新读取了整列数据的合约 """
+        from rqalpha.const import EXECUTION_PHASE
+        from rqalpha.events import EVENT, Event
+        from rqalpha.execution_context import ExecutionContext
+        from rqalpha.model.rolling_window import RollingWindow
+
+        fills = []
+        history_bars_batch = self.data_proxy.history_bars_batch
+
+        def counted(*args, **kwargs):
+            fills.append(args[0])
+            return history_bars_batch(*args, **kwargs)
+
+        with self.mock_data_proxy_method("history_bars_batch", counted):
+            window = RollingWindow(self.env, order_book_ids, bar_count, fields, adjust_type)
+            fills_per_day = []
+            for d in self.data_proxy.get_trading_dates(start_date, end_date):
+                dt = datetime.combine(d.date(), datetime.min.time()).replace(hour=15)
+                self.env.calendar_dt = self.env.trading_dt = dt
+                del fills[:]
+                self.env.event_bus.publish_event(Event(EVENT.PRE_BAR))
+                fills_per_day.append(list(fills))
+
+                expected = history_bars_batch(
+                    order_book_ids, bar_count, "1d", window.fields, dt, adjust_type=adjust_type, adjust_orig=dt
+                )
+                with ExecutionContext(EXECUTION_PHASE.ON_BAR):
+                    values = {field: np.array(window[field]) for field in window.fields}
+                for field, value in values.items():
+                    # 交易日历开始前的部分为 NaN
+                    self.assertTrue(np.isnan(value[:len(value) - len(expected)]).all())
+                    self.assertTrue(np.allclose(value[len(value) - len(expected):], expected[field], equal_nan=True),
+                                    "{} {} mismatch".format(dt, field))
+        return window, fills_per_day
+
+    def test_fill_and_append(self):
+        window, fills = self._run(["000001.XSHE", "600000.XSHG"], 5, ["close", "volume"],
+                                  date(2018, 3, 1), date(2018, 3, 9))
+        # 只在第一个交易日读取整个窗口，之后每日追加一行
+        self.assertEqual(fills[0], [["000001.XSHE", "600000.XSHG"]])
+        self.assertTrue(all(f == [] for f in fills[1:]))
+
+    def test_wrap_around(self):
+        # 交易日数超过 2 * bar_count，缓冲区多次回绕
+        window, fills = self._run(["000001.XSHE", "600000.XSHG"], 3, "close", date(2018, 3, 1), date(2018, 3, 30))
+        self.assertGreater(len(fills), 6)
+        self.assertTrue(all(f == [] for f in fills[1:]))
+
+    def test_ex_dividend_refill(self):
+        # 000001.XSHE 于 2018 年 7 月除权除息，跨过除权日时只重新读取该合约的前复权数据
+        window, fills = self._run(["000001.XSHE", "000300.XSHG"], 10, ["close", "high", "volume"],
+                                  date(2018, 7, 2), date(2018, 7, 20))
+        refills = [f for f in fills[1:] if f]
+        self.assertEqual(refills, [[["000001.XSHE"]]])
+
+    def test_ex_dividend_none_adjust(self):
+        window, fills = self._run(["000001.XSHE"], 10, "close", date(2018, 7, 2), date(2018, 7, 20), "none")
+        self.assertTrue(all(f == [] for f in fills[1:]))
+
+    def test_suspended(self):
+        # 停牌期间窗口的内容同样与 history_bars_batch(skip_suspended=False) 一致
+        self.assertTrue(any(
+            self.data_proxy.is_suspended("600000.XSHG", d)
+            for d in self.data_proxy.get_trading_dates(date(2018, 1, 2), date(2018, 1, 31))
+        ))
+        window, fills = self._run(["600000.XSHG", "000001.XSHE"], 5, ["close", "volume"],
+                                  date(2018, 1, 2), date(2018, 1, 31))
+        self.assertTrue(all(f == [] for f in fills[1:]))
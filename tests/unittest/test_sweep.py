@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import datetime
+
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import RQAlphaTestCase
+
+
+class SweepTestCase(RQAlphaTestCase):
+    def test_expand_param_grid(self):
+        from rqalpha.sweep import expand_param_grid
+
+        grid = expand_param_grid({"fast": [5, 10], "slow": [20, 30, 60]})
+        self.assertEqual(len(grid), 6)
+        self.assertIn({"fast": 10, "slow": 30}, grid)
+        self.assertEqual(expand_param_grid([{"fast": 5}]), [{"fast": 5}])
+
+    def test_apply_params(self):
+        from rqalpha.sweep import apply_params
+
+        config = RqAttrDict({
+            "base": {"start_date": datetime.date(2018, 1, 1)},
+            "extra": {"context_vars": None},
+            "mod": {"sys_simulation": {"slippage": 0}},
+        })
+        applied = apply_params(config, {
+            "fast": 5, "mod.sys_simulation.slippage": 0.01, "base.start_date": "2019-01-02"
+        })
+        self.assertEqual(applied.extra.context_vars["fast"], 5)
+        self.assertEqual(applied.mod.sys_simulation.slippage, 0.01)
+        self.assertEqual(applied.base.start_date, datetime.date(2019, 1, 2))
+        # 原配置不受影响
+        self.assertIsNone(config.extra.context_vars)
+        self.assertEqual(config.mod.sys_simulation.slippage, 0)
+
+        with self.assertRaises(ValueError):
+            apply_params(config, {"mod.sys_unknown.value": 1})
+
+        # --extra-vars 传入的 json 由 parse_config 解析为 dict
+        config.extra.context_vars = {"slow": 20}
+        applied = apply_params(config, {"fast": 5})
+        self.assertEqual(applied.extra.context_vars, {"slow": 20, "fast": 5})
+        self.assertEqual(config.extra.context_vars, {"slow": 20})
+
+        config.extra.context_vars = RqAttrDict({"slow": 20})
+        self.assertEqual(apply_params(config, {"fast": 5}).extra.context_vars, {"slow": 20, "fast": 5})
+
+    def test_suffix_analyser_outputs(self):
+        from rqalpha.sweep import suffix_analyser_outputs
+
+        config = RqAttrDict({"mod": {"sys_analyser": {
+            "output_file": "out/result.pkl", "report_save_path": "out/report/", "plot": True,
+            "plot_save_file": None,
+        }}})
+        suffix_analyser_outputs(config, 3)
+        self.assertEqual(config.mod.sys_analyser.output_file, "out/result_3.pkl")
+        self.assertEqual(config.mod.sys_analyser.report_save_path, "out/report_3")
+        self.assertIsNone(config.mod.sys_analyser.plot_save_file)
+        self.assertFalse(config.mod.sys_analyser.plot)
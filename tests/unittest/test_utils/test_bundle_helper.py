@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+import os
+import threading
+
+import numpy as np
+from six.moves import BaseHTTPServer, SimpleHTTPServer
+
+from rqalpha.utils.testing import RQAlphaTestCase
+from rqalpha.utils.testing.fixtures import TempDirFixture
+
+
+class SyncBundleTestCase(TempDirFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        super(SyncBundleTestCase, self).init_fixture()
+        self.mirror = os.path.join(self.temp_dir.name, "bundle")
+        self.local = os.path.join(self.temp_dir.name, "local")
+        os.makedirs(os.path.join(self.mirror, "stocks.bcolz"))
+        os.makedirs(os.path.join(self.mirror, "empty.bcolz", "data"))
+        np.save(os.path.join(self.mirror, "stocks.bcolz", "close.npy"), np.arange(1000, dtype="<f8"))
+        with open(os.path.join(self.mirror, "instruments.pk"), "wb") as f:
+            f.write(b"instruments")
+
+        mirror = self.mirror
+
+        class Handler(SimpleHTTPServer.SimpleHTTPRequestHandler):
+            def translate_path(self, path):
+                return os.path.join(mirror, *path.lstrip("/").split("/"))
+
+            def log_message(self, *args):
+                pass
+
+        self.server = BaseHTTPServer.HTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.url = "http://127.0.0.1:{}/".format(self.server.server_address[1])
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _read(self, *path):
+        with open(os.path.join(self.local, *path), "rb") as f:
+            return f.read()
+
+    def test_sync(self):
+        from rqalpha.utils.bundle_helper import dump_manifest, sync_from_manifest
+
+        dump_manifest(self.temp_dir.name, block_size=1024)
+        self.assertEqual(sync_from_manifest(self.url, self.local)[:2], (2, 2))
+        self.assertEqual(np.load(os.path.join(self.local, "stocks.bcolz", "close.npy")).tolist(), list(range(1000)))
+        self.assertTrue(os.path.isdir(os.path.join(self.local, "empty.bcolz", "data")))
+
+        # 只有追加了数据的文件会被重新下载
+        np.save(os.path.join(self.mirror, "stocks.bcolz", "close.npy"), np.arange(1100, dtype="<f8"))
+        dump_manifest(self.temp_dir.name, block_size=1024)
+        self.assertEqual(sync_from_manifest(self.url, self.local)[:2], (1, 2))
+        self.assertEqual(np.load(os.path.join(self.local, "stocks.bcolz", "close.npy")).tolist(), list(range(1100)))
+        self.assertEqual(self._read("instruments.pk"), b"instruments")
+        self.assertFalse(os.path.exists(self.local + ".sync"))
+
+        # 校验失败时保留原有的 bundle
+        with open(os.path.join(self.mirror, "instruments.pk"), "wb") as f:
+            f.write(b"instruments2")
+        dump_manifest(self.temp_dir.name, block_size=1024)
+        with open(os.path.join(self.mirror, "instruments.pk"), "wb") as f:
+            f.write(b"corrupted!!!")
+        with self.assertRaises(RuntimeError):
+            sync_from_manifest(self.url, self.local)
+        self.assertEqual(self._read("instruments.pk"), b"instruments")
+        self.assertFalse(os.path.exists(self.local + ".sync"))
+
+    def _write(self, content, *path):
+        path = os.path.join(*path)
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        with open(path, "wb") as f:
+            f.write(content)
+
+    def test_manifest_excludes_local_only(self):
+        from rqalpha.utils.bundle_helper import make_manifest
+
+        self._write(b"cache", self.mirror, ".cache", "v1", "instruments.pkl")
+        self._write(b"mmap", self.mirror, "stocks.mmap", "close.npy")
+        self._write(b"tmp", self.mirror, "panel.tmp", "close.npy")
+        manifest = make_manifest(self.mirror)
+        self.assertEqual(sorted(manifest["files"]), ["instruments.pk", "stocks.bcolz/close.npy"])
+        self.assertEqual(manifest["dirs"], ["empty.bcolz", "empty.bcolz/data", "stocks.bcolz"])
+
+    def test_keep_local_data(self):
+        from rqalpha.utils.bundle_helper import dump_manifest, sync_from_manifest
+
+        dump_manifest(self.temp_dir.name, block_size=1024)
+        sync_from_manifest(self.url, self.local)
+        # 本地生成的分钟线、衍生数据缓存及 memmap 日线
+        self._write(b"minute", self.local, "minute_bars", "bars", "close.npy")
+        self._write(b"cache", self.local, ".cache", "v1", "instruments.pkl")
+        self._write(b"mmap", self.local, "stocks.mmap", "close.npy")
+        self._write(b"local", self.local, "empty.bcolz", "local")
+
+        self._write(b"instruments2", self.mirror, "instruments.pk")
+        dump_manifest(self.temp_dir.name, block_size=1024)
+        self.assertEqual(sync_from_manifest(self.url, self.local)[:2], (1, 2))
+        self.assertEqual(self._read("instruments.pk"), b"instruments2")
+        self.assertEqual(self._read("minute_bars", "bars", "close.npy"), b"minute")
+        self.assertEqual(self._read(".cache", "v1", "instruments.pkl"), b"cache")
+        self.assertEqual(self._read("stocks.mmap", "close.npy"), b"mmap")
+        self.assertEqual(self._read("empty.bcolz", "local"), b"local")
+
+        # 服务端删除的文件在本地同样删除；数据源表更新后，由其生成的 memmap 日线不再保留
+        os.remove(os.path.join(self.mirror, "instruments.pk"))
+        np.save(os.path.join(self.mirror, "stocks.bcolz", "close.npy"), np.arange(1100, dtype="<f8"))
+        dump_manifest(self.temp_dir.name, block_size=1024)
+        self.assertEqual(sync_from_manifest(self.url, self.local)[3], ["stocks.mmap"])
+        self.assertFalse(os.path.exists(os.path.join(self.local, "instruments.pk")))
+        self.assertFalse(os.path.exists(os.path.join(self.local, "stocks.mmap")))
+        self.assertEqual(self._read("minute_bars", "bars", "close.npy"), b"minute")
+
+    def test_reject_invalid_path(self):
+        import json
+        from rqalpha.utils.bundle_helper import make_manifest, sync_from_manifest
+
+        for rel in ["../evil", "/tmp/evil", "a/../../evil"]:
+            manifest = make_manifest(self.mirror)
+            manifest["files"][rel] = manifest["files"]["instruments.pk"]
+            with open(os.path.join(self.mirror, "manifest.json"), "w") as f:
+                json.dump(manifest, f)
+            with self.assertRaises(RuntimeError):
+                sync_from_manifest(self.url, self.local)
+            self.assertFalse(os.path.exists(os.path.join(self.temp_dir.name, "evil")))
+            self.assertFalse(os.path.exists(self.local))
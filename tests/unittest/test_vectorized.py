@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+# 版权所有 2019 深圳米筐科技有限公司（下称“米筐科技”）
+#
+# 除非遵守当前许可，否则不得使用本软件。
+#
+#     * 非商业用途（非商业用途指个人出于非商业目的使用本软件，或者高校、研究所等非营利机构出于教育、科研等目的使用本软件）：
+#         遵守 Apache License 2.0（下称“Apache 2.0 许可”），您可以在以下位置获得 Apache 2.0 许可的副本：http://www.apache.org/licenses/LICENSE-2.0。
+#         除非法律有要求或以书面形式达成协议，否则本软件分发时需保持当前许可“原样”不变，且不得附加任何条件。
+#
+#     * 商业用途（商业用途指个人出于任何商业目的使用本软件，或者法人或其他组织出于任何目的使用本软件）：
+#         未经米筐科技授权，任何个人不得出于任何商业目的使用本软件（包括但不限于向第三方提供、销售、出租、出借、转让本软件、本软件的衍生产品、引用或借鉴了本软件功能或源代码的产品或服务），任何法人或其他组织不得出于任何目的使用本软件，否则米筐科技有权追究相应的知识产权侵权责任。
+#         在此前提下，对本软件的使用同样需要遵守 Apache 2.0 许可，Apache 2.0 许可与本许可冲突之处，以本许可为准。
+#         详细的授权流程，请联系 public@ricequant.com 获取。
+
+import copy
+import datetime
+
+import numpy as np
+import pandas as pd
+
+from rqalpha.utils import RqAttrDict
+from rqalpha.utils.testing import DataProxyFixture, RQAlphaTestCase
+
+
+class VectorizedRunTestCase(RQAlphaTestCase):
+    config = {
+        "base": {
+            "start_date": "2018-06-01",
+            "end_date": "2018-08-31",
+            "frequency": "1d",
+            "benchmark": "000300.XSHG",
+            "accounts": {"stock": 1000000},
+        },
+        "extra": {"log_level": "error"},
+    }
+    order_book_ids = ["000001.XSHE", "600000.XSHG", "510050.XSHG"]
+
+    def _weights(self):
+        rng = np.random.RandomState(0)
+        dates = pd.bdate_range(self.config["base"]["start_date"], self.config["base"]["end_date"])[::5]
+        weights = rng.rand(len(dates), len(self.order_book_ids))
+        weights[rng.rand(*weights.shape) < 0.3] = 0
+        weights = weights / weights.sum(axis=1, keepdims=True).clip(1) * 0.95
+        return pd.DataFrame(weights, index=dates, columns=self.order_book_ids)
+
+    def test_same_as_order_target_value(self):
+        from rqalpha import run_func, run_vectorized
+        from rqalpha.api import order_target_value
+
+        weights = self._weights()
+        rows = {d.date(): row for d, row in weights.iterrows()}
+
+        def handle_bar(context, bar_dict):
+            row = rows.get(context.now.date())
+            if row is None:
+                return
+            total_value = context.stock_account.total_value
+
+            def market_value(order_book_id):
+                position = context.stock_account.positions.get(order_book_id)
+                return 0 if position is None or position.quantity == 0 else position.market_value
+
+            # 与向量化回测相同，目标市值按调仓前的总权益计算，先卖后买
+            for order_book_id, weight in row.items():
+                if weight == 0:
+                    order_target_value(order_book_id, 0)
+            for order_book_id, weight in row.items():
+                if weight > 0 and total_value * weight < market_value(order_book_id):
+                    order_target_value(order_book_id, total_value * weight)
+            for order_book_id, weight in row.items():
+                if weight > 0 and total_value * weight > market_value(order_book_id):
+                    order_target_value(order_book_id, total_value * weight)
+
+        expected = run_func(config=copy.deepcopy(self.config), handle_bar=handle_bar)["sys_analyser"]
+        config = copy.deepcopy(self.config)
+        config["base"]["strategy_file"] = "strategy.py"
+        result = run_vectorized(weights, config)["sys_analyser"]
+        # 调用方传入的配置不被修改
+        self.assertEqual(config, dict(self.config, base=dict(self.config["base"], strategy_file="strategy.py")))
+        self.assertGreater(len(expected["trades"]), 0)
+
+        for key in ["total_value", "cash", "total_returns", "annualized_returns", "sharpe", "max_drawdown", "alpha",
+                    "beta", "benchmark_total_returns"]:
+            self.assertAlmostEqual(result["summary"][key], expected["summary"][key], msg=key)
+
+        trade_columns = ["order_book_id", "side", "last_quantity", "last_price", "commission", "tax"]
+
+        def trades(r):
+            return r["trades"][trade_columns].reset_index().sort_values(
+                ["datetime", "order_book_id"]
+            ).reset_index(drop=True)
+        pd.testing.assert_frame_equal(trades(result), trades(expected), check_dtype=False)
+
+        # 事件驱动的回测中访问 positions 会产生数量为 0 的持仓记录，只比较实际持有的部分
+        def positions(r):
+            df = r["stock_positions"].reset_index()
+            return df[df["quantity"] != 0].sort_values(["date", "order_book_id"]).reset_index(drop=True)
+        pd.testing.assert_frame_equal(positions(result), positions(expected), check_dtype=False)
+
+        pd.testing.assert_frame_equal(result["stock_account"], expected["stock_account"], check_dtype=False)
+
+
+class VectorizedRebalanceTestCase(DataProxyFixture, RQAlphaTestCase):
+    def init_fixture(self):
+        from rqalpha.const import MARKET, RUN_TYPE
+
+        super(VectorizedRebalanceTestCase, self).init_fixture()
+        start_date, end_date = datetime.date(2018, 6, 1), datetime.date(2018, 6, 29)
+        self.config = RqAttrDict({
+            "base": {
+                "start_date": start_date,
+                "end_date": end_date,
+                "trading_calendar": self.data_proxy.get_trading_dates(start_date, end_date),
+                "frequency": "1d",
+                "market": MARKET.CN,
+                "run_type": RUN_TYPE.BACKTEST,
+                "init_positions": [],
+            },
+            "validator": {"close_amount": True},
+            "mod": {},
+        })
+        # 与 parse_config 一致，accounts 为普通的 dict
+        self.config.base.accounts = {"STOCK": 100000}
+
+    def _backtest(self, close=10., volume=1e8, limit_up=11., limit_down=9.):
+        """ 构造只包含 000001.XSHE 一列、行情为固定值的回测 """
+        from rqalpha.vectorized import VectorizedBacktest
+
+        backtest = VectorizedBacktest(self.config, self.data_proxy)
+        backtest._extend(["000001.XSHE"])
+        for field, value in [("close", close), ("volume", volume), ("limit_up", limit_up),
+                             ("limit_down", limit_down)]:
+            backtest._bars[field][:] = value
+        backtest._suspended[:] = False
+        backtest._last_price[:] = close
+        return backtest
+
+    def _rebalance(self, backtest, i, weight):
+        backtest._before_trading(i, backtest._calendar[i])
+        backtest._rebalance(i, backtest._calendar[i], np.array([weight]))
+        backtest._collect_daily(backtest._calendar[i])
+
+    def test_lot_rounding(self):
+        backtest = self._backtest()
+        self._rebalance(backtest, 0, 1.)
+        # 10000 股的金额加手续费超过可用资金，退一手
+        self.assertEqual(backtest._quantity[0], 9900)
+        self.assertAlmostEqual(backtest._cash, 100000 - 99000 - 99000 * 0.0008)
+
+        backtest = self._backtest()
+        self._rebalance(backtest, 0, 0.5)
+        self.assertEqual(backtest._quantity[0], 4900)
+        self.assertEqual(backtest._quantity[0] % 100, 0)
+
+    def test_limit_up(self):
+        backtest = self._backtest(close=11.)
+        self._rebalance(backtest, 0, 1.)
+        self.assertEqual(backtest._quantity[0], 0)
+        self.assertEqual(backtest._trades, [])
+
+    def test_t1_sellable(self):
+        backtest = self._backtest()
+        self._rebalance(backtest, 0, 0.5)
+        # 当日买入的不能卖出
+        self._rebalance(backtest, 0, 0.)
+        self.assertEqual(backtest._quantity[0], 4900)
+        backtest._settlement(0)
+        self._rebalance(backtest, 1, 0.)
+        self.assertEqual(backtest._quantity[0], 0)
+        self.assertEqual([t["side"] for t in backtest._trades], ["BUY", "SELL"])
+
+    def test_volume_limit(self):
+        # 成交量的 25% 按一手取整
+        backtest = self._backtest(volume=1000)
+        self._rebalance(backtest, 0, 1.)
+        self.assertEqual(backtest._quantity[0], 200)
+
+        backtest = self._backtest(volume=300)
+        self._rebalance(backtest, 0, 1.)
+        self.assertEqual(backtest._quantity[0], 0)